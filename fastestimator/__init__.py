@@ -54,6 +54,7 @@ __version__ = '1.6.0'
 fe_deterministic_seed = None
 fe_history_path = None  # Where to save training histories. None for ~/fastestimator_data/history.db, False to disable
 fe_build_count = 0
+fe_autotune_path = None  # Where to cache Pipeline num_process choices. None for ~/fastestimator_data/autotune.json
 
 # Disable history logging for tests by default (they can still turn it on/off manually in setUpClass/tearDownClass)
 if __name__ != '__main__':
@@ -62,4 +63,5 @@ if __name__ != '__main__':
             # frame.filename will be the name of the file which is currently importing FE
             if re.match('.*/test/PR_test/.*test_.*\\.py', frame.filename):
                 fe_history_path = False
+                fe_autotune_path = False
             break
@@ -22,13 +22,16 @@ __getattr__, __dir__, __all__ = lazy.attach(
     submodules={"data"},
     submod_attrs={
         "batch_dataset": ["BatchDataset"],
+        "columnar_dataset": ["ColumnarDataset"],
         "csv_dataset": ["CSVDataset"],
         "dir_dataset": ["DirDataset"],
         "generator_dataset": ["GeneratorDataset"],
         "labeled_dir_dataset": ["LabeledDirDataset"],
         "numpy_dataset": ["NumpyDataset"],
         "pickle_dataset": ["PickleDataset"],
+        "record_dataset": ["RecordDataset"],
         "siamese_dir_dataset": ["SiameseDirDataset"],
+        "streaming_dataset": ["StreamingDataset"],
         "extend_dataset": ["ExtendDataset"],
         "combined_dataset": ["CombinedDataset"],
     },
@@ -37,6 +40,7 @@ __getattr__, __dir__, __all__ = lazy.attach(
 if TYPE_CHECKING:
     from fastestimator.dataset import data
     from fastestimator.dataset.batch_dataset import BatchDataset
+    from fastestimator.dataset.columnar_dataset import ColumnarDataset
     from fastestimator.dataset.combined_dataset import CombinedDataset
     from fastestimator.dataset.csv_dataset import CSVDataset
     from fastestimator.dataset.dir_dataset import DirDataset
@@ -45,4 +49,6 @@ if TYPE_CHECKING:
     from fastestimator.dataset.labeled_dir_dataset import LabeledDirDataset
     from fastestimator.dataset.numpy_dataset import NumpyDataset
     from fastestimator.dataset.pickle_dataset import PickleDataset
+    from fastestimator.dataset.record_dataset import RecordDataset
     from fastestimator.dataset.siamese_dir_dataset import SiameseDirDataset
+    from fastestimator.dataset.streaming_dataset import StreamingDataset
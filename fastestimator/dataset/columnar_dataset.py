@@ -0,0 +1,248 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+from collections.abc import Hashable
+from typing import Any, Dict, Iterable, List, Sequence, Union
+
+import numpy as np
+from typing_extensions import Self
+
+from fastestimator.dataset.dataset import DatasetSummary, InMemoryDataset, KeySummary
+from fastestimator.util.base_util import get_shape, get_type
+from fastestimator.util.traceability_util import traceable
+
+
+@traceable(blacklist=('columns', '_summary', '_owned'))
+class ColumnarDataset(InMemoryDataset):
+    """An in-memory dataset which stores its data column-wise rather than as a dictionary of per-instance dictionaries.
+
+    The given arrays and lists are kept as-is (without being copied), and instance dictionaries are only built on demand
+    when an element of the dataset is requested. This makes construction essentially free, and allows column access,
+    splitting, and summarization to be performed as vectorized operations over entire columns rather than by iterating
+    over every instance. It is a drop-in replacement for NumpyDataset, with the exception that columns which were
+    provided as numpy arrays are also returned as (read-only) numpy arrays during column access.
+
+    ```python
+    ds = fe.dataset.ColumnarDataset({"x": np.ones((60000, 28, 28)), "y": np.arange(60000)})
+    ds[0]  # {"x": <28x28>, "y": 0}
+    ds["y"]  # <60000>
+    eval_ds = ds.split(0.1, stratify="y")
+    ```
+
+    Args:
+        data: A dictionary of data like {"key1": <numpy array>, "key2": [list]}.
+
+    Raises:
+        AssertionError: If any of the Numpy arrays or lists have differing numbers of elements.
+        ValueError: If any dictionary value is not instance of Numpy array or list.
+    """
+    columns: Dict[str, Union[np.ndarray, List[Any]]]
+
+    def __init__(self, data: Dict[str, Union[np.ndarray, List[Any]]]) -> None:
+        size = None
+        for val in data.values():
+            if isinstance(val, np.ndarray):
+                current_size = val.shape[0]
+            elif isinstance(val, list):
+                current_size = len(val)
+            else:
+                raise ValueError("Please ensure you are passing numpy array or list in the data dictionary.")
+            if size is not None:
+                assert size == current_size, "All data arrays must have the same number of elements"
+            else:
+                size = current_size
+        self.columns = dict(data)
+        self._size = size or 0
+        # Columns which have been copied from the user's inputs, and which may therefore be modified in place
+        self._owned = set()
+        self._summary = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, index: Union[int, str]) -> Union[Dict[str, Any], np.ndarray, List[Any]]:
+        """Look up data from the dataset.
+
+        ```python
+        data = fe.dataset.ColumnarDataset(...)  # {"x": <100>}, len(data) == 1000
+        element = data[0]  # {"x": <100>}
+        column = data["x"]  # <1000x100>
+        ```
+
+        Args:
+            index: Either an int corresponding to a particular element of data, or a string in which case the
+                corresponding column of data will be returned.
+
+        Returns:
+            A data dictionary if the index was an int, otherwise a column of data. Columns which are stored as numpy
+            arrays are returned as read-only views, whereas list columns are returned as shallow copies.
+        """
+        if isinstance(index, (int, np.integer)):
+            if index >= len(self):
+                raise StopIteration
+            return {key: column[index] for key, column in self.columns.items()}
+        else:
+            column = self.columns[index]
+            if isinstance(column, np.ndarray):
+                column = column.view()
+                column.flags.writeable = False
+                return column
+            return list(column)
+
+    def __setitem__(self, key: Union[int, str], value: Union[Dict[str, Any], Sequence[Any]]) -> None:
+        """Modify data in the dataset.
+
+        ```python
+        data = fe.dataset.ColumnarDataset(...)  # {"x": <100>}, len(data) == 1000
+        column = data["x"]  # <1000x100>
+        column = column - np.mean(column)
+        data["x"] = column
+        ```
+
+        Args:
+            key: Either an int corresponding to a particular element of data, or a string in which case the
+                corresponding column of data will be updated.
+            value: The value to be inserted for the given `key`. Must be a dictionary containing every key of the
+                dataset if `key` is an integer. Otherwise must be a sequence with the same length as the current length
+                of the dataset.
+
+        Raises:
+            AssertionError: If the `value` is inappropriate given the type of the `key`.
+        """
+        if isinstance(key, (int, np.integer)):
+            assert isinstance(value, Dict), "if setting a value using an integer index, must provide a dictionary"
+            assert set(value.keys()) == set(self.columns.keys()), \
+                "input dictionary must have keys {}, but had keys {}".format(set(self.columns.keys()), set(value.keys()))
+            for name, elem in value.items():
+                if name not in self._owned:
+                    # Don't modify the user's original arrays
+                    column = self.columns[name]
+                    self.columns[name] = column.copy() if isinstance(column, np.ndarray) else list(column)
+                    self._owned.add(name)
+                self.columns[name][key] = elem
+        else:
+            assert len(value) == len(self), \
+                "input value must be of length {}, but had length {}".format(len(self), len(value))
+            self.columns[key] = value if isinstance(value, (np.ndarray, list)) else list(value)
+            self._owned.discard(key)
+        self._summary = None
+
+    def _skip_init(self, data: Dict[str, Union[np.ndarray, List[Any]]], **kwargs) -> Self:
+        """A helper method to create new dataset instances without invoking their __init__ methods.
+
+        Args:
+            data: The column dictionary to be used in the new dataset.
+            **kwargs: Any other member variables to be assigned in the new dataset.
+
+        Returns:
+            A new dataset based on the given inputs.
+        """
+        obj = self.__class__.__new__(self.__class__)
+        obj.columns = data
+        for k, v in kwargs.items():
+            obj.__setattr__(k, v)
+        obj._size = len(next(iter(data.values()))) if data else 0
+        obj._owned = set(data.keys())
+        obj._summary = None
+        return obj
+
+    @staticmethod
+    def _take(column: Union[np.ndarray, List[Any]], indices: np.ndarray) -> Union[np.ndarray, List[Any]]:
+        """Gather the elements of a `column` at the given `indices`.
+
+        Args:
+            column: The column to index into.
+            indices: Which elements to gather.
+
+        Returns:
+            A new column of the same type as the input `column`.
+        """
+        if isinstance(column, np.ndarray):
+            return column[indices]
+        return [column[idx] for idx in indices]
+
+    def _do_split(self, splits: Sequence[Iterable[int]]) -> List[Self]:
+        """Split the current dataset apart into several smaller datasets.
+
+        Args:
+            splits: Which indices to remove from the current dataset in order to create new dataset(s). One dataset will
+                be generated for every iterable within the `splits` sequence.
+
+        Returns:
+            New Datasets generated by removing data at the indices specified by `splits` from the current dataset.
+        """
+        results = []
+        keep = np.ones(len(self), dtype=bool)
+        for split in splits:
+            indices = np.fromiter(split, dtype=np.int64)
+            keep[indices] = False
+            columns = {key: self._take(column, indices) for key, column in self.columns.items()}
+            results.append(
+                self._skip_init(columns,
+                                **{k: v
+                                   for k, v in self.__dict__.items() if k not in {'columns', '_size', '_owned'}}))
+        # Remove the split data from the current dataset
+        remaining = np.flatnonzero(keep)
+        self.columns = {key: self._take(column, remaining) for key, column in self.columns.items()}
+        self._size = len(remaining)
+        self._owned = set(self.columns.keys())
+        self._summary = None
+        return results
+
+    def _get_stratify_distribution(self, stratify: str) -> Dict[Any, List[int]]:
+        """Find which indices of the dataset belong to each class.
+
+        Args:
+            stratify: A class key within the dataset.
+
+        Returns:
+            A dictionary of {class: [indices]}, with classes ordered by their first appearance in the dataset and indices
+            in ascending order.
+        """
+        column = self.columns.get(stratify)
+        if not isinstance(column, np.ndarray) or column.dtype.hasobject or len(column) == 0:
+            return super()._get_stratify_distribution(stratify)
+        # Compare the raw bytes of every entry, the same way that the per-instance implementation does
+        rows = np.ascontiguousarray(column).reshape(len(column), -1)
+        rows = rows.view(np.dtype((np.void, rows.dtype.itemsize * rows.shape[1]))).ravel()
+        _, first_idx, inverse, counts = np.unique(rows, return_index=True, return_inverse=True, return_counts=True)
+        # A stable sort keeps the indices of each class in ascending order
+        members = np.split(np.argsort(inverse, kind='stable'), np.cumsum(counts)[:-1])
+        return {rows[first_idx[cls]].tobytes(): members[cls].tolist() for cls in np.argsort(first_idx)}
+
+    def summary(self) -> DatasetSummary:
+        """Generate a summary representation of this dataset.
+        Returns:
+            A summary representation of this dataset.
+        """
+        if self._summary is not None:
+            return self._summary
+        final_example = self[0]
+        original_example = ColumnarDataset.__getitem__(self, 0)
+        key_summary = {}
+        for key, final_val in final_example.items():
+            dtype = get_type(final_val)
+            shape = get_shape(final_val)
+            n_unique = None
+            # If __getitem__ hasn't changed the data then we can quickly count the unique values using the columns
+            if key in original_example and isinstance(original_example[key], Hashable) and \
+                    dtype == get_type(original_example[key]) and shape == get_shape(original_example[key]):
+                column = self.columns[key]
+                if isinstance(column, np.ndarray) and not column.dtype.hasobject:
+                    n_unique = len(np.unique(column))
+                else:
+                    n_unique = len(set(column))
+            key_summary[key] = KeySummary(dtype=dtype, num_unique_values=n_unique or None, shape=shape)
+        self._summary = DatasetSummary(num_instances=len(self), keys=key_summary)
+        return self._summary
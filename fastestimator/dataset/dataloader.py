@@ -15,13 +15,16 @@
 import functools
 import random
 from abc import ABC
-from typing import Any, Callable, Dict, List, Optional, Sized, Tuple, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Sized, Tuple, Union
 
 import numpy as np
 from torch import Tensor
 from torch.utils.data import DataLoader, Dataset, Sampler, _DatasetKind
 from torch.utils.data._utils.collate import default_collate, default_convert
 from torch.utils.data._utils.fetch import _MapDatasetFetcher
+from torch.utils.data._utils.pin_memory import pin_memory
 from torch.utils.data.dataloader import _BaseDataLoaderIter, _MultiProcessingDataLoaderIter, \
     _SingleProcessDataLoaderIter
 
@@ -30,6 +33,9 @@ from fastestimator.dataset.op_dataset import OpDataset
 from fastestimator.util.data import FilteredData
 from fastestimator.util.util import Suppressor
 
+# A thread pool which is used by the worker processes of 'hybrid' loaders to draw the samples of a batch concurrently
+_WORKER_THREAD_POOL: Optional[ThreadPoolExecutor] = None
+
 
 class SizedDataset(Dataset, Sized):
     pass
@@ -54,15 +60,35 @@ class FEDataLoader(DataLoader):
             re-sampled, equivalent to running multiple epochs of training one after the other (unless you are also
             filtering data, in which case at most one batch of data might be seen after the re-shuffling occurs).
         shuffle: Whether to shuffle the dataset.
-        num_workers: How many multiprocessing threads to use (unix/mac only).
+        num_workers: How many multiprocessing threads to use (unix/mac only). Ignored when `executor` is 'thread'.
         collate_fn: What function to use to collate a list of data into a batch. This should take care of any desired
             padding.
         drop_last: Whether to drop the last batch of data if that batch is incomplete. Note that this is meaningless for
             batched datasets, as well as when `steps_per_epoch` is set - in which case the dataset will be re-sampled as
             necessary until the specified number of steps has been completed in full.
+        worker_pool: A PersistentWorkerPool whose worker processes should be used instead of spawning new ones for this
+            loader. If provided, `num_workers` is ignored in favor of the pool's worker count.
+        worker_ctx: The key which the `worker_pool` will use to reconstruct this loader's dataset and collate function
+            inside of its worker processes. Required if a `worker_pool` is provided.
+        executor: How to parallelize data loading. 'process' uses `num_workers` forked processes, each of which builds
+            entire batches. 'thread' uses `num_threads` threads within the main process, which avoids the pickling and
+            IPC overhead of processes and is effective when the dataset and its ops release the GIL (ex. cv2 image
+            decoding). 'hybrid' uses `num_workers` processes, each of which fetches the samples of its batches using
+            `num_threads` threads.
+        num_threads: How many threads to use. For the 'thread' executor this defaults to `num_workers`. For the 'hybrid'
+            executor this is the number of threads within each worker process, and defaults to 2. Ignored by the
+            'process' executor.
+        bucket_lengths: The length of every element of the `dataset`. If provided (and the data is not already batched)
+            then samples of similar length will be grouped into the same batches using a LengthBucketSampler, which
+            reduces the amount of padding needed for variable-length data.
+        bucket_pool_size: How many batches worth of samples are sorted by length together when `bucket_lengths` are
+            provided. See LengthBucketSampler for details.
     """
     _current_threads = []
     FE_LOADER_KIND = 7
+    FE_POOL_KIND = 8
+    EXECUTORS = ('process', 'thread', 'hybrid')
+    HYBRID_THREADS = 2
 
     # The typing for 'dataset' should be an 'and' rather than 'or' but that feature is still under development:
     # https://github.com/python/typing/issues/213
@@ -75,12 +101,41 @@ class FEDataLoader(DataLoader):
                  shuffle: bool = False,
                  num_workers: int = 0,
                  collate_fn: Optional[Callable] = None,
-                 drop_last: bool = False):
+                 drop_last: bool = False,
+                 worker_pool: Optional['PersistentWorkerPool'] = None,
+                 worker_ctx: Optional[Hashable] = None,
+                 executor: str = 'process',
+                 num_threads: Optional[int] = None,
+                 bucket_lengths: Optional[Sequence[int]] = None,
+                 bucket_pool_size: int = 100):
+        if worker_pool is not None and worker_ctx is None:
+            raise ValueError("A worker_ctx must be provided when using a worker_pool")
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"executor must be one of {self.EXECUTORS}, but got '{executor}'")
+        if num_threads is not None and num_threads < 0:
+            raise ValueError(f"num_threads must be None or a non-negative integer, but got {num_threads}")
+        self.fe_executor = executor
+        if executor == 'thread':
+            self.fe_num_threads = num_workers if num_threads is None else num_threads
+            num_workers = 0  # Torch itself should not launch any processes
+        elif executor == 'hybrid':
+            self.fe_num_threads = self.HYBRID_THREADS if num_threads is None else num_threads
+        else:
+            self.fe_num_threads = 0
         reset_fn = dataset.fe_reset_ds if hasattr(dataset, 'fe_reset_ds') else None
         convert_fn = dataset.fe_batch_indices if hasattr(dataset, 'fe_batch_indices') else None
-        sampler = InfiniteSampler(data_source=dataset, shuffle=shuffle, reset_fn=reset_fn, convert_fn=convert_fn)
         if batch_size is not None and batch_size < 1:
             raise ValueError(f"batch_size must be None or a positive integer, but got {batch_size}")
+        if bucket_lengths is not None and batch_size is not None:
+            sampler = LengthBucketSampler(data_source=dataset,
+                                          lengths=bucket_lengths,
+                                          batch_size=batch_size,
+                                          pool_size=bucket_pool_size,
+                                          shuffle=shuffle,
+                                          reset_fn=reset_fn,
+                                          convert_fn=convert_fn)
+        else:
+            sampler = InfiniteSampler(data_source=dataset, shuffle=shuffle, reset_fn=reset_fn, convert_fn=convert_fn)
         # Figure out the real batch size. This is already done in OpDataset, but if user manually instantiates this
         # loader without using an OpDataset we still want to know the batch size
         if not hasattr(dataset, "fe_batch"):
@@ -106,12 +161,10 @@ class FEDataLoader(DataLoader):
                 to_yield -= to_yield % (batch_size or 1)
         self.fe_samples_to_yield = to_yield
         self.fe_drop_last = drop_last
-        self.fe_collate_fn = collate_fn or default_collate
-        if self.fe_batch_size in (0, None) and batch_size is None and self.fe_collate_fn == default_collate:
-            # The user did not provide a batch dataset nor a batch size, so default collate won't work. Have to try
-            # convert instead.
-            self.fe_collate_fn = default_convert
+        self.fe_collate_fn = _get_collate_fn(self.fe_batch_size, batch_size, collate_fn)
         self.fe_postprocess_fn = postprocess_fn
+        self.fe_worker_pool = worker_pool
+        self.fe_worker_ctx = worker_ctx
 
         # We could disable pre-collating when num_workers=0, but this would lead to inconsistent batch ordering between
         # single- and multi-processing.
@@ -123,7 +176,8 @@ class FEDataLoader(DataLoader):
             num_workers=num_workers,
             persistent_workers=False,
             collate_fn=functools.partial(_pre_collate, try_fn=self.fe_collate_fn, postprocess_fn=postprocess_fn),
-            worker_init_fn=lambda _: np.random.seed(random.randint(0, 2**32 - 1)))
+            worker_init_fn=functools.partial(_init_worker,
+                                             num_threads=self.fe_num_threads if executor == 'hybrid' else 0))
         if self.batch_size is not None:
             # We need a special fetcher type later in order to build batches correctly
             self._dataset_kind = self.FE_LOADER_KIND
@@ -132,23 +186,32 @@ class FEDataLoader(DataLoader):
         """Close the worker threads used by this iterator.
 
         The hope is that this will prevent "RuntimeError: DataLoader worker (pid(s) XXXX) exited unexpectedly" during
-        the test suites.
+        the test suites. Workers which belong to a `worker_pool` are left running, since they are owned by the pool.
         """
-        if isinstance(self._iterator, _MultiProcessingDataLoaderIter):
+        if isinstance(self._iterator, _MultiProcessingDataLoaderIter) and self.fe_worker_pool is None:
+            self._iterator._shutdown_workers()
+            FEDataLoader._current_threads.clear()
+        elif isinstance(self._iterator, _ThreadDataLoaderIter):
             self._iterator._shutdown_workers()
         self._iterator = None
-        FEDataLoader._current_threads.clear()
 
     def __iter__(self) -> _BaseDataLoaderIter:
         # Similar to the original iter method, but we remember iterators in order to manually close them when new ones
         # are created
         self.shutdown()
+        if self.fe_worker_pool is not None:
+            self._iterator = self.fe_worker_pool.get_iterator(self)
+            return self._iterator
         self._iterator = self._get_fe_iterator()
         if isinstance(self._iterator, _MultiProcessingDataLoaderIter):
             FEDataLoader._current_threads.extend([w.pid for w in self._iterator._workers])
         return self._iterator
 
     def _get_fe_iterator(self):
+        if self.fe_executor == 'thread' and self.fe_num_threads > 0:
+            if self.batch_size is None:
+                return _TPPostBatchIter(self)
+            return _TPPreBatchIter(self)
         if self.num_workers == 0:
             if self.batch_size is None:
                 # We use 'fake' batch size here to identify datasets which perform their own batching
@@ -168,6 +231,57 @@ class FEDataLoader(DataLoader):
         return self.fe_batch_size
 
 
+def _init_worker(worker_id: int, num_threads: int = 0) -> None:
+    """Initialize a data loading worker process.
+
+    Args:
+        worker_id: The id of the worker being initialized.
+        num_threads: How many threads the worker should use to draw the samples of a batch. Values less than 2 disable
+            threading.
+    """
+    np.random.seed(random.randint(0, 2**32 - 1))
+    global _WORKER_THREAD_POOL
+    # The pool (if any) was inherited from the parent process, and its threads did not survive the fork
+    _WORKER_THREAD_POOL = None
+    if num_threads > 1:
+        _WORKER_THREAD_POOL = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix=f"FEWorker{worker_id}")
+
+
+def _fetch_samples(dataset: Dataset, indices: List[Any]) -> List[Any]:
+    """Draw several samples from a `dataset`, using the worker's thread pool if one is available.
+
+    Args:
+        dataset: The dataset to draw from.
+        indices: The indices to draw.
+
+    Returns:
+        The samples corresponding to each of the `indices`, in order.
+    """
+    if _WORKER_THREAD_POOL is None:
+        return [dataset[idx] for idx in indices]
+    return list(_WORKER_THREAD_POOL.map(dataset.__getitem__, indices))
+
+
+def _get_collate_fn(fe_batch_size: Optional[int], batch_size: Optional[int],
+                    collate_fn: Optional[Callable]) -> Callable:
+    """Figure out which collate function a loader should actually use.
+
+    Args:
+        fe_batch_size: The batch size of the data which the loader will produce (or 0 / None if unknown).
+        batch_size: The batch size which torch will use to group samples (or None if the dataset performs batching).
+        collate_fn: The collate function requested by the user, if any.
+
+    Returns:
+        The function to use when collating data.
+    """
+    collate_fn = collate_fn or default_collate
+    if fe_batch_size in (0, None) and batch_size is None and collate_fn == default_collate:
+        # The user did not provide a batch dataset nor a batch size, so default collate won't work. Have to try
+        # convert instead.
+        collate_fn = default_convert
+    return collate_fn
+
+
 def _pre_collate(data: List[Union[FilteredData, Dict[str, Any]]],
                  try_fn: Callable[[List[Union[FilteredData, Dict[str, Any]]]], Dict[str, Any]],
                  postprocess_fn: Optional[Callable[[Dict[str, Any]], Union[Dict[str, Any], FilteredData]]]) -> \
@@ -206,6 +320,14 @@ class _BaseFELoaderIter(_BaseDataLoaderIter, ABC):
     """
     def __init__(self, loader: FEDataLoader):
         super().__init__(loader)
+        self._fe_configure(loader)
+
+    def _fe_configure(self, loader: FEDataLoader) -> None:
+        """Copy the FE-specific sampling configuration from a `loader` onto this iterator.
+
+        Args:
+            loader: The loader whose configuration should be used.
+        """
         self.fe_batch_size = loader.fe_batch_size
         self.fe_drop_last = loader.fe_drop_last
         self.fe_collate_fn = loader.fe_collate_fn
@@ -343,6 +465,204 @@ class _MPPostBatchIter(_BaseFELoaderIter, _MultiProcessingDataLoaderIter):
     __next__ = _next_post_batch
 
 
+class _ThreadDataLoaderIter(_SingleProcessDataLoaderIter):
+    """A single-process iterator which fetches data using a pool of threads.
+
+    Up to 2 fetches per thread are kept in flight at a time, and their results are returned in sampling order.
+
+    Args:
+        loader: The loader to iterate over.
+    """
+    def __init__(self, loader: FEDataLoader):
+        super().__init__(loader)
+        self._fe_prefetch = 2 * loader.fe_num_threads
+        self._fe_tasks = deque()
+        self._fe_thread_pool = ThreadPoolExecutor(max_workers=loader.fe_num_threads, thread_name_prefix="FELoader")
+
+    def _reset(self, loader: FEDataLoader, first_iter: bool = False) -> None:
+        super()._reset(loader, first_iter)
+        self._fe_cancel_tasks()
+
+    def _fe_cancel_tasks(self) -> None:
+        for task in self._fe_tasks:
+            task.cancel()
+        self._fe_tasks.clear()
+
+    def _next_data(self) -> Any:
+        while len(self._fe_tasks) < self._fe_prefetch:
+            try:
+                index = self._next_index()
+            except StopIteration:
+                break
+            self._fe_tasks.append(self._fe_thread_pool.submit(self._dataset_fetcher.fetch, index))
+        if not self._fe_tasks:
+            raise StopIteration
+        data = self._fe_tasks.popleft().result()
+        if self._pin_memory:
+            data = pin_memory(data, self._pin_memory_device)
+        return data
+
+    def _shutdown_workers(self) -> None:
+        self._fe_cancel_tasks()
+        self._fe_thread_pool.shutdown(wait=False)
+
+    def __del__(self):
+        if hasattr(self, '_fe_thread_pool'):
+            self._shutdown_workers()
+
+
+class _TPPreBatchIter(_BaseFELoaderIter, _ThreadDataLoaderIter):
+    __next__ = _next_pre_batch
+
+
+class _TPPostBatchIter(_BaseFELoaderIter, _ThreadDataLoaderIter):
+    __next__ = _next_post_batch
+
+
+class _MPPoolIter(_BaseFELoaderIter, _MultiProcessingDataLoaderIter):
+    """An iterator which owns the worker processes of a PersistentWorkerPool.
+
+    Unlike the other FE iterators, this one is built from the pool's internal loader rather than from an FEDataLoader,
+    and is then re-pointed at whichever FEDataLoader is currently drawing from the pool.
+
+    Args:
+        loader: The internal loader of the PersistentWorkerPool.
+    """
+    def __init__(self, loader: DataLoader):
+        _MultiProcessingDataLoaderIter.__init__(self, loader)
+        self.fe_pre_batch = True
+
+    def _fe_configure(self, loader: FEDataLoader) -> None:
+        super()._fe_configure(loader)
+        # The main process needs the real dataset in case a batch has to be re-drawn by _next_pre_batch
+        self._dataset = loader.dataset
+        self.fe_pre_batch = loader.batch_size is not None
+
+    def __next__(self) -> Dict[str, Tensor]:
+        if self.fe_pre_batch:
+            return _next_pre_batch(self)
+        return _next_post_batch(self)
+
+
+class _PoolSampler(Sampler):
+    """A sampler which forwards the indices of whichever FEDataLoader is currently using a PersistentWorkerPool.
+
+    Each index is tagged with the loader's worker context so that the workers know how to process it.
+    """
+    def __init__(self):
+        super().__init__(data_source=None)
+        self.loader: Optional[FEDataLoader] = None
+
+    def __iter__(self) -> Iterator[Tuple[Hashable, bool, Any]]:
+        loader = self.loader
+        if loader is None:
+            return iter(())
+        pre_batch = loader.batch_size is not None
+        return ((loader.fe_worker_ctx, pre_batch, index) for index in loader._index_sampler)
+
+
+class _PoolDataset(Dataset):
+    """A dataset which lives inside of the PersistentWorkerPool workers and builds per-context datasets on demand.
+
+    Args:
+        resolve_fn: A function which maps a worker context onto the dataset to draw from and the (pre-)collate function
+            to apply to the drawn data.
+        cache_size: How many contexts to remember at a time.
+    """
+    def __init__(self, resolve_fn: Callable[[Hashable], Tuple[Dataset, Callable]], cache_size: int = 8):
+        self.resolve_fn = resolve_fn
+        self.cache_size = cache_size
+        self.contexts: Dict[Hashable, Tuple[Dataset, Callable]] = {}
+
+    def fe_resolve(self, ctx: Hashable) -> Tuple[Dataset, Callable]:
+        if ctx not in self.contexts:
+            if len(self.contexts) >= self.cache_size:
+                # Dicts preserve insertion order, so this evicts the oldest context
+                self.contexts.pop(next(iter(self.contexts)))
+            self.contexts[ctx] = self.resolve_fn(ctx)
+        return self.contexts[ctx]
+
+    def __getitem__(self, index: Any) -> Any:
+        raise NotImplementedError("The PersistentWorkerPool dataset must be accessed through a worker context")
+
+    def __len__(self) -> int:
+        return 0
+
+
+class PersistentWorkerPool:
+    """A pool of data loading worker processes which can be re-used by many FEDataLoaders.
+
+    Normally each FEDataLoader forks its own workers every time it is iterated, which means that a training run pays
+    for worker startup (and page cache warmup) at every epoch and every mode switch. Loaders which share a pool instead
+    send their worker context along with every index, allowing the long-lived workers to reconfigure themselves for the
+    current mode / epoch / ds_id / output keys.
+
+    The workers are forked the first time that a loader draws from the pool, so any changes made to datasets or ops
+    after that point will not be visible to the workers until the pool is shut down and restarted.
+
+    This class is intentionally not @traceable.
+
+    Args:
+        resolve_fn: A function which, given a worker context, returns the dataset and the (pre-)collate function which
+            a worker should use for that context. This is invoked inside of the worker processes, so it must rely only
+            on state which was available when the workers were forked.
+        num_workers: How many worker processes to run.
+        num_threads: How many threads each worker process should use to draw the samples of a batch (as in the 'hybrid'
+            FEDataLoader executor). Values less than 2 disable threading.
+    """
+    def __init__(self, resolve_fn: Callable[[Hashable], Tuple[Dataset, Callable]], num_workers: int,
+                 num_threads: int = 0):
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be a positive integer, but got {num_workers}")
+        self.num_workers = num_workers
+        self._sampler = _PoolSampler()
+        self._loader = DataLoader(dataset=_PoolDataset(resolve_fn),
+                                  batch_size=None,
+                                  sampler=self._sampler,
+                                  num_workers=num_workers,
+                                  persistent_workers=True,
+                                  worker_init_fn=functools.partial(_init_worker, num_threads=num_threads))
+        self._loader._dataset_kind = FEDataLoader.FE_POOL_KIND
+        self._iterator: Optional[_MPPoolIter] = None
+
+    def get_iterator(self, loader: FEDataLoader) -> _MPPoolIter:
+        """Point the pool at a new `loader`, starting the worker processes if they are not already running.
+
+        Args:
+            loader: The loader which will be drawing data from the pool.
+
+        Returns:
+            An iterator over the data from the `loader`, computed using the pool's workers.
+        """
+        self._sampler.loader = loader
+        if self._iterator is None:
+            with Suppressor(allow_pyprint=True):  # Prevent unnecessary warnings about resetting numbers of threads
+                self._iterator = _MPPoolIter(self._loader)
+            FEDataLoader._current_threads.extend([w.pid for w in self._iterator._workers])
+        else:
+            # Drains any in-flight work from the previous loader and then starts prefetching for the new one
+            self._iterator._reset(self._loader)
+        self._iterator._fe_configure(loader)
+        return self._iterator
+
+    def is_running(self) -> bool:
+        """Whether the pool currently has live worker processes.
+
+        Returns:
+            True iff the worker processes have been started and not yet shut down.
+        """
+        return self._iterator is not None
+
+    def shutdown(self) -> None:
+        """Stop the pool's worker processes. They will be restarted if the pool is used again.
+        """
+        if self._iterator is not None:
+            self._iterator._shutdown_workers()
+            self._iterator = None
+            FEDataLoader._current_threads.clear()
+        self._sampler.loader = None
+
+
 class InfiniteSampler(Sampler):
     """A class which never stops sampling.
 
@@ -376,8 +696,7 @@ class InfiniteSampler(Sampler):
         self.idx = 0
         if self.reset_fn:
             self.reset_fn(self.shuffle)
-        if self.shuffle:
-            random.shuffle(self.indices)
+        self._reorder(new_epoch=True)
         return self
 
     def __next__(self):
@@ -385,14 +704,128 @@ class InfiniteSampler(Sampler):
             self.idx = 0
             if self.reset_fn:
                 self.reset_fn(self.shuffle)
-            if self.shuffle:
-                random.shuffle(self.indices)
+            self._reorder(new_epoch=False)
         elem = self.indices[self.idx]
         self.idx += 1
         if self.convert_fn:
             elem = self.convert_fn(elem)
         return elem
 
+    def _reorder(self, new_epoch: bool) -> None:
+        """Decide on the order in which to visit the dataset during the next pass over it.
+
+        Args:
+            new_epoch: Whether this is the start of a new iteration over the sampler, as opposed to the sampler having
+                wrapped around in the middle of an iteration.
+        """
+        if self.shuffle:
+            random.shuffle(self.indices)
+
+
+class LengthBucketSampler(InfiniteSampler):
+    """An InfiniteSampler which groups samples of similar length together so that batches need less padding.
+
+    On every pass over the dataset the indices are (optionally) shuffled, and then divided into pools of `pool_size`
+    batches. Each pool is sorted by length and cut into batches, and then the order of the batches is shuffled so that
+    the model does not see the data in order of length. Larger pools reduce the amount of padding, but make the batches
+    less random. When not shuffling, the whole dataset is sorted at once. Indices are produced one at a time, so
+    consecutive runs of `batch_size` indices make up each batch. If a pass over the dataset does not end on a batch
+    boundary, the next pass begins with a smaller group which completes the partial batch so that subsequent batches
+    remain aligned with the buckets.
+
+    Args:
+        data_source: The dataset to be sampled.
+        lengths: The length of every element of the `data_source`.
+        batch_size: The batch size which will be used to draw from this sampler.
+        pool_size: How many batches worth of samples to sort together.
+        shuffle: Whether to shuffle when sampling.
+        reset_fn: A function to be invoked (using the provided `shuffle` arg) every time the dataset has been fully
+            traversed.
+        convert_fn: A function to be invoked (using the current index) every sample in order to convert an integer index
+            into some arbitrary alternative index representation.
+
+    Raises:
+        ValueError: If the number of `lengths` does not match the size of the `data_source`, or if the `batch_size` or
+            `pool_size` are invalid.
+    """
+    def __init__(self,
+                 data_source: Sized,
+                 lengths: Sequence[int],
+                 batch_size: int,
+                 pool_size: int = 100,
+                 shuffle: bool = True,
+                 reset_fn: Optional[Callable[[bool], None]] = None,
+                 convert_fn: Optional[Callable[[int], Any]] = None):
+        super().__init__(data_source=data_source, shuffle=shuffle, reset_fn=reset_fn, convert_fn=convert_fn)
+        self.lengths = np.asarray(lengths)
+        if len(self.lengths) != self.ds_len:
+            raise ValueError(f"Expected {self.ds_len} lengths, but got {len(self.lengths)}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be a positive integer, but got {batch_size}")
+        if pool_size < 1:
+            raise ValueError(f"pool_size must be a positive integer, but got {pool_size}")
+        self.batch_size = batch_size
+        self.pool_size = pool_size
+        # How many indices of the current batch were already produced at the end of the previous pass
+        self.offset = 0
+        # The fraction of each batch which is padding, with and without bucketing, during the most recent pass
+        self.padding_ratio = 0.0
+        self.unbucketed_padding_ratio = 0.0
+        self._reorder(new_epoch=True)
+
+    def _reorder(self, new_epoch: bool) -> None:
+        """Decide on the order in which to visit the dataset during the next pass over it.
+
+        Args:
+            new_epoch: Whether this is the start of a new iteration over the sampler, as opposed to the sampler having
+                wrapped around in the middle of an iteration.
+        """
+        if new_epoch:
+            self.offset = 0
+        indices = np.arange(self.ds_len)
+        if self.shuffle:
+            indices = np.array(random.sample(range(self.ds_len), self.ds_len))
+        # The first group completes any batch which was left partially filled by the previous pass
+        head = (self.batch_size - self.offset) % self.batch_size
+        pool = self.batch_size * self.pool_size if self.shuffle else self.ds_len
+        pools = [indices[:head]] + [indices[start:start + pool] for start in range(head, self.ds_len, pool)]
+        head_group, groups = None, []
+        for chunk in pools:
+            if chunk.size == 0:
+                continue
+            # Longest first, so that any partial batch at the end of the pass is made of the shortest samples
+            chunk = chunk[np.argsort(-self.lengths[chunk], kind='stable')]
+            for start in range(0, chunk.size, self.batch_size):
+                group = chunk[start:start + self.batch_size]
+                if head_group is None and head:
+                    head_group = group
+                else:
+                    groups.append(group)
+        tail = groups.pop() if groups and groups[-1].size < self.batch_size else None
+        if self.shuffle:
+            random.shuffle(groups)
+        groups = ([head_group] if head_group is not None else []) + groups + ([tail] if tail is not None else [])
+        self.indices = np.concatenate(groups).tolist()
+        self.offset = (self.offset + self.ds_len) % self.batch_size
+        self.padding_ratio = self._get_padding_ratio(groups)
+        # Compare against batches of the same sizes drawn from the un-sorted indices
+        self.unbucketed_padding_ratio = self._get_padding_ratio(
+            np.split(indices, np.cumsum([group.size for group in groups])[:-1]))
+
+    def _get_padding_ratio(self, groups: List[np.ndarray]) -> float:
+        """Compute what fraction of the elements of a collection of batches would be padding.
+
+        Args:
+            groups: The indices of each batch.
+
+        Returns:
+            The fraction of padding elements after padding every batch to the length of its longest sample.
+        """
+        total = sum(int(self.lengths[group].max()) * group.size for group in groups)
+        if total == 0:
+            return 0.0
+        return 1.0 - float(sum(int(self.lengths[group].sum()) for group in groups)) / total
+
 
 ###
 # Here we use a hack to patch a special fetcher into the pytorch ecosystem. This allows us to return the dataset indices
@@ -404,18 +837,30 @@ class InfiniteSampler(Sampler):
 class _IdxMapDatasetFetcher(_MapDatasetFetcher):
     def fetch(self, possibly_batched_index):
         if self.auto_collation:
-            data = [self.dataset[idx] for idx in possibly_batched_index]
+            data = _fetch_samples(self.dataset, possibly_batched_index)
         else:
             data = self.dataset[possibly_batched_index]
         return possibly_batched_index, self.collate_fn(data)
 
 
+class _PoolMapDatasetFetcher(_MapDatasetFetcher):
+    def fetch(self, ctx_index):
+        ctx, pre_batch, possibly_batched_index = ctx_index
+        dataset, collate_fn = self.dataset.fe_resolve(ctx)
+        if pre_batch:
+            data = _fetch_samples(dataset, possibly_batched_index)
+            return possibly_batched_index, collate_fn(data)
+        return collate_fn(dataset[possibly_batched_index])
+
+
 if not hasattr(_DatasetKind, '_original_create_fetcher'):
     _DatasetKind._original_create_fetcher = _DatasetKind.create_fetcher
 
     def _create_fetcher(kind, dataset, auto_collation, collate_fn, drop_last):
         if kind == FEDataLoader.FE_LOADER_KIND:
             return _IdxMapDatasetFetcher(dataset, auto_collation, collate_fn, drop_last)
+        elif kind == FEDataLoader.FE_POOL_KIND:
+            return _PoolMapDatasetFetcher(dataset, auto_collation, collate_fn, drop_last)
         else:
             return _DatasetKind._original_create_fetcher(kind, dataset, auto_collation, collate_fn, drop_last)
 
@@ -298,13 +298,7 @@ class FEDataset(Dataset):
         seed_offset = 0
 
         # Compute the distribution over the stratify key
-        distribution = defaultdict(list)
-        for idx in range(original_size):
-            sample = self[idx]
-            key = sample[stratify]
-            if hasattr(key, "tobytes"):
-                key = key.tobytes()  # Makes numpy arrays hashable
-            distribution[key].append(idx)
+        distribution = self._get_stratify_distribution(stratify)
 
         supply = {key: len(values) for key, values in distribution.items()}
         split_requests = [{key: (n_split * n_tot) / original_size
@@ -365,6 +359,25 @@ class FEDataset(Dataset):
             splits.append(split_indices)
         return splits
 
+    def _get_stratify_distribution(self, stratify: str) -> Dict[Any, List[int]]:
+        """Find which indices of the dataset belong to each class.
+
+        Args:
+            stratify: A class key within the dataset.
+
+        Returns:
+            A dictionary of {class: [indices]}, with classes ordered by their first appearance in the dataset and indices
+            in ascending order.
+        """
+        distribution = defaultdict(list)
+        for idx in range(self._split_length()):
+            sample = self[idx]
+            key = sample[stratify]
+            if hasattr(key, "tobytes"):
+                key = key.tobytes()  # Makes numpy arrays hashable
+            distribution[key].append(idx)
+        return distribution
+
     def _get_fractional_splits(self, split_counts: List[int], seed: Optional[int]) -> Sequence[Iterable[int]]:
         """Get sequence(s) of indices to split from the current dataset in order to generate new dataset(s).
 
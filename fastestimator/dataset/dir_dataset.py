@@ -29,6 +29,9 @@ class DirDataset(InMemoryDataset):
         data_key: What key to assign to the data values in the data dictionary.
         file_extension: If provided then only files ending with the file_extension will be included.
         recursive_search: Whether to search within subdirectories for files.
+        cache_dir: A directory in which to cache the list of files found within the `root_dir`. Later constructions of
+            the dataset will then re-use the cached list unless the contents of the `root_dir` have changed. See
+            fe.util.list_files for details.
     """
     data: Dict[int, Dict[str, str]]
 
@@ -36,10 +39,13 @@ class DirDataset(InMemoryDataset):
                  root_dir: str,
                  data_key: str = "x",
                  file_extension: Optional[str] = None,
-                 recursive_search: bool = True) -> None:
+                 recursive_search: bool = True,
+                 cache_dir: Optional[str] = None) -> None:
         root_dir = os.path.normpath(root_dir)
         self.root_dir = root_dir
-        data = list_files(root_dir=root_dir, file_extension=file_extension, recursive_search=recursive_search)
-        # Sort the data so that deterministic split will work properly
-        data.sort()
+        # The files are sorted so that deterministic split will work properly
+        data = list_files(root_dir=root_dir,
+                          file_extension=file_extension,
+                          recursive_search=recursive_search,
+                          cache_dir=cache_dir)
         super().__init__({i: {data_key: data[i]} for i in range(len(data))})
@@ -13,10 +13,10 @@
 # limitations under the License.
 # ==============================================================================
 import os
-from collections import deque
 from typing import Any, Dict, Optional
 
 from fastestimator.dataset.dataset import DatasetSummary, InMemoryDataset
+from fastestimator.util.base_util import list_files
 from fastestimator.util.traceability_util import traceable
 
 
@@ -30,6 +30,9 @@ class LabeledDirDataset(InMemoryDataset):
         label_key: What key to assign to the label values in the data dictionary.
         label_mapping: A dictionary defining the mapping to use. If not provided will map classes to int labels.
         file_extension: If provided then only files ending with the file_extension will be included.
+        cache_dir: A directory in which to cache the list of files found within the `root_dir`. Later constructions of
+            the dataset will then re-use the cached list unless the contents of the `root_dir` have changed. See
+            fe.util.list_files for details.
     """
     data: Dict[int, Dict[str, Any]]
     mapping: Dict[str, Any]
@@ -40,21 +43,14 @@ class LabeledDirDataset(InMemoryDataset):
                  data_key: str = "x",
                  label_key: str = "y",
                  label_mapping: Optional[Dict[str, Any]] = None,
-                 file_extension: Optional[str] = None) -> None:
-        # Recursively find all the data
+                 file_extension: Optional[str] = None,
+                 cache_dir: Optional[str] = None) -> None:
+        # Recursively find all the data, grouping it by the folder it was found in
         root_dir = os.path.normpath(root_dir)
         data = {}
-        keys = deque([""])
-        for _, dirs, entries in os.walk(root_dir):
-            key = keys.popleft()
-            dirs = [os.path.join(key, d) for d in dirs]
-            dirs.reverse()
-            keys.extendleft(dirs)
-            entries = [
-                os.path.join(key, e) for e in entries if not e.startswith(".") and e.endswith(file_extension or "")
-            ]
-            if entries:
-                data[key] = entries
+        for path in list_files(root_dir=root_dir, file_extension=file_extension, cache_dir=cache_dir):
+            key = os.path.relpath(os.path.dirname(path), root_dir)
+            data.setdefault("" if key == "." else key, []).append(path)
         # Compute label mappings
         self.mapping = label_mapping or {label: idx for idx, label in enumerate(sorted(data.keys()))}
         assert self.mapping.keys() >= data.keys(), \
@@ -68,7 +64,7 @@ class LabeledDirDataset(InMemoryDataset):
             # Sort the values so that deterministic splitting works
             values.sort()
             for value in values:
-                parsed_data[idx] = {data_key: os.path.join(root_dir, value), label_key: label}
+                parsed_data[idx] = {data_key: value, label_key: label}
                 idx += 1
         self.label_key = label_key
         super().__init__(parsed_data)
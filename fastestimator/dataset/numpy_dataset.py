@@ -24,6 +24,9 @@ from fastestimator.util.traceability_util import traceable
 class NumpyDataset(InMemoryDataset):
     """A dataset constructed from a dictionary of Numpy data or list of data.
 
+    This dataset splits its inputs into one dictionary per instance. For large datasets, consider ColumnarDataset
+    instead, which keeps the original arrays intact and is therefore much faster to construct, split, and summarize.
+
     Args:
         data: A dictionary of data like {"key1": <numpy array>, "key2": [list]}.
     Raises:
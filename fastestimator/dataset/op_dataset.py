@@ -13,6 +13,8 @@
 # limitations under the License.
 # ==============================================================================
 import ctypes
+import hashlib
+import types
 from copy import deepcopy
 from multiprocessing import Array, Lock
 from typing import Any, Dict, List, Optional, Set, Union
@@ -21,7 +23,7 @@ import numpy as np
 from natsort import humansorted
 from torch.utils.data import Dataset
 
-from fastestimator.op.numpyop.numpyop import NumpyOp, forward_numpyop
+from fastestimator.op.numpyop.numpyop import Cache, NumpyOp, forward_numpyop
 from fastestimator.util.base_util import warn
 from fastestimator.util.data import FilteredData
 from fastestimator.util.traceability_util import traceable
@@ -103,6 +105,38 @@ class _DelayedDeepDict(dict):
         return dict(self)
 
 
+def _get_op_config(obj: Any, depth: int = 0) -> Any:
+    """Build a stable (between program runs) description of an object's configuration.
+
+    Args:
+        obj: The object to be described (ex. a NumpyOp).
+        depth: How deep into the object hierarchy the description currently is.
+
+    Returns:
+        A nested structure of primitives whose repr describes the `obj`.
+    """
+    if obj is None or isinstance(obj, (bool, int, float, str, bytes)):
+        return obj
+    if isinstance(obj, np.ndarray):
+        return 'ndarray', obj.dtype.str, obj.shape, hashlib.md5(np.ascontiguousarray(obj).tobytes()).hexdigest()
+    if isinstance(obj, (types.FunctionType, types.MethodType)):
+        code = getattr(obj, '__code__', None) or obj.__func__.__code__
+        return obj.__qualname__, hashlib.md5(code.co_code + repr(code.co_consts).encode('utf8')).hexdigest()
+    if depth > 3:
+        return type(obj).__qualname__
+    if isinstance(obj, (list, tuple, set, frozenset)):
+        config = [_get_op_config(elem, depth + 1) for elem in obj]
+        return sorted(config, key=repr) if isinstance(obj, (set, frozenset)) else config
+    if isinstance(obj, dict):
+        return sorted(((repr(key), _get_op_config(val, depth + 1)) for key, val in obj.items()), key=repr)
+    if hasattr(obj, '__dict__'):
+        # Skip the traceability bookkeeping, which is keyed by object ids
+        state = {key: val for key, val in vars(obj).items() if not key.startswith('_fe_')}
+        return type(obj).__qualname__, _get_op_config(state, depth + 1)
+    description = repr(obj)
+    return type(obj).__qualname__ if " at 0x" in description else description
+
+
 @traceable(blacklist='lock')
 class OpDataset(Dataset):
     """A wrapper for datasets which allows operators to be applied to them in a pipeline.
@@ -117,13 +151,15 @@ class OpDataset(Dataset):
         output_keys: What keys can be produced from pipeline. If None or empty, all keys will be considered.
         deep_remainder: Whether data which is not modified by Ops should be deep copied or not. This argument is used to
             help with RAM management, but end users can almost certainly ignore it.
+        ds_id: What dataset id the system is currently running with. Used to distinguish cached data between datasets.
     """
     def __init__(self,
                  dataset: Dataset,
                  ops: List[NumpyOp],
                  mode: str,
                  output_keys: Optional[Set[str]] = None,
-                 deep_remainder: bool = True) -> None:
+                 deep_remainder: bool = True,
+                 ds_id: str = '') -> None:
         # Track whether this dataset returns batches or not (useful for pipeline and traceability)
         if not hasattr(dataset, "fe_batch"):
             sample_item = dataset[0]
@@ -138,12 +174,84 @@ class OpDataset(Dataset):
         self.mode = mode
         self.output_keys = output_keys
         self.deep_remainder = deep_remainder
+        self.ds_id = ds_id
+        # Look for a Cache Op, which indicates that the outputs of the preceding ops can be re-used between epochs
+        self.cache_idx = -1
+        self.cache_namespace = None
+        if not self.fe_batch:
+            for idx, op in enumerate(ops):
+                if isinstance(op, Cache):
+                    self.cache_idx = idx
+                    self.cache_namespace = self._get_cache_namespace()
+                    break
         self.lock = Lock()
         self.to_warn: Set[str] = set()
         if not hasattr(OpDataset, 'warned'):
             # Declaring this outside the init would trigger mac multi-processing to pick a non-fork start method
             OpDataset.warned = Array(ctypes.c_char, 200, lock=False)
 
+    def _get_cache_namespace(self) -> Any:
+        """Generate a key which distinguishes the cached data of this dataset from that of any other OpDataset.
+
+        OpDatasets are re-built every epoch (and persistent caches may outlive the program), so the key depends on the
+        configuration of the dataset and the cached ops rather than on object identities. Caches which persist data
+        can use the signature to detect when their contents have gone stale. Ops may mutate their own state while
+        running, so the key is computed only once per program run and then re-used.
+
+        Returns:
+            A key to be combined with sample indices when accessing the cache.
+        """
+        cache = self.ops[self.cache_idx]
+        keep = self._get_cache_keys()
+        keep = None if keep is None else sorted(keep)
+        slot = f"{self.mode}:{self.ds_id}"
+        run_key = (slot, id(self.dataset), tuple(id(op) for op in self.ops[:self.cache_idx]), repr(keep))
+        if run_key not in cache.namespaces:
+            config = (type(self.dataset).__qualname__, len(self.dataset),
+                      [_get_op_config(op) for op in self.ops[:self.cache_idx]], keep)
+            signature = hashlib.md5(repr(config).encode('utf8')).hexdigest()
+            cache.namespaces[run_key] = cache.storage.get_namespace(slot=slot, signature=signature)
+        return cache.namespaces[run_key]
+
+    def _get_cache_keys(self) -> Optional[Set[str]]:
+        """Figure out which keys need to be kept when caching data.
+
+        Returns:
+            The keys which are required by the output or by the ops following the Cache Op, or None to keep all keys.
+        """
+        if not self.output_keys:
+            return None
+        keep = set(self.output_keys)
+        for op in self.ops[self.cache_idx + 1:]:
+            keep.update(op.inputs)
+        return keep
+
+    def _get_cached_item(self, index: int) -> Union[Dict[str, Any], FilteredData]:
+        """Fetch a data instance which has been processed by all of the ops preceding the Cache Op.
+
+        Args:
+            index: Which datapoint to retrieve.
+
+        Returns:
+            The data dictionary from the specified index, after applying the cached ops (OR an indication that this
+            index should be thrown out).
+        """
+        storage = self.ops[self.cache_idx].storage
+        key = (self.cache_namespace, index)
+        item = storage.get(key)
+        if item is None:
+            item = _DelayedDeepDict(self.dataset[index])
+            filter_data = forward_numpyop(self.ops[:self.cache_idx], item, {'mode': self.mode})
+            if filter_data:
+                item = filter_data
+            else:
+                # Any data not modified by the ops still belongs to the dataset, but it will be copied later if needed
+                item.finalize(deep_remainder=False)
+                keep = self._get_cache_keys()
+                item = {key: val for key, val in item.items() if keep is None or key in keep}
+            storage.put(key, item)
+        return item
+
     def __getitem__(self, index: int) -> Union[Dict[str, Any], List[Dict[str, Any]], FilteredData]:
         """Fetch a data instance at a specified index, and apply transformations to it.
 
@@ -154,7 +262,14 @@ class OpDataset(Dataset):
             The data dictionary from the specified index, with transformations applied OR an indication that this index
             should be thrown out.
         """
-        item = self.dataset[index]
+        ops = self.ops
+        if self.cache_idx >= 0:
+            item = self._get_cached_item(index)
+            if isinstance(item, FilteredData):
+                return item
+            ops = self.ops[self.cache_idx + 1:]
+        else:
+            item = self.dataset[index]
         if isinstance(item, list):
             # BatchDataset may randomly sample the same elements multiple times, so need to avoid reprocessing
             unique_samples = {}  # id: idx
@@ -163,7 +278,7 @@ class OpDataset(Dataset):
                 data_id = id(data)
                 if data_id not in unique_samples:
                     data = _DelayedDeepDict(data)
-                    filter_data = forward_numpyop(self.ops, data, {'mode': self.mode})
+                    filter_data = forward_numpyop(ops, data, {'mode': self.mode})
                     if filter_data:
                         results.append(filter_data)
                     else:
@@ -176,7 +291,7 @@ class OpDataset(Dataset):
                     results.append(results[unique_samples[data_id]])
         else:
             results = _DelayedDeepDict(item)
-            filter_data = forward_numpyop(self.ops, results, {'mode': self.mode})
+            filter_data = forward_numpyop(ops, results, {'mode': self.mode})
             if filter_data:
                 return filter_data
             results.finalize(retain=self.output_keys, deep_remainder=self.deep_remainder)
@@ -0,0 +1,190 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import mmap
+import os
+import pickle
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from fastestimator.dataset.columnar_dataset import ColumnarDataset
+from fastestimator.dataset.dataset import FEDataset
+from fastestimator.util.traceability_util import traceable
+
+
+@traceable(blacklist=('columns', '_summary', '_owned', '_maps', '_maps_pid'))
+class RecordDataset(ColumnarDataset):
+    """A dataset which provides random access to files which have been packed into a few large shard files.
+
+    Datasets like DirDataset or CSVDataset tend to reference millions of tiny files, which then have to be opened one at
+    a time by Ops like ReadImage. On network filesystems the per-file metadata overhead can dominate the read time.
+    RecordDataset.pack() copies the raw bytes of every referenced file into a small number of large shards, alongside an
+    index of byte offsets. A RecordDataset then memory-maps those shards, and returns each file as a read-only uint8
+    array which points directly into the mapped memory. ReadImage can decode these arrays directly.
+
+    ```python
+    ds = fe.dataset.LabeledDirDataset("/data/imagenet/train")  # {"x": <path>, "y": <label>}
+    ds = fe.dataset.RecordDataset.pack(ds, save_dir="/data/imagenet/train_records")
+    # Later on:
+    ds = fe.dataset.RecordDataset("/data/imagenet/train_records")  # {"x": <encoded bytes>, "y": <label>}
+    pipeline = fe.Pipeline(train_data=ds, ops=[ReadImage(inputs="x", outputs="x"), ...])
+    ```
+
+    When accessing an entire column (ex. ds["x"]), packed file keys return an <N, 3> array of (shard, offset, size)
+    entries rather than the file contents.
+
+    Args:
+        record_dir: The directory which was written by RecordDataset.pack().
+
+    Raises:
+        ValueError: If the `record_dir` does not contain a compatible index file.
+    """
+    version = 1
+    index_name = "records.index"
+
+    def __init__(self, record_dir: str) -> None:
+        record_dir = os.path.normpath(record_dir)
+        index_path = os.path.join(record_dir, self.index_name)
+        if not os.path.exists(index_path):
+            raise ValueError(f"No RecordDataset index was found at {index_path}")
+        with open(index_path, 'rb') as file:
+            index = pickle.load(file)
+        if index.get('version') != self.version:
+            raise ValueError(f"RecordDataset index at {index_path} has version {index.get('version')}, but version "
+                             f"{self.version} is required. Please re-pack the data.")
+        self.record_dir = record_dir
+        self.shards = index['shards']
+        self.file_keys = index['file_keys']
+        self._maps = {}
+        self._maps_pid = None
+        super().__init__(index['columns'])
+
+    def __getitem__(self, index: Union[int, str]) -> Union[Dict[str, Any], np.ndarray, List[Any]]:
+        """Look up data from the dataset.
+
+        Args:
+            index: Either an int corresponding to a particular element of data, or a string in which case the
+                corresponding column of data will be returned.
+
+        Returns:
+            A data dictionary if the index was an int, otherwise a column of data. The packed file keys of a data
+            dictionary hold the raw bytes of their files as read-only uint8 arrays.
+        """
+        item = super().__getitem__(index)
+        if isinstance(index, (int, np.integer)):
+            for key in self.file_keys:
+                item[key] = self._read(*item[key])
+        return item
+
+    def _read(self, shard: int, offset: int, nbytes: int) -> np.ndarray:
+        """Get the bytes of a packed file.
+
+        Args:
+            shard: Which shard the file is in.
+            offset: Where the file starts within the shard.
+            nbytes: How large the file is.
+
+        Returns:
+            A read-only view of the file's bytes.
+        """
+        if self._maps_pid != os.getpid():
+            # Don't share file handles with a parent process
+            self._maps = {}
+            self._maps_pid = os.getpid()
+        if nbytes == 0:
+            return np.zeros((0, ), dtype=np.uint8)
+        buffer = self._maps.get(shard)
+        if buffer is None:
+            with open(os.path.join(self.record_dir, self.shards[shard]), 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            # dict.setdefault is atomic, so concurrent threads will agree on which map to use
+            buffer = self._maps.setdefault(shard, buffer)
+        return np.frombuffer(buffer, dtype=np.uint8, count=int(nbytes), offset=int(offset))
+
+    @classmethod
+    def pack(cls,
+             dataset: FEDataset,
+             save_dir: str,
+             file_keys: Union[None, str, Iterable[str]] = None,
+             parent_path: Optional[str] = None,
+             shard_size_mb: float = 1024) -> 'RecordDataset':
+        """Pack the files referenced by a `dataset` into a RecordDataset.
+
+        Args:
+            dataset: The dataset to pack, for example a DirDataset, LabeledDirDataset, or CSVDataset. Every instance must
+                have the same keys.
+            save_dir: The (preferably empty) directory in which to write the shards and their index.
+            file_keys: Which keys of the `dataset` contain file paths whose contents should be packed. If None, any key
+                whose value is a string pointing to an existing file in the first instance of the `dataset` will be
+                packed. All other keys are stored in the index as-is.
+            parent_path: A path to prepend to relative file paths. If None, the `dataset`'s parent_path attribute will
+                be used if it has one (as in CSVDataset).
+            shard_size_mb: The approximate size of each shard in megabytes. A new shard is started once this size has
+                been exceeded.
+
+        Returns:
+            A RecordDataset reading from the newly written shards.
+
+        Raises:
+            ValueError: If the `dataset` is empty or `shard_size_mb` is not positive.
+        """
+        if len(dataset) == 0:
+            raise ValueError("Cannot pack an empty dataset")
+        if shard_size_mb <= 0:
+            raise ValueError(f"shard_size_mb must be positive, but got {shard_size_mb}")
+        if parent_path is None:
+            parent_path = getattr(dataset, 'parent_path', '') or ''
+        first = dataset[0]
+        if file_keys is None:
+            file_keys = [
+                key for key, val in first.items()
+                if isinstance(val, str) and os.path.isfile(os.path.join(parent_path, val))
+            ]
+        elif isinstance(file_keys, str):
+            file_keys = [file_keys]
+        else:
+            file_keys = list(file_keys)
+        save_dir = os.path.normpath(save_dir)
+        os.makedirs(save_dir, exist_ok=True)
+        shard_limit = shard_size_mb * 1024 * 1024
+        shards = []
+        columns = {key: [] for key in first.keys() if key not in file_keys}
+        pointers = {key: np.zeros((len(dataset), 3), dtype=np.int64) for key in file_keys}
+        shard_file = None
+        try:
+            for idx in range(len(dataset)):
+                instance = dataset[idx]
+                if shard_file is None or shard_file.tell() >= shard_limit:
+                    if shard_file is not None:
+                        shard_file.close()
+                    shards.append(f"records-{len(shards):05d}.shard")
+                    shard_file = open(os.path.join(save_dir, shards[-1]), 'wb')
+                for key in file_keys:
+                    with open(os.path.join(parent_path, instance[key]), 'rb') as file:
+                        contents = file.read()
+                    pointers[key][idx] = (len(shards) - 1, shard_file.tell(), len(contents))
+                    shard_file.write(contents)
+                for key, column in columns.items():
+                    column.append(instance[key])
+        finally:
+            if shard_file is not None:
+                shard_file.close()
+        # The index is written last so that an interrupted pack can't be mistaken for a complete one
+        index = {'version': cls.version, 'shards': shards, 'file_keys': file_keys, 'columns': {**columns, **pointers}}
+        with open(os.path.join(save_dir, cls.index_name), 'wb') as file:
+            pickle.dump(index, file, protocol=pickle.HIGHEST_PROTOCOL)
+        print("FastEstimator-RecordDataset: Packed {} instances into {} shard(s) at {}".format(
+            len(dataset), len(shards), save_dir))
+        return cls(save_dir)
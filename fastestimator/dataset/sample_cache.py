@@ -0,0 +1,504 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from fastestimator.util.base_util import warn
+from fastestimator.util.data import FilteredData
+
+CacheEntry = Union[Dict[str, Any], FilteredData]
+
+
+class SampleCache(ABC):
+    """A base class for storing pre-processed data samples so that they don't need to be re-computed every epoch.
+
+    This class is intentionally not @traceable.
+
+    Args:
+        max_bytes: The (approximate) maximum size of the cache. Once this size is exceeded, the least recently used
+            entries will be evicted. None indicates that the cache size is unlimited.
+
+    Raises:
+        ValueError: If `max_bytes` is invalid.
+    """
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"max_bytes must be None or a positive integer, but got {max_bytes}")
+        self.max_bytes = max_bytes
+
+    def get_namespace(self, slot: str, signature: str) -> Hashable:
+        """Get the namespace under which to store the samples of a particular dataset.
+
+        Keys passed to `get` and `put` should be (namespace, sample index) tuples.
+
+        Args:
+            slot: A stable identifier for the data being cached (ex. the mode and ds_id it belongs to).
+            signature: A description of the configuration which generated the data (ex. the dataset and ops).
+
+        Returns:
+            The namespace to use when accessing the cache.
+        """
+        return slot, signature
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        """Retrieve an entry from the cache.
+
+        Args:
+            key: The key of the entry to retrieve.
+
+        Returns:
+            The cached entry, or None if the `key` is not in the cache.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def put(self, key: Hashable, value: CacheEntry) -> None:
+        """Add an entry to the cache, evicting old entries if necessary to respect the cache size limit.
+
+        Args:
+            key: The key under which to store the `value`.
+            value: The entry to be stored.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all entries from the cache.
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(SampleCache):
+    """A cache which holds samples in the memory of the current process.
+
+    Note that each process has its own copy of the cache, so entries which are added from within a forked worker process
+    will not be visible to the main process or to any other worker.
+
+    This class is intentionally not @traceable.
+
+    Args:
+        max_bytes: The (approximate) maximum size of the cache. Once this size is exceeded, the least recently used
+            entries will be evicted. None indicates that the cache size is unlimited.
+    """
+    def __init__(self, max_bytes: Optional[int] = None) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self.sizes: Dict[Hashable, int] = {}
+        self.n_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: CacheEntry) -> None:
+        size = _get_size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = value
+            self.sizes[key] = size
+            self.n_bytes += size
+            while self.max_bytes is not None and self.n_bytes > self.max_bytes:
+                old_key, _ = self.entries.popitem(last=False)
+                self.n_bytes -= self.sizes.pop(old_key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.n_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class DiskCache(SampleCache):
+    """A cache which stores samples as individual files within a directory.
+
+    The cache directory can be shared by multiple processes at the same time, so entries which are written by one data
+    loading worker can be read by all of the others. Entries which are not used for the longest time are evicted first.
+    Note that the directory is not cleaned up automatically, so you should delete it once you no longer need it.
+
+    This class is intentionally not @traceable.
+
+    Args:
+        cache_dir: The directory in which to store cached samples. It will be created if it does not already exist.
+        max_bytes: The (approximate) maximum size of the cache. Once this size is exceeded, the least recently used
+            entries will be evicted. None indicates that the cache size is unlimited.
+    """
+    _suffix = ".fecache"
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.cache_dir = os.path.normpath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # An estimate of the current cache size. Since the directory may be shared between processes, this gets
+        # re-computed from the file system whenever it seems that an eviction might be necessary.
+        self.n_bytes: Optional[int] = None
+        self.lock = threading.Lock()
+
+    def _get_path(self, key: Hashable) -> str:
+        return os.path.join(self.cache_dir, hashlib.md5(repr(key).encode('utf8')).hexdigest() + self._suffix)
+
+    def get(self, key: Hashable) -> Optional[CacheEntry]:
+        path = self._get_path(key)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+            os.utime(path)  # Track the access time for LRU eviction
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+            # The file either doesn't exist or else was evicted while it was being read
+            return None
+        return value
+
+    def put(self, key: Hashable, value: CacheEntry) -> None:
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self.max_bytes is not None and len(data) > self.max_bytes:
+            return
+        path = self._get_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as file:
+            file.write(data)
+        # Atomic, so other processes will never observe a partially written entry
+        os.replace(tmp_path, path)
+        if self.max_bytes is not None:
+            with self.lock:
+                if self.n_bytes is None:
+                    self.n_bytes = self._scan_size()
+                else:
+                    self.n_bytes += len(data)
+                if self.n_bytes > self.max_bytes:
+                    self._evict()
+
+    def _list_entries(self) -> List[Tuple[float, int, str]]:
+        """Find all of the entries which are currently stored in the cache directory.
+
+        Returns:
+            A list of (last access time, size in bytes, path) tuples, sorted from least to most recently used.
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(self._suffix):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Another process evicted it already
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def _scan_size(self) -> int:
+        return sum(entry[1] for entry in self._list_entries())
+
+    def _evict(self) -> None:
+        """Delete the least recently used files until the cache is back under 90% of its maximum size.
+        """
+        entries = self._list_entries()
+        n_bytes = sum(entry[1] for entry in entries)
+        target = 0.9 * self.max_bytes
+        for _, size, path in entries:
+            if n_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            n_bytes -= size
+        self.n_bytes = n_bytes
+
+    def clear(self) -> None:
+        for _, _, path in self._list_entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.n_bytes = 0
+
+
+def _get_size(value: Any) -> int:
+    """Estimate the number of bytes used by a cache entry.
+
+    Args:
+        value: The entry to be measured.
+
+    Returns:
+        The approximate size of the `value` in bytes.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_get_size(val) for val in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_get_size(val) for val in value)
+    return sys.getsizeof(value)
+
+
+class ShardCache(SampleCache):
+    """A cache which stores samples in append-only, memory-mapped shard files.
+
+    Each process writes its samples into its own shard file, along with an index file recording the offset, dtype, and
+    shape of every array. Arrays are read back as views into a memory map of the shard, so that random access to a
+    cached sample costs a page-cache read rather than a deserialization (or a jpeg decode). Since the memory maps are
+    backed by the file system, forked worker processes share the same physical pages rather than copying them. Arrays
+    may have fixed or variable shapes, and any non-array values are pickled. The returned arrays are read-only views,
+    so they must be copied before being modified in place (the Pipeline handles this automatically).
+
+    The cache can be filled incrementally, for example during the first epoch of training. Samples written by any
+    process become visible to every other process once they are committed to the index. Each slot (ex. mode + ds_id)
+    records the signature of the configuration which generated its data. If a different signature is encountered later
+    (for example because an upstream Op was changed), the stale data for that slot is deleted. Since the shards are
+    append-only, samples are never evicted: once `max_bytes` is reached no new samples will be added.
+
+    This class is intentionally not @traceable.
+
+    Args:
+        cache_dir: The directory in which to store the shards. It will be created if it does not already exist. The
+            cached data persists between runs.
+        max_bytes: The (approximate) maximum size of the cache. Once this size is reached, new samples will no longer be
+            cached. None indicates that the cache size is unlimited.
+    """
+    _version = 1
+    _data_suffix = ".shard"
+    _index_suffix = ".index"
+    _header = struct.Struct("<Q")
+
+    def __init__(self, cache_dir: str, max_bytes: Optional[int] = None) -> None:
+        super().__init__(max_bytes=max_bytes)
+        self.cache_dir = os.path.normpath(cache_dir)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.n_bytes: Optional[int] = None
+        # {namespace: {index: (shard path, record)}}
+        self.index: Dict[str, Dict[int, Tuple[str, Any]]] = {}
+        # {index path: number of bytes already read}
+        self.index_pos: Dict[str, int] = {}
+        # {shard path: memory map}
+        self.maps: Dict[str, mmap.mmap] = {}
+        # The writer is tied to the process which opened it, so forked workers will create their own
+        self.writer_pid: Optional[int] = None
+        self.writers: Dict[str, Tuple[Any, Any]] = {}
+
+    def get_namespace(self, slot: str, signature: str) -> str:
+        namespace = hashlib.md5(slot.encode('utf8')).hexdigest()
+        slot_dir = os.path.join(self.cache_dir, namespace)
+        meta_path = os.path.join(slot_dir, "meta.json")
+        meta = {"version": self._version, "slot": slot, "signature": signature}
+        with self.lock:
+            if os.path.exists(meta_path):
+                with open(meta_path, 'r') as file:
+                    old_meta = json.load(file)
+                if old_meta == meta:
+                    return namespace
+                warn(f"The configuration for cached data '{slot}' has changed. The stale data in {slot_dir} will be " +
+                     "deleted.")
+                self._clear_namespace(namespace)
+            os.makedirs(slot_dir, exist_ok=True)
+            tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(meta, file)
+            os.replace(tmp_path, meta_path)
+        return namespace
+
+    def get(self, key: Tuple[str, int]) -> Optional[CacheEntry]:
+        namespace, index = key
+        with self.lock:
+            entry = self.index.get(namespace, {}).get(index)
+            if entry is None:
+                # Another process might have written it since the index was last read
+                self._refresh_index(namespace)
+                entry = self.index.get(namespace, {}).get(index)
+            if entry is None:
+                return None
+            path, record = entry
+            if isinstance(record, FilteredData):
+                return record
+            end = max([offset + n_bytes for (_, _, offset, n_bytes) in record.values()], default=0)
+            buffer = self._get_map(path, end) if end else b""
+        value = {}
+        for name, (kind, spec, offset, n_bytes) in record.items():
+            if kind == 'array':
+                dtype, shape = spec
+                count = n_bytes // np.dtype(dtype).itemsize if n_bytes else 0
+                if count:
+                    value[name] = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset).reshape(shape)
+                    # The map is shared between reads, so the views must not be edited in place
+                    value[name].flags.writeable = False
+                else:
+                    value[name] = np.empty(shape, dtype=dtype)
+            else:
+                value[name] = pickle.loads(buffer[offset:offset + n_bytes])
+        return value
+
+    def put(self, key: Tuple[str, int], value: CacheEntry) -> None:
+        namespace, index = key
+        chunks = []
+        record = value if isinstance(value, FilteredData) else {}
+        if not isinstance(value, FilteredData):
+            for name, val in value.items():
+                if isinstance(val, np.ndarray) and val.dtype != object:
+                    data = np.ascontiguousarray(val).tobytes()
+                    record[name] = ('array', (val.dtype.str, val.shape), len(data))
+                else:
+                    data = pickle.dumps(val, protocol=pickle.HIGHEST_PROTOCOL)
+                    record[name] = ('object', None, len(data))
+                chunks.append(data)
+        n_bytes = sum(len(chunk) for chunk in chunks)
+        with self.lock:
+            if self.max_bytes is not None:
+                if self.n_bytes is None:
+                    self.n_bytes = self._scan_size()
+                if self.n_bytes + n_bytes > self.max_bytes:
+                    return
+            data_file, index_file = self._get_writer(namespace)
+            offset = data_file.tell()
+            if not isinstance(record, FilteredData):
+                for name, chunk in zip(list(record.keys()), chunks):
+                    kind, spec, size = record[name]
+                    record[name] = (kind, spec, offset, size)
+                    offset += size
+                data_file.write(b"".join(chunks))
+                data_file.flush()
+            # The index entry is written after the data so that readers never see an incomplete sample
+            entry = pickle.dumps((index, record), protocol=pickle.HIGHEST_PROTOCOL)
+            index_file.write(self._header.pack(len(entry)) + entry)
+            index_file.flush()
+            self.index.setdefault(namespace, {})[index] = (data_file.name, record)
+            if self.n_bytes is not None:
+                self.n_bytes += n_bytes
+
+    def _get_writer(self, namespace: str) -> Tuple[Any, Any]:
+        """Get the files which the current process should write to.
+
+        Args:
+            namespace: The namespace which will be written to.
+
+        Returns:
+            The (shard file, index file) to write to.
+        """
+        if self.writer_pid != os.getpid():
+            # These handles were inherited from a parent process, so don't touch them
+            self.writers = {}
+            self.writer_pid = os.getpid()
+        if namespace not in self.writers:
+            name = f"{os.getpid()}_{threading.get_ident()}_{os.urandom(4).hex()}"
+            base = os.path.join(self.cache_dir, namespace, name)
+            data_file = open(base + self._data_suffix, 'ab')
+            index_file = open(base + self._index_suffix, 'ab')
+            # Mark our own index as already read, since we track our own writes directly
+            self.index_pos[index_file.name] = 0
+            self.writers[namespace] = (data_file, index_file)
+        return self.writers[namespace]
+
+    def _refresh_index(self, namespace: str) -> None:
+        """Read any new records which have been appended to the index files of a given `namespace`.
+
+        Args:
+            namespace: The namespace to be refreshed.
+        """
+        slot_dir = os.path.join(self.cache_dir, namespace)
+        if not os.path.isdir(slot_dir):
+            return
+        own_files = {index_file.name for _, index_file in self.writers.values()} if \
+            self.writer_pid == os.getpid() else set()
+        index = self.index.setdefault(namespace, {})
+        for entry in os.scandir(slot_dir):
+            if not entry.name.endswith(self._index_suffix) or entry.path in own_files:
+                continue
+            pos = self.index_pos.get(entry.path, 0)
+            shard_path = entry.path[:-len(self._index_suffix)] + self._data_suffix
+            with open(entry.path, 'rb') as file:
+                file.seek(pos)
+                while True:
+                    header = file.read(self._header.size)
+                    if len(header) < self._header.size:
+                        break
+                    payload = file.read(self._header.unpack(header)[0])
+                    if len(payload) < self._header.unpack(header)[0]:
+                        break  # Still being written, try again later
+                    idx, record = pickle.loads(payload)
+                    index[idx] = (shard_path, record)
+                    pos = file.tell()
+            self.index_pos[entry.path] = pos
+
+    def _get_map(self, path: str, min_size: int) -> mmap.mmap:
+        """Get a memory map of a shard file, re-mapping it if the shard has grown since it was last mapped.
+
+        Args:
+            path: The shard to be mapped.
+            min_size: The minimum number of bytes which the map must contain.
+
+        Returns:
+            A copy-on-write memory map of the shard.
+        """
+        buffer = self.maps.get(path)
+        if buffer is None or len(buffer) < min_size:
+            with open(path, 'rb') as file:
+                # Copy-on-write, so that even if an array is made writeable the files on disk cannot be corrupted
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+            self.maps[path] = buffer
+        return buffer
+
+    def _scan_size(self) -> int:
+        n_bytes = 0
+        for root, _, files in os.walk(self.cache_dir):
+            n_bytes += sum(os.path.getsize(os.path.join(root, name)) for name in files if name.endswith(self._data_suffix))
+        return n_bytes
+
+    def _clear_namespace(self, namespace: str) -> None:
+        """Delete all of the data associated with a given `namespace`.
+
+        Args:
+            namespace: The namespace to be cleared.
+        """
+        slot_dir = os.path.join(self.cache_dir, namespace)
+        if self.writer_pid == os.getpid() and namespace in self.writers:
+            for file in self.writers.pop(namespace):
+                file.close()
+        self.index.pop(namespace, None)
+        if not os.path.isdir(slot_dir):
+            return
+        for name in os.listdir(slot_dir):
+            path = os.path.join(slot_dir, name)
+            self.index_pos.pop(path, None)
+            self.maps.pop(path, None)
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Another process may be clearing the same data
+        self.n_bytes = None
+
+    def clear(self) -> None:
+        with self.lock:
+            for entry in os.scandir(self.cache_dir):
+                if entry.is_dir():
+                    self._clear_namespace(entry.name)
@@ -0,0 +1,259 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import csv
+import glob
+import json
+import os
+import random
+import threading
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+from torch.utils.data import get_worker_info
+
+from fastestimator.dataset.dataset import DatasetSummary, FEDataset, KeySummary
+from fastestimator.util.base_util import get_shape, get_type
+from fastestimator.util.traceability_util import traceable
+
+# Guards the (re-)creation of per-process stream state
+_STREAM_INIT_LOCK = threading.Lock()
+
+
+def _read_csv(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r', newline='') as file:
+        yield from csv.DictReader(file)
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, 'r') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_npz(path: str) -> Iterator[Dict[str, Any]]:
+    with np.load(path, allow_pickle=False) as file:
+        data = {key: file[key] for key in file.files}
+    size = min(len(val) for val in data.values()) if data else 0
+    for idx in range(size):
+        yield {key: val[idx] for key, val in data.items()}
+
+
+@traceable(blacklist=('_summary', '_stream', '_stream_pid', '_lock'))
+class StreamingDataset(FEDataset):
+    """A dataset which reads its samples sequentially from a collection of shard files.
+
+    Unlike the other FastEstimator datasets, the data is never indexed or held in memory, so this dataset can be used
+    with data which is larger than RAM. Shards are read one at a time from start to finish. If the Pipeline uses worker
+    processes then the shards are divided among them, so that each worker streams a disjoint subset of the data. When
+    there are fewer shards than workers, every worker reads all of the shards but only keeps every Nth sample. When the
+    Pipeline is shuffling (by default only during training), the order of each worker's shards is randomized and samples
+    are drawn through a bounded shuffle buffer. A worker which runs out of shards begins a new pass over its data, so
+    `steps_per_epoch` may be used to run longer or shorter epochs than a single pass.
+
+    Batching, FilteredData, and steps_per_epoch are all handled by the usual FEDataLoader logic, since the index
+    requested by the loader is ignored in favor of the next sample from the stream. Because of this, index-dependent
+    features (such as the Cache op or dataset splitting) are not supported.
+
+    ```python
+    ds = fe.dataset.StreamingDataset(shards="/data/train/*.npz", samples_per_epoch=1000000, shuffle_buffer=5000)
+    pipeline = fe.Pipeline(train_data=ds, batch_size=64, num_process=8)
+    ```
+
+    Args:
+        shards: The shard files to read. Either a list of file paths, a directory (in which case all of its files will
+            be used), or a glob pattern.
+        reader: A function which takes the path of a shard and returns an iterable over the data dictionaries within
+            it. If None, a reader will be chosen based on each shard's file extension. '.csv' files produce a
+            dictionary for every row, '.jsonl' files produce one for every line, and '.npz' files produce one for
+            every index along the first dimension of the arrays that they contain.
+        samples_per_epoch: How many samples make up an epoch. If None, every shard will be read once during
+            construction in order to count its samples.
+        shuffle_buffer: How many samples to hold in memory for shuffling purposes. Larger values give more thorough
+            shuffling at the cost of memory. Set to 0 to disable sample shuffling (shard order will still be shuffled).
+
+    Raises:
+        ValueError: If no shards are found, or if a shard has an unknown file extension when `reader` is None.
+    """
+    readers = {'.csv': _read_csv, '.jsonl': _read_jsonl, '.npz': _read_npz}
+
+    def __init__(self,
+                 shards: Union[str, Sequence[str]],
+                 reader: Optional[Callable[[str], Iterable[Dict[str, Any]]]] = None,
+                 samples_per_epoch: Optional[int] = None,
+                 shuffle_buffer: int = 1000) -> None:
+        if isinstance(shards, str):
+            if os.path.isdir(shards):
+                shards = [os.path.join(shards, name) for name in os.listdir(shards)]
+                shards = [path for path in shards if os.path.isfile(path)]
+            else:
+                shards = glob.glob(shards)
+            shards = sorted(shards)
+        self.shards = list(shards)
+        if not self.shards:
+            raise ValueError("StreamingDataset requires at least one shard")
+        if reader is None:
+            for shard in self.shards:
+                if os.path.splitext(shard)[1].lower() not in self.readers:
+                    raise ValueError(f"No default reader is available for {shard}. Please provide a reader function.")
+        self.reader = reader
+        if shuffle_buffer < 0:
+            raise ValueError(f"shuffle_buffer must be non-negative, but got {shuffle_buffer}")
+        self.shuffle_buffer = shuffle_buffer
+        if samples_per_epoch is None:
+            samples_per_epoch = sum(1 for shard in self.shards for _ in self._read_shard(shard))
+        self.samples_per_epoch = samples_per_epoch
+        self.shuffle = False
+        self.seed = None
+        self._stream = None
+        self._stream_pid = None
+        self._lock = threading.Lock()
+        self._summary = None
+
+    def __len__(self) -> int:
+        return self.samples_per_epoch
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        """Get the next sample from the stream.
+
+        Args:
+            index: Ignored, except to check whether the end of the dataset has been reached.
+
+        Returns:
+            The next data dictionary from the current process' stream.
+        """
+        if index >= len(self):
+            raise StopIteration
+        self._check_process()
+        with self._lock:
+            if self._stream is None:
+                self._stream = self._generate()
+            return next(self._stream)
+
+    def fe_reset_ds(self, shuffle: bool = True, *, seed: Optional[int] = None) -> None:
+        """Restart the stream from the beginning.
+
+        This method is invoked by the FEDataLoader at the start of every epoch (and whenever `samples_per_epoch`
+        samples have been drawn), before any worker processes are launched.
+
+        Args:
+            shuffle: Whether the data should be shuffled.
+            seed: A random seed to use when shuffling. Each worker process will offset this seed by its worker id.
+        """
+        self.shuffle = shuffle
+        self.seed = seed
+        self._check_process()
+        with self._lock:
+            self._stream = None
+
+    def _check_process(self) -> None:
+        """Reset the stream state if this object has been copied into a new process (ex. a forked loader worker).
+        """
+        pid = os.getpid()
+        if self._stream_pid != pid:
+            with _STREAM_INIT_LOCK:
+                if self._stream_pid != pid:
+                    self._lock = threading.Lock()
+                    self._stream = None
+                    self._stream_pid = pid
+
+    def _read_shard(self, shard: str) -> Iterable[Dict[str, Any]]:
+        if self.reader is not None:
+            return self.reader(shard)
+        return self.readers[os.path.splitext(shard)[1].lower()](shard)
+
+    def _generate(self) -> Iterator[Dict[str, Any]]:
+        """Produce an infinite stream of samples for the current process.
+
+        Returns:
+            A generator which makes repeated passes over this process' share of the shards.
+        """
+        worker = get_worker_info()
+        worker_id, num_workers = (worker.id, worker.num_workers) if worker is not None else (0, 1)
+        rng = random.Random(None if self.seed is None else self.seed + worker_id)
+        if len(self.shards) >= num_workers:
+            shards, stride = self.shards[worker_id::num_workers], 1
+        else:
+            shards, stride = list(self.shards), num_workers
+        while True:
+            if self.shuffle:
+                rng.shuffle(shards)
+            n_yielded = 0
+            for sample in self._shuffle(self._read_shards(shards, worker_id, stride), rng):
+                n_yielded += 1
+                yield sample
+            if n_yielded == 0:
+                raise ValueError(f"StreamingDataset worker {worker_id} was not able to read any data from its shards")
+
+    def _read_shards(self, shards: List[str], offset: int, stride: int) -> Iterator[Dict[str, Any]]:
+        """Read through a list of shards in order.
+
+        Args:
+            shards: The shards to read.
+            offset: The position of the first sample to keep.
+            stride: Only every `stride`th sample will be kept.
+
+        Returns:
+            A generator over the selected samples.
+        """
+        count = 0
+        for shard in shards:
+            for sample in self._read_shard(shard):
+                if count % stride == offset % stride:
+                    yield sample
+                count += 1
+
+    def _shuffle(self, samples: Iterator[Dict[str, Any]], rng: random.Random) -> Iterator[Dict[str, Any]]:
+        """Randomize the order of samples using a bounded buffer.
+
+        Args:
+            samples: The samples to shuffle.
+            rng: The random number generator to use.
+
+        Returns:
+            A generator over the shuffled samples. The buffer is fully drained once `samples` is exhausted, so a single
+            pass will produce every sample exactly once.
+        """
+        if not self.shuffle or self.shuffle_buffer < 2:
+            yield from samples
+            return
+        buffer = []
+        for sample in samples:
+            if len(buffer) < self.shuffle_buffer:
+                buffer.append(sample)
+                continue
+            idx = rng.randrange(len(buffer))
+            yield buffer[idx]
+            buffer[idx] = sample
+        rng.shuffle(buffer)
+        yield from buffer
+
+    def _do_split(self, splits: Sequence[Iterable[int]]) -> List['StreamingDataset']:
+        raise NotImplementedError("StreamingDataset does not support index-based splitting. Please construct separate "
+                                  "datasets from disjoint lists of shards instead.")
+
+    def summary(self) -> DatasetSummary:
+        """Generate a summary representation of this dataset.
+        Returns:
+            A summary representation of this dataset.
+        """
+        if self._summary is not None:
+            return self._summary
+        sample = next(iter(self._read_shard(self.shards[0])))
+        key_summary = {}
+        for key, val in sample.items():
+            key_summary[key] = KeySummary(num_unique_values=None, shape=get_shape(val), dtype=get_type(val))
+        self._summary = DatasetSummary(num_instances=self.samples_per_epoch, keys=key_summary)
+        return self._summary
@@ -279,6 +279,8 @@ class Estimator:
                     self.network.load_epoch(mode, epoch, ds_id, output_keys=trace_input_keys, warmup=True, eager=eager)
                     self.network.run_step(batch)
                     self.network.unload_epoch()
+        # Traces (ex. RestoreWizard) may modify the pipeline during on_begin, so persistent workers must be restarted
+        self.pipeline.shutdown()
         assert not monitor_names, "found missing key(s): {}".format(monitor_names)
 
     def get_scheduled_items(self, mode: str) -> List[Any]:
@@ -324,6 +326,8 @@ class Estimator:
                     self._run_epoch(eager=eager)
             except EarlyStop:
                 pass  # On early stopping we still want to run the final traces and return results
+            finally:
+                self.pipeline.shutdown()
             self._run_traces_on_end(traces=all_traces)
 
     def _run_epoch(self, eager: bool) -> None:
@@ -17,13 +17,13 @@ from typing import TYPE_CHECKING
 import lazy_loader as lazy
 
 __getattr__, __dir__, __all__ = lazy.attach(__name__,
-                                            submod_attrs={'fuse': ['Fuse'],
+                                            submod_attrs={'fuse': ['Fuse', 'FusedPointwise'],
                                                           'one_of': ['OneOf'],
                                                           'repeat': ['Repeat'],
                                                           'sometimes': ['Sometimes']})
 
 if TYPE_CHECKING:
-    from fastestimator.op.numpyop.meta.fuse import Fuse
+    from fastestimator.op.numpyop.meta.fuse import Fuse, FusedPointwise
     from fastestimator.op.numpyop.meta.one_of import OneOf
     from fastestimator.op.numpyop.meta.repeat import Repeat
     from fastestimator.op.numpyop.meta.sometimes import Sometimes
@@ -91,3 +91,73 @@ class Fuse(NumpyOp):
         data = {key: elem for key, elem in zip(self.inputs, data)}
         filtered = forward_numpyop(self.ops, data, state, batched="np")
         return filtered if filtered else [data[key] for key in self.outputs]
+
+
+@traceable()
+class FusedPointwise(NumpyOp):
+    """Run a chain of pointwise NumpyOps in a single pass, re-using one output buffer for the whole chain.
+
+    This Op is generated automatically by the Pipeline when `fuse_ops` is enabled, and should not normally be
+    instantiated by end users. Each of the `ops` must implement a `forward_fused(data, inplace)` method which transforms
+    a single array, and which is allowed to overwrite `data` when `inplace` is True. The first Op in the chain allocates
+    the output buffer (since the chain inputs belong to the dataset), and subsequent Ops then write into that buffer
+    rather than allocating fresh arrays of their own. The results are identical to running the `ops` one by one.
+
+    Args:
+        ops: A sequence of NumpyOps which all read from and write to the same keys.
+
+    Raises:
+        ValueError: If `ops` are not fusable.
+    """
+    def __init__(self, ops: List[NumpyOp]) -> None:
+        if len(ops) < 2:
+            raise ValueError("FusedPointwise requires at least two ops")
+        for op in ops:
+            if not self.can_fuse(op):
+                raise ValueError(f"{type(op).__name__} cannot be fused")
+            if op.inputs != ops[0].inputs:
+                raise ValueError(f"All fused ops must share the same keys, but got {ops[0].inputs} and {op.inputs}")
+        super().__init__(inputs=ops[0].inputs, outputs=ops[0].outputs)
+        self.ops = ops
+        self.in_list, self.out_list = True, True
+
+    def __getstate__(self) -> Dict[str, List[Dict[Any, Any]]]:
+        return {'ops': [elem.__getstate__() if hasattr(elem, '__getstate__') else {} for elem in self.ops]}
+
+    @staticmethod
+    def can_fuse(op: NumpyOp) -> bool:
+        """Check whether a given `op` can be run as part of a FusedPointwise chain.
+
+        Args:
+            op: The op to be checked.
+
+        Returns:
+            True iff the `op` provides a `forward_fused` implementation that is consistent with its `forward` method, and
+            modifies its inputs in place.
+        """
+        if not op.inputs or op.inputs != op.outputs:
+            return False
+        for cls in type(op).__mro__:
+            # A subclass which overrides forward without overriding forward_fused would compute something different
+            if 'forward_fused' in cls.__dict__:
+                return True
+            if 'forward' in cls.__dict__:
+                return False
+        return False
+
+    def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        results = []
+        for elem in data:
+            result = elem
+            for op in self.ops:
+                # The dataset's arrays must never be modified, but anything allocated by an earlier op can be re-used
+                result = op.forward_fused(result, inplace=not np.may_share_memory(result, elem))
+            results.append(result)
+        return results
+
+    def forward_batch(self, data: Union[np.ndarray, List[np.ndarray]],
+                      state: Dict[str, Any]) -> Union[np.ndarray, List[np.ndarray]]:
+        # Some pointwise ops (ex. Minmax) compute per-sample statistics, so batches are processed op by op
+        data = {key: elem for key, elem in zip(self.inputs, data)}
+        filtered = forward_numpyop(self.ops, data, state, batched="np")
+        return filtered if filtered else [data[key] for key in self.outputs]
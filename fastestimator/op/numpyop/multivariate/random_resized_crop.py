@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import math
 from typing import Iterable, Optional, Tuple, Union
 
 import cv2
@@ -95,3 +96,23 @@ class RandomResizedCrop(MultiVariateAlbumentation):
             keypoint_params=keypoint_params,
             mode=mode,
             ds_id=ds_id)
+
+    def min_input_scale(self, height: int, width: int) -> float:
+        """Compute how far an input image could be downscaled before this Op without degrading its output.
+
+        This is used by ReadImage in order to decode images at reduced resolution.
+
+        Args:
+            height: The height of the original input image.
+            width: The width of the original input image.
+
+        Returns:
+            The smallest factor by which the input image could be scaled while still providing at least as many pixels
+            as this Op needs.
+        """
+        transform = self.func.transforms[0]
+        # The smallest possible crop has the minimum area, with the most extreme aspect ratio in each direction
+        min_area = min(transform.scale) * height * width
+        min_crop_height = math.sqrt(min_area / max(transform.ratio))
+        min_crop_width = math.sqrt(min_area * min(transform.ratio))
+        return max(transform.height / min(min_crop_height, height), transform.width / min(min_crop_width, width))
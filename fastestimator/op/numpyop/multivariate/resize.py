@@ -85,3 +85,19 @@ class Resize(MultiVariateAlbumentation):
                          keypoint_params=keypoint_params,
                          mode=mode,
                          ds_id=ds_id)
+
+    def min_input_scale(self, height: int, width: int) -> float:
+        """Compute how far an input image could be downscaled before this Op without degrading its output.
+
+        This is used by ReadImage in order to decode images at reduced resolution.
+
+        Args:
+            height: The height of the original input image.
+            width: The width of the original input image.
+
+        Returns:
+            The smallest factor by which the input image could be scaled while still providing at least as many pixels
+            as this Op needs.
+        """
+        transform = self.func.transforms[0]
+        return max(transform.height / height, transform.width / width)
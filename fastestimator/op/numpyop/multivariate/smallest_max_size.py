@@ -19,6 +19,7 @@ from albumentations import BboxParams, KeypointParams
 from albumentations.augmentations import SmallestMaxSize as SmallestMaxSizeAlb
 
 from fastestimator.op.numpyop.multivariate.multivariate import MultiVariateAlbumentation
+from fastestimator.util.base_util import to_list
 from fastestimator.util.traceability_util import traceable
 
 
@@ -83,3 +84,18 @@ class SmallestMaxSize(MultiVariateAlbumentation):
                          keypoint_params=keypoint_params,
                          mode=mode,
                          ds_id=ds_id)
+
+    def min_input_scale(self, height: int, width: int) -> float:
+        """Compute how far an input image could be downscaled before this Op without degrading its output.
+
+        This is used by ReadImage in order to decode images at reduced resolution.
+
+        Args:
+            height: The height of the original input image.
+            width: The width of the original input image.
+
+        Returns:
+            The smallest factor by which the input image could be scaled while still providing at least as many pixels
+            as this Op needs.
+        """
+        return max(to_list(self.func.transforms[0].max_size)) / min(height, width)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-from typing import Any, Callable, Dict, Iterable, List, MutableMapping, Optional, Sequence, TypeVar, Union
+from typing import Any, Callable, Dict, Hashable, Iterable, List, MutableMapping, Optional, Sequence, TypeVar, Union
 
 import numpy as np
 import tensorflow as tf
@@ -20,6 +20,7 @@ import torch
 from torch.utils.data.dataloader import default_collate
 
 from fastestimator.backend._to_tensor import to_tensor
+from fastestimator.dataset.sample_cache import DiskCache, MemoryCache, SampleCache, ShardCache
 from fastestimator.op.op import Op, get_inputs_by_op, write_outputs_by_op
 from fastestimator.util.data import FilteredData
 from fastestimator.util.traceability_util import traceable
@@ -115,6 +116,15 @@ class Batch(NumpyOp):
             exclusive with `collate_fn`.
         collate_fn: A function to merge a list of data elements into a batch of data. Mutually exclusive with
             `pad_value`.
+        bucket_by: How to measure the length of each data instance in order to group instances of similar length into
+            the same batches (which reduces the amount of padding needed for variable-length data). Either a key of the
+            (un-processed) dataset, in which case len(instance[key]) is used, or a function which takes an un-processed
+            data instance and returns its length. Lengths are computed once per dataset, before any Ops are applied,
+            so they should be cheap to compute and correlate with the final (ex. tokenized) length. None disables
+            bucketing. Note that bucketing is only applied to FastEstimator datasets which are indexed by integer (ex.
+            not to BatchDataset or StreamingDataset).
+        bucket_pool_size: How many batches worth of randomly chosen instances to sort by length at a time when
+            `bucket_by` is set. Larger values reduce padding, but make the batches less random.
         mode: What mode(s) to execute this Op in. For example, "train", "eval", "test", or "infer". To execute
             regardless of mode, pass None. To execute in all modes except for a particular one, you can pass an argument
             like "!infer" or "!train".
@@ -126,6 +136,8 @@ class Batch(NumpyOp):
                  drop_last: bool = False,
                  pad_value: Optional[Union[int, float]] = None,
                  collate_fn: Optional[Callable[[List[Dict[str, Any]]], Dict[str, Any]]] = None,
+                 bucket_by: Union[None, str, Callable[[Dict[str, Any]], int]] = None,
+                 bucket_pool_size: int = 100,
                  mode: Union[None, str, Iterable[str]] = None,
                  ds_id: Union[None, str, Iterable[str]] = None) -> None:
         super().__init__(mode=mode, ds_id=ds_id)
@@ -146,6 +158,23 @@ class Batch(NumpyOp):
             # Note that this might get ignored in favor of default_convert inside the FEDataLoader if it looks like the
             # user really doesn't want stuff to be batched.
             self.collate_fn = default_collate
+        if bucket_pool_size < 1:
+            raise ValueError("bucket_pool_size must be positive")
+        self.bucket_by = bucket_by
+        self.bucket_pool_size = bucket_pool_size
+
+    def get_length(self, data: Dict[str, Any]) -> int:
+        """Measure the length of a data instance for the purpose of length bucketing.
+
+        Args:
+            data: An un-processed data instance.
+
+        Returns:
+            The length of the instance according to `bucket_by`.
+        """
+        if callable(self.bucket_by):
+            return int(self.bucket_by(data))
+        return len(data[self.bucket_by])
 
     def _pad_batch_collate(self, batch: List[MutableMapping[str, Any]]) -> Dict[str, Any]:
         """A collate function which pads a batch of data.
@@ -160,6 +189,67 @@ class Batch(NumpyOp):
         return default_collate(batch)
 
 
+@traceable(blacklist=('storage', 'namespaces'))
+class Cache(NumpyOp):
+    """Cache the outputs of all of the Ops which come before this one, so that they only need to be computed once.
+
+    The first time that a given dataset index is visited, the data dictionary produced by the Ops preceding this one is
+    stored. Subsequent visits will re-use the stored data and only run the Ops which come after this one. All of the Ops
+    before a Cache Op must therefore be deterministic (ex. ReadImage, Resize, Normalize), and any random augmentations
+    must be placed after it. Only the first Cache Op for a given epoch/mode/ds_id combination is considered, and it must
+    be placed before any Batch Op. Caching is not applied to datasets which generate their own batches (ex.
+    BatchDataset).
+
+    In-memory caches are local to each process. When the Pipeline uses multiprocessing, every worker builds its own
+    cache which is lost whenever the worker exits. It is therefore recommended to combine in-memory caching with either
+    `persistent_workers=True` or `executor='thread'` in the Pipeline. An on-disk cache is shared between all processes.
+
+    On-disk caches persist between runs. They are keyed by the mode, ds_id, dataset, and configuration of the preceding
+    Ops, so changing any of those will cause the cache to be re-built. The 'mmap' format stores samples in append-only
+    shard files which are memory-mapped when read back, which avoids deserialization costs and lets worker processes
+    share a single copy of the data through the OS page cache. The 'mmap' format will also delete stale data when the
+    preceding Ops are re-configured.
+
+    Args:
+        cache_dir: A directory in which to store the cached samples. If None, samples will be cached in memory instead.
+        max_bytes: The (approximate) maximum size of the cache. Once this size is exceeded, the least recently used
+            samples will be evicted (or, for the 'mmap' format, no new samples will be added). None indicates that the
+            cache size is unlimited.
+        disk_format: How to store samples when `cache_dir` is provided. Either 'pickle' (one file per sample) or 'mmap'
+            (memory-mapped shard files).
+        mode: What mode(s) to execute this Op in. For example, "train", "eval", "test", or "infer". To execute
+            regardless of mode, pass None. To execute in all modes except for a particular one, you can pass an argument
+            like "!infer" or "!train".
+        ds_id: What dataset id(s) to execute this Op in. To execute regardless of ds_id, pass None. To execute in all
+            ds_ids except for a particular one, you can pass an argument like "!ds1".
+    """
+    def __init__(self,
+                 cache_dir: Optional[str] = None,
+                 max_bytes: Optional[int] = None,
+                 disk_format: str = 'pickle',
+                 mode: Union[None, str, Iterable[str]] = None,
+                 ds_id: Union[None, str, Iterable[str]] = None) -> None:
+        super().__init__(mode=mode, ds_id=ds_id)
+        if disk_format not in ('pickle', 'mmap'):
+            raise ValueError(f"disk_format must be either 'pickle' or 'mmap', but got {disk_format}")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.disk_format = disk_format
+        if cache_dir is None:
+            self.storage: SampleCache = MemoryCache(max_bytes=max_bytes)
+        elif disk_format == 'mmap':
+            self.storage = ShardCache(cache_dir=cache_dir, max_bytes=max_bytes)
+        else:
+            self.storage = DiskCache(cache_dir=cache_dir, max_bytes=max_bytes)
+        self.namespaces: Dict[Hashable, Hashable] = {}
+
+    def forward(self, data: Union[np.ndarray, List[np.ndarray]], state: Dict[str, Any]) -> None:
+        pass
+
+    def forward_batch(self, data: Union[Tensor, List[Tensor]], state: Dict[str, Any]) -> None:
+        pass
+
+
 @traceable()
 class Delete(NumpyOp):
     """Delete key(s) and their associated values from the data dictionary.
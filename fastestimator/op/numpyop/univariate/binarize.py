@@ -46,3 +46,11 @@ class Binarize(NumpyOp):
 
     def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
         return [(dat >= self.threshold).astype(np.float32) for dat in data]
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        return self.forward(data, state)
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        if not inplace or data.dtype != np.float32:
+            return (data >= self.threshold).astype(np.float32)
+        return np.greater_equal(data, self.threshold, out=data, casting='unsafe')
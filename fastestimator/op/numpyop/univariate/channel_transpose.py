@@ -46,3 +46,13 @@ class ChannelTranspose(NumpyOp):
 
     def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
         return [np.transpose(elem, self.axes) for elem in data]
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        results = []
+        for elem in data:
+            n_dims = elem.ndim - 1
+            results.append(np.transpose(elem, [0] + [axis % n_dims + 1 for axis in self.axes]))
+        return results
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        return np.transpose(data, self.axes)
@@ -46,3 +46,11 @@ class ExpandDims(NumpyOp):
 
     def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
         return [np.expand_dims(elem, self.axis) for elem in data]
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        # Negative axes are already relative to the end, so only positive ones need to skip over the batch dimension
+        axis = self.axis + 1 if self.axis >= 0 else self.axis
+        return [np.expand_dims(elem, axis) for elem in data]
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        return np.expand_dims(data, self.axis)
@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-from typing import Iterable, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 import numpy as np
 from albumentations.augmentations.transforms import FromFloat as FromFloatAlb
@@ -51,3 +51,7 @@ class FromFloat(ImageOnlyAlbumentation):
                          outputs=outputs,
                          mode=mode,
                          ds_id=ds_id)
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        # The conversion is pixel-wise, so the whole batch can be transformed at once
+        return [self.func.transforms[0].apply(elem) for elem in data]
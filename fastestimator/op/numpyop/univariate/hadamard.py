@@ -67,3 +67,12 @@ class Hadamard(NumpyOp):
     def forward(self, data: List[Union[int, np.ndarray]], state: Dict[str, Any]) -> List[np.ndarray]:
         # TODO - also support one hot with smoothed labels?
         return [gather(tensor=self.labels, indices=np.array(inp)) for inp in data]
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        results = []
+        for inp in data:
+            inp = np.array(inp)
+            # Squeeze each element individually, as the per-element gather would, without removing the batch dimension
+            inp = np.reshape(inp, (len(inp), ) + tuple(dim for dim in inp.shape[1:] if dim != 1))
+            results.append(np.take(self.labels, inp.astype('int64'), axis=0))
+        return results
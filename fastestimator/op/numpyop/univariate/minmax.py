@@ -12,7 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-from typing import Any, Dict, Iterable, List, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -47,8 +47,23 @@ class Minmax(NumpyOp):
     def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
         return [self._apply_minmax(elem) for elem in data]
 
-    def _apply_minmax(self, data: np.ndarray) -> np.ndarray:
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        return [self._apply_minmax(elem, axis=tuple(range(1, np.ndim(elem)))) for elem in data]
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        if data.dtype != np.float32:
+            return self._apply_minmax(data)
         data_max = np.max(data)
         data_min = np.min(data)
-        data = (data - data_min) / max((data_max - data_min), self.epsilon)
+        if inplace:
+            data -= data_min
+        else:
+            data = data - data_min
+        data /= np.maximum((data_max - data_min), self.epsilon)
+        return data
+
+    def _apply_minmax(self, data: np.ndarray, axis: Optional[Tuple[int, ...]] = None) -> np.ndarray:
+        data_max = np.max(data, axis=axis, keepdims=axis is not None)
+        data_min = np.min(data, axis=axis, keepdims=axis is not None)
+        data = (data - data_min) / np.maximum((data_max - data_min), self.epsilon)
         return data.astype(np.float32)
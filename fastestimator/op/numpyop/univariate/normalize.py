@@ -58,3 +58,18 @@ class Normalize(ImageOnlyAlbumentation):
         results = super().forward(data, state)
         # Albumentation library casts the result to float64 iff the image is HxWx3, but we want consistent output
         return [result.astype(np.float32) for result in results]
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        # Normalization is pixel-wise, so the whole batch can be transformed at once
+        return [self.func.transforms[0].apply(elem).astype(np.float32) for elem in data]
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        transform = self.func.transforms[0]
+        mean = np.array(transform.mean, dtype=np.float32) * transform.max_pixel_value
+        denominator = np.reciprocal(np.array(transform.std, dtype=np.float32) * transform.max_pixel_value,
+                                    dtype=np.float32)
+        if not inplace or data.dtype != np.float32:
+            data = data.astype(np.float32)
+        data -= mean
+        data *= denominator
+        return data
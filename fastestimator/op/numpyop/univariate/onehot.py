@@ -54,15 +54,22 @@ class Onehot(NumpyOp):
     def forward(self, data: List[Union[int, np.ndarray]], state: Dict[str, Any]) -> List[np.ndarray]:
         return [self._apply_onehot(elem) for elem in data]
 
-    def _apply_onehot(self, data: Union[int, np.ndarray]) -> np.ndarray:
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        return [self._apply_onehot(elem, batched=True) for elem in data]
+
+    def _apply_onehot(self, data: Union[int, np.ndarray], batched: bool = False) -> np.ndarray:
         data = np.atleast_1d(data)
         assert "int" in str(data.dtype).lower(), "data type must be an integer"
 
         max_class = np.max(data)
         assert max_class < self.num_classes, "label value should be smaller than num_classes"
 
-        if data.size == 1:
-            output = np.eye(self.num_classes, dtype=np.float32)[data[0]]
+        # Single-element labels are treated as scalars (one per batch entry when batched)
+        n_labels = len(data) if batched else 1
+        if data.size == n_labels:
+            output = np.eye(self.num_classes, dtype=np.float32)[np.reshape(data, (-1, ))]
+            if not batched:
+                output = output[0]
         else:
             output = np.eye(self.num_classes, dtype=np.float32)[data]
 
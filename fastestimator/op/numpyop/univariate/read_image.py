@@ -12,22 +12,159 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import io
 import os
-from typing import Any, Dict, Iterable, List, Union
+import random
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import cv2
 import numpy as np
+from PIL import Image, ImageOps
+from torch.utils.data import Dataset
 
 from fastestimator.op.numpyop.numpyop import NumpyOp
+from fastestimator.util.base_util import to_list
 from fastestimator.util.traceability_util import traceable
 
+# The reduced-resolution decode flag to use for a given color flag and downscaling factor
+_REDUCED_FLAGS = {
+    cv2.IMREAD_COLOR: {
+        2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8
+    },
+    cv2.IMREAD_GRAYSCALE: {
+        2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8
+    }
+}
+_COLOR_FLAGS = {cv2.IMREAD_COLOR, cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_COLOR_8}
+# OpenCV >= 4.10 can decode directly into RGB order, skipping a separate BGR->RGB pass over the image
+_IMREAD_COLOR_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+# JPEG start-of-frame markers (which contain the image size). 0xC4, 0xC8, and 0xCC are not SOF markers.
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Leading bytes which identify common image formats
+_SIGNATURES = ((b'\xff\xd8', 'jpeg'), (b'\x89PNG', 'png'), (b'BM', 'bmp'), (b'GIF8', 'gif'), (b'II*\x00', 'tiff'),
+               (b'MM\x00*', 'tiff'))
+# A libjpeg-turbo handle, loaded the first time that it is needed
+_TURBOJPEG = None
+
+
+def _get_format(buffer: np.ndarray) -> Optional[str]:
+    """Identify the format of an encoded image from its leading bytes.
+
+    Args:
+        buffer: The encoded image.
+
+    Returns:
+        The name of the format ('jpeg', 'png', 'bmp', 'gif', 'tiff', or 'webp'), or None if it is not recognized.
+    """
+    head = buffer[:12].tobytes()
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    for signature, name in _SIGNATURES:
+        if head.startswith(signature):
+            return name
+    return None
+
+
+def _get_jpeg_size(buffer: np.ndarray) -> Optional[Tuple[int, int]]:
+    """Read the size of a JPEG image from its header without decoding it.
+
+    Args:
+        buffer: The encoded image.
+
+    Returns:
+        The (height, width) of the image, or None if the `buffer` does not appear to be a JPEG.
+    """
+    if buffer.size < 4 or buffer[0] != 0xFF or buffer[1] != 0xD8:
+        return None
+    idx = 2
+    while idx + 9 < buffer.size:
+        if buffer[idx] != 0xFF:
+            return None
+        marker = buffer[idx + 1]
+        if marker == 0xFF:
+            # Padding
+            idx += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height = (int(buffer[idx + 5]) << 8) + int(buffer[idx + 6])
+            width = (int(buffer[idx + 7]) << 8) + int(buffer[idx + 8])
+            return height, width
+        if marker == 0xD9 or marker == 0xDA:
+            # End of image / start of scan without having found a frame header
+            return None
+        idx += 2 + (int(buffer[idx + 2]) << 8) + int(buffer[idx + 3])
+    return None
+
+
+# Decoders take an encoded image, a cv2.IMREAD color flag, and a downscaling factor of 1, 2, 4, or 8 (only ever larger
+# than 1 for JPEGs being read in color or grayscale). They return RGB (or grayscale) images, or None if they don't
+# support the given inputs, in which case the cv2 decoder will be used instead. Decoders which are unable to apply the
+# downscaling factor may return a full size image.
+def _decode_cv2(buffer: np.ndarray, color_flag: int, factor: int) -> Optional[np.ndarray]:
+    flag = _REDUCED_FLAGS[color_flag][factor] if factor > 1 else color_flag
+    if flag in _COLOR_FLAGS and _IMREAD_COLOR_RGB is not None:
+        return cv2.imdecode(buffer, flag | _IMREAD_COLOR_RGB)
+    img = cv2.imdecode(buffer, flag)
+    if flag in _COLOR_FLAGS and isinstance(img, np.ndarray):
+        img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB, dst=img)
+    return img
+
+
+def _decode_pil(buffer: np.ndarray, color_flag: int, factor: int) -> Optional[np.ndarray]:
+    if color_flag not in _REDUCED_FLAGS:
+        return None
+    mode = 'RGB' if color_flag == cv2.IMREAD_COLOR else 'L'
+    with Image.open(io.BytesIO(buffer)) as img:
+        if factor > 1:
+            # Lets the JPEG decoder skip straight to a 1/2, 1/4, or 1/8 scale image which is at least the requested size
+            img.draft(mode, (-(-img.width // factor), -(-img.height // factor)))
+        if img.getexif().get(0x0112, 1) != 1:
+            # Match cv2, which applies EXIF orientation while decoding
+            img = ImageOps.exif_transpose(img)
+        img = img if img.mode == mode else img.convert(mode)
+        # np.asarray() would produce a read-only array
+        return np.array(img)
+
+
+def _decode_imageio(buffer: np.ndarray, color_flag: int, factor: int) -> Optional[np.ndarray]:
+    import imageio.v3 as iio
+    if color_flag not in _REDUCED_FLAGS:
+        return None
+    return iio.imread(buffer.tobytes(), mode='RGB' if color_flag == cv2.IMREAD_COLOR else 'L', rotate=True)
+
+
+def _decode_turbojpeg(buffer: np.ndarray, color_flag: int, factor: int) -> Optional[np.ndarray]:
+    global _TURBOJPEG
+    from turbojpeg import TJPF_GRAY, TJPF_RGB, TurboJPEG
+    if color_flag not in _REDUCED_FLAGS or _get_format(buffer) != 'jpeg':
+        return None
+    if _TURBOJPEG is None:
+        _TURBOJPEG = TurboJPEG()
+    return _TURBOJPEG.decode(buffer,
+                             pixel_format=TJPF_RGB if color_flag == cv2.IMREAD_COLOR else TJPF_GRAY,
+                             scaling_factor=(1, factor) if factor > 1 else None)
+
 
 @traceable()
 class ReadImage(NumpyOp):
     """A class for reading png or jpg images from disk.
 
+    Images may also be decoded directly from memory if the inputs are the encoded bytes of an image file (as bytes or
+    as a uint8 array) rather than a path, as is the case for data coming from a RecordDataset.
+
+    Several decoding libraries are available, all of which produce RGB images directly: 'cv2' (the default), 'pil',
+    'imageio', and 'turbojpeg' (which requires the optional PyTurboJPEG package and can only read JPEGs). Which one is
+    fastest depends on the image format and on how the libraries were built, so `tune_backend` can be used to pick the
+    best backend for each format found in a dataset. Additional backends may be registered in `ReadImage.decoders`.
+
+    ```python
+    reader = ReadImage(inputs="x", outputs="x", parent_path=dataset.parent_path)
+    reader.tune_backend(dataset)  # Ex. {'jpeg': 'turbojpeg', 'png': 'cv2'}
+    ```
+
     Args:
-        inputs: Key(s) of paths to images to be loaded.
+        inputs: Key(s) of paths to images to be loaded, or of encoded image bytes.
         outputs: Key(s) of images to be output.
         mode: What mode(s) to execute this Op in. For example, "train", "eval", "test", or "infer". To execute
             regardless of mode, pass None. To execute in all modes except for a particular one, you can pass an argument
@@ -35,18 +172,34 @@ class ReadImage(NumpyOp):
         ds_id: What dataset id(s) to execute this Op in. To execute regardless of ds_id, pass None. To execute in all
             ds_ids except for a particular one, you can pass an argument like "!ds1".
         parent_path: Parent path that will be prepended to a given path.
-        color_flag: Whether to read the image as 'color', 'grey', or one of the cv2.IMREAD flags.
+        color_flag: Whether to read the image as 'color', 'grey', or one of the cv2.IMREAD flags. Backends other than
+            'cv2' only support 'color' and 'grey'. Any other flag will always be decoded using cv2.
+        backend: Which decoder to use. Either the name of an entry in `ReadImage.decoders`, or a dictionary mapping
+            image formats ('jpeg', 'png', 'bmp', 'gif', 'tiff', or 'webp') to decoder names, in which case any format
+            which is not listed will be decoded using cv2. If a backend is unable to decode a particular image, cv2
+            will be used instead.
+
+    Attributes:
+        decode_targets: A mapping from output keys to the resizing Ops which will consume them. When this is non-empty,
+            JPEGs which are written to those keys will be decoded at the smallest of 1/2, 1/4, or 1/8 resolution which
+            still covers the size needed by the corresponding Op (see the Pipeline `reduced_decode` argument).
 
     Raises:
-        AssertionError: If `inputs` and `outputs` have mismatched lengths, or the `color_flag` is unacceptable.
+        AssertionError: If `inputs` and `outputs` have mismatched lengths, or the `color_flag` or `backend` are
+            unacceptable.
     """
+    decoders: Dict[str, Callable[[np.ndarray, int, int], Optional[np.ndarray]]] = {
+        'cv2': _decode_cv2, 'pil': _decode_pil, 'imageio': _decode_imageio, 'turbojpeg': _decode_turbojpeg
+    }
+
     def __init__(self,
                  inputs: Union[str, Iterable[str]],
                  outputs: Union[str, Iterable[str]],
                  mode: Union[None, str, Iterable[str]] = None,
                  ds_id: Union[None, str, Iterable[str]] = None,
                  parent_path: str = "",
-                 color_flag: Union[str, int] = cv2.IMREAD_COLOR):
+                 color_flag: Union[str, int] = cv2.IMREAD_COLOR,
+                 backend: Union[str, Dict[str, str]] = 'cv2'):
         super().__init__(inputs=inputs, outputs=outputs, mode=mode, ds_id=ds_id)
         if isinstance(self.inputs, List) and isinstance(self.outputs, List):
             assert len(self.inputs) == len(self.outputs), "Input and Output lengths must match"
@@ -58,20 +211,169 @@ class ReadImage(NumpyOp):
             self.color_flag = cv2.IMREAD_COLOR
         elif self.color_flag in {"gray", "grey"}:
             self.color_flag = cv2.IMREAD_GRAYSCALE
+        for name in (list(backend.values()) if isinstance(backend, dict) else [backend]):
+            assert name in self.decoders, f"Unknown backend: {name}. Available backends are {list(self.decoders)}"
+        self.backend = backend
         self.in_list, self.out_list = True, True
+        self.decode_targets: Dict[str, NumpyOp] = {}
 
     def forward(self, data: List[str], state: Dict[str, Any]) -> List[np.ndarray]:
-        return [self._read(elem) for elem in data]
+        if not self.decode_targets:
+            return [self._read(elem) for elem in data]
+        return [self._read(elem, self.decode_targets.get(key)) for elem, key in zip(data, self.outputs)]
+
+    def tune_backend(self,
+                     dataset: Dataset,
+                     num_samples: int = 50,
+                     backends: Union[None, str, Iterable[str]] = None) -> Dict[str, str]:
+        """Pick the fastest decoding backend for each image format found in a `dataset`.
+
+        A random subset of the `dataset` is decoded by every available backend, and this Op's `backend` is updated to
+        use the fastest one for each format. Backends which are not installed, or which cannot decode a format, are
+        skipped.
+
+        Args:
+            dataset: A dataset containing this Op's input keys (image paths or encoded images).
+            num_samples: How many elements of the `dataset` to decode.
+            backends: Which backends to consider. If None, every backend in `ReadImage.decoders` will be tried.
+
+        Returns:
+            The chosen {format: backend} mapping.
+        """
+        backends = list(self.decoders) if backends is None else to_list(backends)
+        samples = {}
+        for idx in random.sample(range(len(dataset)), min(num_samples, len(dataset))):
+            item = dataset[idx]
+            for key in to_list(self.inputs):
+                buffer, _ = self._load(item[key])
+                fmt = _get_format(buffer)
+                if fmt is not None:
+                    samples.setdefault(fmt, []).append(buffer)
+        results = {}
+        for fmt, buffers in sorted(samples.items()):
+            timings = {}
+            for name in backends:
+                decoder = self.decoders[name]
+                try:
+                    # The first call warms up the decoder (loading libraries, etc.)
+                    if decoder(buffers[0], self.color_flag, 1) is None:
+                        continue
+                    start = time.perf_counter()
+                    if any(decoder(buffer, self.color_flag, 1) is None for buffer in buffers):
+                        continue
+                    timings[name] = 1000 * (time.perf_counter() - start) / len(buffers)
+                except (ImportError, OSError, RuntimeError, ValueError):
+                    continue
+            if not timings:
+                continue
+            results[fmt] = min(timings, key=timings.get)
+            print("FastEstimator-ReadImage: Decoding {} {} image(s) took {} ms / image. Using {}.".format(
+                len(buffers), fmt, ", ".join("{:.3f} ({})".format(t, name) for name, t in timings.items()),
+                results[fmt]))
+        self.backend = results
+        return results
+
+    @staticmethod
+    def can_reduce_for(op: NumpyOp, key: str) -> bool:
+        """Check whether an image which is about to be fed into a given `op` could be decoded at reduced resolution.
+
+        Args:
+            op: The Op which will consume the image.
+            key: The key under which the image will be stored.
+
+        Returns:
+            True iff the `op` resizes the image in place without touching any other keys (whose coordinates might depend
+            on the original image size), and is able to report the resolution that it needs.
+        """
+        return hasattr(op, 'min_input_scale') and dict(getattr(op, 'keys_in', {})) == {'image': key} and dict(
+            getattr(op, 'keys_out', {})) == {'image': key}
+
+    def reduce_for(self, decode_targets: Dict[str, NumpyOp]) -> 'ReadImage':
+        """Create a copy of this Op which decodes images at reduced resolution when possible.
+
+        Args:
+            decode_targets: A mapping from output keys of this Op to the resizing Ops which will consume them.
 
-    def _read(self, path: str) -> np.ndarray:
+        Returns:
+            A new ReadImage Op.
+        """
+        # copy.copy() would go through the (partial) traceability __getstate__, so copy the attributes directly instead.
+        # The traceability summary is keyed by object id, so the copy needs to build its own.
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update({k: v for k, v in self.__dict__.items() if k != '_fe_traceability_summary'})
+        result.decode_targets = dict(decode_targets)
+        return result
+
+    def _get_factor(self, buffer: np.ndarray, target: Optional[NumpyOp]) -> int:
+        """Choose how much to downscale a particular image while decoding it.
+
+        Args:
+            buffer: The encoded image.
+            target: The Op which will resize the decoded image, if any.
+
+        Returns:
+            The largest factor (2, 4, or 8) by which the image can be shrunk while still providing enough resolution for
+            the `target`, or 1 if no reduction is possible.
+        """
+        if target is None or self.color_flag not in _REDUCED_FLAGS:
+            return 1
+        size = _get_jpeg_size(buffer)
+        if size is None:
+            return 1
+        height, width = size
+        # The image might be rotated by its EXIF orientation, so make sure that both orientations are covered
+        scale = max(target.min_input_scale(height, width), target.min_input_scale(width, height))
+        for factor in (8, 4, 2):
+            if scale * factor <= 1:
+                return factor
+        return 1
+
+    def _load(self, path: Union[str, bytes, np.ndarray]) -> Tuple[np.ndarray, str]:
+        """Get the encoded bytes of an image.
+
+        Args:
+            path: The path to an image file, or the encoded image itself.
+
+        Returns:
+            The encoded image as a uint8 array (which is empty if the file could not be read), and a description of
+            where it came from.
+        """
+        if isinstance(path, (bytes, bytearray, memoryview, np.ndarray)):
+            buffer = np.frombuffer(path, dtype=np.uint8)
+            return buffer, "<{} encoded bytes>".format(buffer.size)
         path = os.path.normpath(os.path.join(self.parent_path, path))
-        img = cv2.imread(path, self.color_flag)
-        if self.color_flag in {
-                cv2.IMREAD_COLOR, cv2.IMREAD_REDUCED_COLOR_2, cv2.IMREAD_REDUCED_COLOR_4, cv2.IMREAD_REDUCED_COLOR_8
-        }:
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        try:
+            return np.fromfile(path, dtype=np.uint8), path
+        except OSError:
+            return np.zeros((0, ), dtype=np.uint8), path
+
+    def _decode(self, buffer: np.ndarray, factor: int) -> Optional[np.ndarray]:
+        """Decode an image using the appropriate backend.
+
+        Args:
+            buffer: The encoded image.
+            factor: How much to downscale the image by while decoding it.
+
+        Returns:
+            The decoded image, or None if it could not be decoded.
+        """
+        backend = self.backend if isinstance(self.backend, str) else self.backend.get(_get_format(buffer), 'cv2')
+        img = None
+        if backend != 'cv2':
+            try:
+                img = self.decoders[backend](buffer, self.color_flag, factor)
+            except (OSError, ValueError):
+                # Leave it to cv2 to decide whether the image is really corrupt
+                img = None
+        if img is None:
+            img = self.decoders['cv2'](buffer, self.color_flag, factor)
+        return img
+
+    def _read(self, path: Union[str, bytes, np.ndarray], target: Optional[NumpyOp] = None) -> np.ndarray:
+        buffer, path = self._load(path)
+        img = self._decode(buffer, self._get_factor(buffer, target)) if buffer.size else None
         if not isinstance(img, np.ndarray):
-            raise ValueError('cv2 did not read correctly for file "{}"'.format(path))
+            raise ValueError('ReadImage could not decode file "{}"'.format(path))
         if img.ndim == 2:
             img = np.expand_dims(img, -1)
         return img
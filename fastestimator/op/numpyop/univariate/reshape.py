@@ -47,6 +47,13 @@ class Reshape(NumpyOp):
     def forward(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
         return [self._apply_reshape(elem) for elem in data]
 
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        shape = (self.shape, ) if isinstance(self.shape, int) else tuple(self.shape)
+        return [np.reshape(elem, (len(elem), ) + shape) for elem in data]
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        return self._apply_reshape(data)
+
     def _apply_reshape(self, data):
         data = np.reshape(data, self.shape)
         return data
@@ -47,5 +47,8 @@ class ToArray(NumpyOp):
     def forward(self, data: List[Any], state: Dict[str, Any]) -> List[np.ndarray]:
         return [self._apply_transform(elem) for elem in data]
 
+    def forward_batch(self, data: List[Any], state: Dict[str, Any]) -> List[np.ndarray]:
+        return [self._apply_transform(elem) for elem in data]
+
     def _apply_transform(self, data: Any) -> np.ndarray:
         return np.array(data, dtype=self.dtype)
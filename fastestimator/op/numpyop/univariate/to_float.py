@@ -12,8 +12,9 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
-from typing import Iterable, Optional, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
+import numpy as np
 from albumentations.augmentations.transforms import ToFloat as ToFloatAlb
 
 from fastestimator.op.numpyop.univariate.univariate import ImageOnlyAlbumentation
@@ -48,3 +49,13 @@ class ToFloat(ImageOnlyAlbumentation):
                          outputs=outputs,
                          mode=mode,
                          ds_id=ds_id)
+
+    def forward_batch(self, data: List[np.ndarray], state: Dict[str, Any]) -> List[np.ndarray]:
+        # The conversion is pixel-wise, so the whole batch can be transformed at once
+        return [self.func.transforms[0].apply(elem) for elem in data]
+
+    def forward_fused(self, data: np.ndarray, inplace: bool) -> np.ndarray:
+        if not inplace or data.dtype != np.float32:
+            return self.func.transforms[0].apply(data)
+        data /= self.func.transforms[0].max_value or 1.0
+        return data
@@ -12,29 +12,42 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import contextlib
 import functools
 import gc
+import hashlib
+import io
+import itertools
+import json
 import multiprocessing as mp
 import os
+import pickle
+import platform
 import time
 from copy import deepcopy
 from operator import mul
+from pathlib import Path
 from threading import Lock
-from typing import Any, Dict, List, Optional, Set, Tuple, Type, TypeVar, Union
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple, Type, TypeVar, Union
 
 import numpy as np
 import tensorflow as tf
 from torch.utils.data import DataLoader, Dataset
 
+import fastestimator as fe
 from fastestimator.backend._to_tensor import to_tensor
-from fastestimator.dataset.dataloader import FEDataLoader
-from fastestimator.dataset.op_dataset import OpDataset
-from fastestimator.op.numpyop.meta.fuse import Fuse
+from fastestimator.dataset.dataloader import FEDataLoader, LengthBucketSampler, PersistentWorkerPool, \
+    _get_collate_fn, _pre_collate
+from fastestimator.dataset.op_dataset import OpDataset, _get_op_config
+from fastestimator.dataset.streaming_dataset import StreamingDataset
+from fastestimator.op.numpyop.meta.fuse import Fuse, FusedPointwise
 from fastestimator.op.numpyop.meta.one_of import OneOf
 from fastestimator.op.numpyop.meta.repeat import Repeat
 from fastestimator.op.numpyop.meta.sometimes import Sometimes
 from fastestimator.op.numpyop.numpyop import Batch, NumpyOp, forward_numpyop
+from fastestimator.op.numpyop.univariate.read_image import ReadImage
 from fastestimator.schedule.schedule import EpochScheduler, RepeatScheduler, Scheduler, get_current_items
+from fastestimator.summary.benchmark import BenchmarkResults, get_peak_rss_mb
 from fastestimator.util.base_util import to_list, to_set, warn
 from fastestimator.util.data import FilteredData
 from fastestimator.util.traceability_util import traceable
@@ -43,7 +56,7 @@ from fastestimator.util.util import cpu_count, get_num_devices
 DataSource = TypeVar('DataSource', Dataset, DataLoader, tf.data.Dataset)
 
 
-@traceable(blacklist=('ctx_loader', 'ctx_lock'))
+@traceable(blacklist=('ctx_loader', 'ctx_lock', 'worker_pool', 'fused_ops', 'reduced_read_ops', 'bucket_lengths'))
 class Pipeline:
     """A data pipeline class that takes care of data pre-processing.
 
@@ -60,7 +73,36 @@ class Pipeline:
             Dataset.
         num_process: Number of CPU threads to use for data pre-processing. NOTE: This argument is only applicable when
             using a FastEstimator Dataset. None will default to min(n_cpus, max(32, 32*n_gpus)). Multiprocessing can be
-            disabled by passing 0 here, which can be useful for debugging.
+            disabled by passing 0 here, which can be useful for debugging. 'auto' will measure the Pipeline throughput
+            with several different numbers of processes the first time that the Pipeline is used, and then pick the
+            smallest number which achieves close to the best throughput (see `tune_num_process`). The choice is cached
+            (in fe.fe_autotune_path) so that later runs with the same Pipeline configuration can skip the measurement.
+        persistent_workers: Whether to keep a single pool of worker processes alive across epochs and modes rather than
+            forking new workers every time a loader is created. The workers reconfigure themselves for each
+            mode / epoch / ds_id, so worker startup is only paid once per run. The pool is shut down by the Estimator
+            at the end of training, or manually by invoking `pipeline.shutdown()`. Note that the workers will not see
+            any changes made to the Pipeline datasets or ops after they are started. NOTE: This argument is only
+            applicable when using a FastEstimator Dataset with `num_process` > 0 and a non-'thread' `executor`.
+        executor: How to parallelize data pre-processing. 'process' runs `num_process` forked worker processes. 'thread'
+            runs `num_process` threads within the main process, avoiding the pickling, IPC, and copy-on-write costs of
+            processes. It works well when the heavy ops release the GIL (ex. cv2 / albumentations), and does not require
+            the 'fork' start method. 'hybrid' runs `num_process` processes, each of which uses `num_threads` threads to
+            process the samples of a batch. NOTE: This argument is only applicable when using a FastEstimator Dataset.
+        num_threads: The number of threads to use within each worker process when `executor` is 'hybrid'. None will
+            default to 2. NOTE: This argument is only applicable when using a FastEstimator Dataset.
+        fuse_ops: Whether to merge runs of consecutive pointwise ops which operate on the same keys (ex. ToFloat ->
+            Normalize -> Minmax -> ChannelTranspose) into a single FusedPointwise op. The fused op writes the results of
+            the whole run into one output buffer rather than allocating a fresh array for each op, which reduces the
+            memory traffic per sample without changing the results. The fused runs are printed when they are first
+            created. NOTE: This argument is only applicable when using a FastEstimator Dataset.
+        reduced_decode: Whether to decode JPEGs at reduced resolution when a ReadImage op is immediately followed by an
+            op which shrinks the image anyways (Resize, LongestMaxSize, SmallestMaxSize, or RandomResizedCrop). cv2 can
+            decode at 1/2, 1/4, or 1/8 resolution far faster than it can perform a full decode, and the largest
+            reduction which still covers the size needed by the resizing op is chosen for each image. The final images
+            will be very similar, but not bit-identical, to those produced without this optimization. Resizing ops
+            which also modify masks, bounding boxes, or keypoints are left alone, since those are defined relative to
+            the full-size image. The time saved is reported by `benchmark`. NOTE: This argument is only applicable
+            when using a FastEstimator Dataset.
     """
     mp_warned: bool = False
     ops: List[Union[NumpyOp, Scheduler[NumpyOp]]]
@@ -75,18 +117,41 @@ class Pipeline:
                  test_data: Union[None, DataSource, Scheduler[DataSource], Dict[str, DataSource]] = None,
                  batch_size: Union[None, int, Scheduler[int]] = None,
                  ops: Union[None, NumpyOp, Scheduler[NumpyOp], List[Union[NumpyOp, Scheduler[NumpyOp]]]] = None,
-                 num_process: Optional[int] = None):
+                 num_process: Union[None, int, str] = None,
+                 persistent_workers: bool = False,
+                 executor: str = 'process',
+                 num_threads: Optional[int] = None,
+                 fuse_ops: bool = False,
+                 reduced_decode: bool = False):
         data = {x: y for (x, y) in zip(["train", "eval", "test"], [train_data, eval_data, test_data]) if y}
         self.data = self._register_ds_ids(data)
         self.batch_size = batch_size
         self.ops = to_list(ops)
         if mp.get_start_method(allow_none=True) is None and os.name != 'nt':
             mp.set_start_method('fork')
-        self.num_process = num_process if num_process is not None else min(cpu_count(), 32 * get_num_devices())
-        if mp.get_start_method(allow_none=True) != 'fork' and self.num_process > 0 and not self.mp_warned:
-            warn("Pipeline multiprocessing is disabled. OS must support the 'fork' start method.")
-            self.num_process = 0
+        assert num_process is None or isinstance(num_process, int) or num_process == 'auto', \
+            "num_process must be an integer, None, or 'auto'"
+        self.auto_num_process = num_process == 'auto'
+        self.num_process = min(cpu_count(), 32 * get_num_devices()) if num_process in (None, 'auto') else num_process
+        self.executor = executor
+        self.num_threads = num_threads
+        if mp.get_start_method(allow_none=True) != 'fork' and self.num_process > 0 and self.executor != 'thread' \
+                and not self.mp_warned:
+            if self.executor == 'hybrid':
+                warn("Pipeline multiprocessing is disabled. OS must support the 'fork' start method. Falling back to " +
+                     "the 'thread' executor.")
+                self.executor = 'thread'
+            else:
+                warn("Pipeline multiprocessing is disabled. OS must support the 'fork' start method.")
+                self.num_process = 0
+                self.auto_num_process = False
             self.mp_warned = True
+        self.persistent_workers = persistent_workers
+        self.fuse_ops = fuse_ops
+        self.fused_ops: Dict[Tuple[int, ...], FusedPointwise] = {}
+        self.reduced_decode = reduced_decode
+        self.reduced_read_ops: Dict[Tuple[int, ...], ReadImage] = {}
+        self.bucket_lengths: Dict[Tuple[int, int], np.ndarray] = {}
         self._verify_inputs(**{k: v for k, v in locals().items() if k != 'self'})
         # Loader Variables
         self.ctx_lock = Lock()
@@ -101,6 +166,7 @@ class Pipeline:
         self.ctx_batch_info = Batch()
         self.ctx_batch_ops = []
         self.ctx_batch_input_keys = set()
+        self.worker_pool = None
 
     @staticmethod
     def _register_ds_ids(
@@ -202,6 +268,11 @@ class Pipeline:
                 assert isinstance(op, NumpyOp), "unsupported op format, must provide NumpyOp in Pipeline"
             # num_process check
             assert isinstance(self.num_process, int), "number of processes must be an integer"
+            # executor check
+            assert self.executor in FEDataLoader.EXECUTORS, \
+                "executor must be one of {}, but got {}".format(FEDataLoader.EXECUTORS, self.executor)
+            assert self.num_threads is None or isinstance(self.num_threads, int), \
+                "number of threads must be an integer"
             return True
         elif isinstance(dataset, (DataLoader, tf.data.Dataset)):
             if kwargs['batch_size'] is not None:
@@ -210,6 +281,8 @@ class Pipeline:
                 warn("ops will only be used for built-in dataset")
             if kwargs['num_process'] is not None:
                 warn("num_process will only be used for built-in dataset")
+            if kwargs['executor'] != 'process' or kwargs['num_threads'] is not None:
+                warn("executor and num_threads will only be used for built-in dataset")
             return False
         else:
             raise ValueError("Unsupported dataset type: {}".format(type(dataset)))
@@ -236,8 +309,75 @@ class Pipeline:
                 target = batch_ops
                 continue
             target.append(op)
+        if self.reduced_decode:
+            instance_ops = self._reduce_decodes(instance_ops)
+        if self.fuse_ops:
+            instance_ops = self._fuse_pointwise_ops(instance_ops)
         return instance_ops, batch_info, batch_ops
 
+    def _reduce_decodes(self, ops: List[NumpyOp]) -> List[NumpyOp]:
+        """Replace ReadImage ops which feed directly into resizing ops with copies that decode at reduced resolution.
+
+        Replacements are re-used between epochs so that they are only reported (and traced) once.
+
+        Args:
+            ops: The ops to be optimized.
+
+        Returns:
+            The `ops`, where any eligible ReadImage ops have been replaced.
+        """
+        results = list(ops)
+        for idx, op in enumerate(ops):
+            if not isinstance(op, ReadImage) or op.decode_targets:
+                continue
+            targets = {}
+            for key in op.outputs:
+                # Find the next op which interacts with the image
+                consumer = next((later for later in ops[idx + 1:] if key in later.inputs or key in later.outputs), None)
+                if consumer is not None and ReadImage.can_reduce_for(consumer, key):
+                    targets[key] = consumer
+            if not targets:
+                continue
+            memo_key = (id(op), ) + tuple(id(target) for target in targets.values())
+            if memo_key not in self.reduced_read_ops:
+                self.reduced_read_ops[memo_key] = op.reduce_for(targets)
+                print("FastEstimator-Pipeline: Using reduced resolution decoding for {}".format(", ".join(
+                    "ReadImage -> {} on key {}".format(target.__class__.__name__, key)
+                    for key, target in targets.items())))
+            results[idx] = self.reduced_read_ops[memo_key]
+        return results
+
+    def _fuse_pointwise_ops(self, ops: List[NumpyOp]) -> List[NumpyOp]:
+        """Replace runs of consecutive pointwise ops with FusedPointwise ops.
+
+        Fused ops are re-used between epochs so that they are only reported (and traced) once.
+
+        Args:
+            ops: The ops to be fused.
+
+        Returns:
+            The `ops`, where any fusable runs have been replaced by FusedPointwise ops.
+        """
+        runs = []
+        for op in ops:
+            if runs and FusedPointwise.can_fuse(op) and FusedPointwise.can_fuse(runs[-1][-1]) and \
+                    op.inputs == runs[-1][-1].inputs:
+                runs[-1].append(op)
+            else:
+                runs.append([op])
+        results = []
+        for run in runs:
+            if len(run) < 2:
+                results.extend(run)
+                continue
+            key = tuple(id(op) for op in run)
+            if key not in self.fused_ops:
+                self.fused_ops[key] = FusedPointwise(run)
+                print("FastEstimator-Pipeline: Fused ops {} on key(s) {}".format(
+                    " -> ".join(op.__class__.__name__ for op in run), ", ".join(run[0].inputs)))
+            results.append(self.fused_ops[key])
+        return results
+
     def get_modes(self, epoch: Optional[int] = None) -> Set[str]:
         """Get the modes for which the Pipeline has data.
 
@@ -285,9 +425,19 @@ class Pipeline:
                   ds_id: Optional[str] = None,
                   num_steps: int = 1000,
                   log_interval: int = 100,
-                  detailed: bool = True) -> None:
+                  detailed: bool = True,
+                  executors: Union[None, str, List[str]] = None,
+                  save_path: Optional[str] = None) -> BenchmarkResults:
         """Benchmark the pipeline processing speed.
 
+        In addition to printing the results, this method returns them in a structured form which can be saved and then
+        compared against future benchmarks in order to detect performance regressions.
+
+        ```python
+        results = pipeline.benchmark(num_steps=500, save_path="benchmark.json")
+        regressions = results.compare(fe.summary.BenchmarkResults.load("baseline.json"))
+        ```
+
         Args:
             mode: The execution mode to benchmark. This can be 'train', 'eval' or 'test'.
             epoch: The epoch index to benchmark. Note that epoch indices are 1-indexed.
@@ -295,156 +445,399 @@ class Pipeline:
             num_steps: The number of steps over which to perform the benchmark.
             log_interval: The logging interval.
             detailed: Whether to display the detailed time used by each operator.
+            executors: Which executor(s) ('process', 'thread', 'hybrid') to benchmark. If None, the Pipeline's own
+                executor will be used. If multiple executors are given, each of them will be benchmarked in turn and
+                their average speeds will be compared.
+            save_path: If provided, the results will also be written to this path as JSON.
+
+        Returns:
+            The benchmark results.
         """
         if ds_id is None:
             ds_ids = self.get_ds_ids(epoch=epoch, mode=mode)
         else:
             ds_ids = [ds_id]
+        executors = to_list(executors) or [self.executor]
+        for executor in executors:
+            assert executor in FEDataLoader.EXECUTORS, \
+                "executor must be one of {}, but got {}".format(FEDataLoader.EXECUTORS, executor)
+        original_executor = self.executor
+        speeds = {}
+        results = BenchmarkResults(mode=mode, epoch=epoch)
 
-        for ds_id in ds_ids:
-            with self(mode=mode, epoch=epoch, ds_id=ds_id, steps_per_epoch=num_steps) as loader:
-                if isinstance(loader, tf.data.Dataset):
-                    loader = loader.take(num_steps)
-                start = time.perf_counter()
-                for idx, _ in enumerate(loader, start=1):
-                    if idx % log_interval == 0:
-                        duration = time.perf_counter() - start
-                        iters_per_sec = log_interval / duration
-                        ds_str = f"Dataset: {ds_id}, " if ds_id else ""
-                        print("FastEstimator-Benchmark ({}): {}Step: {}, Epoch: {}, Steps/sec: {}".format(
-                            mode.capitalize(), ds_str, idx, epoch, iters_per_sec))
-                        start = time.perf_counter()
-                # Pipeline Operations Benchmarking when using FEDataset
-                if isinstance(loader, FEDataLoader) and isinstance(loader.dataset, OpDataset) and detailed:
-                    # (n_visited, duration)
-                    duration_list = np.zeros(shape=(len(self.ctx_ops) + 1 + len(self.ctx_batch_ops), 2))
-                    data_len = len(loader.dataset)
-                    ds_str = f", Dataset: {ds_id}" if ds_id else ""
-                    print("\nBreakdown of time taken by Pipeline Operations (Mode: {}, Epoch: {}{})\n".format(
-                        mode.capitalize(), epoch, ds_str))
-                    extra_memory_management_time = 0
-                    for _ in range(log_interval):
-                        filtered = False
-                        batch = []
-                        index = np.random.randint(data_len)
-                        items = deepcopy(loader.dataset.dataset[index])
-                        if isinstance(items, list):
-                            while not batch:
-                                filtered = False
-                                # BatchDataset may randomly sample the same elements multiple times, avoid reprocessing
-                                unique_samples = set()
-                                for item in items:
-                                    if id(item) not in unique_samples:
-                                        for i, op in enumerate(self.ctx_ops):
-                                            start = time.perf_counter()
-                                            op_data = forward_numpyop([op], item, {'mode': loader.dataset.mode})
-                                            duration = time.perf_counter() - start
-                                            duration_list[i][0] += 1
-                                            duration_list[i][1] += duration
-                                            if isinstance(op_data, FilteredData):
-                                                filtered = True
-                                                break
-                                        unique_samples.add(id(item))
-                                if not filtered:
-                                    batch = items
-                        else:
-                            while len(batch) < (self.ctx_batch_size or 1):
-                                filtered = False
-                                for i, op in enumerate(self.ctx_ops):
-                                    start = time.perf_counter()
-                                    op_data = forward_numpyop([op], items, {'mode': mode})
-                                    duration = time.perf_counter() - start
-                                    duration_list[i][0] += 1
-                                    duration_list[i][1] += duration
-                                    if isinstance(op_data, FilteredData):
-                                        filtered = True
-                                        break
-                                if not filtered:
-                                    batch.append(items)
-                                index = np.random.randint(data_len)
-                                items = deepcopy(loader.dataset.dataset[index])
-                        if not filtered:
-                            # Perform the batching
-                            start = time.perf_counter()
-                            batch = self.ctx_batch_info.collate_fn(batch)
+        for ds_id, executor in itertools.product(ds_ids, executors):
+            if len(executors) > 1:
+                # Persistent workers need to be restarted in order to pick up the new executor
+                self.shutdown()
+            self.executor = executor
+            try:
+                with self(mode=mode, epoch=epoch, ds_id=ds_id, steps_per_epoch=num_steps) as loader:
+                    if isinstance(loader, tf.data.Dataset):
+                        loader = loader.take(num_steps)
+                    start = time.perf_counter()
+                    benchmark_start, n_steps = start, 0
+                    for idx, _ in enumerate(loader, start=1):
+                        n_steps = idx
+                        if idx % log_interval == 0:
                             duration = time.perf_counter() - start
-                            duration_list[len(self.ctx_ops)][0] += 1
-                            duration_list[len(self.ctx_ops)][1] += duration
-                            # Perform batch ops
+                            iters_per_sec = log_interval / duration
+                            ds_str = f"Dataset: {ds_id}, " if ds_id else ""
+                            exec_str = f"Executor: {executor}, " if len(executors) > 1 else ""
+                            print("FastEstimator-Benchmark ({}): {}{}Step: {}, Epoch: {}, Steps/sec: {}".format(
+                                mode.capitalize(), ds_str, exec_str, idx, epoch, iters_per_sec))
                             start = time.perf_counter()
-                            # Transform to numpy to not bias against the first op in the batch_op chain
-                            batch = to_tensor(batch, target_type='np')
-                            extra_memory_management_time += time.perf_counter() - start
-
-                            for i, op in enumerate(self.ctx_batch_ops, start=len(self.ctx_ops) + 1):
+                    benchmark_duration = time.perf_counter() - benchmark_start
+                    speeds[executor] = n_steps / max(benchmark_duration, 1e-9)
+            finally:
+                self.executor = original_executor
+            peak_rss, peak_worker_rss = get_peak_rss_mb()
+            run = {
+                'ds_id': ds_id,
+                'executor': executor,
+                'num_process': self.num_process,
+                'batch_size': self.ctx_batch_size,
+                'steps': n_steps,
+                'duration_s': benchmark_duration,
+                'steps_per_sec': speeds[executor],
+                'peak_rss_mb': peak_rss,
+                'peak_worker_rss_mb': peak_worker_rss,
+                'ops': None,
+                'collation_ms': None,
+                'batch_ops_ms': None,
+                'conversion_ms': None,
+                'ipc_ms': None,
+                'worker_ms_per_step': None,
+                'worker_utilization': None,
+                'decode_savings': None,
+                'padding_ratio': None,
+                'unbucketed_padding_ratio': None
+            }
+            results.runs.append(run)
+            if isinstance(loader, FEDataLoader) and isinstance(loader.sampler, LengthBucketSampler):
+                run['padding_ratio'] = loader.sampler.padding_ratio
+                run['unbucketed_padding_ratio'] = loader.sampler.unbucketed_padding_ratio
+            if executor != executors[-1]:
+                continue
+            if len(executors) > 1:
+                ds_str = f", Dataset: {ds_id}" if ds_id else ""
+                print("\nComparison of Pipeline executors (Mode: {}, Epoch: {}{})\n".format(
+                    mode.capitalize(), epoch, ds_str))
+                max_exec_len = max(len(name) for name in speeds)
+                fastest = max(speeds.values())
+                for name, speed in speeds.items():
+                    print("{}: {:.2f} Steps/sec ({:.2f}x of fastest)".format(
+                        name.ljust(max_exec_len + 1), speed, speed / max(fastest, 1e-9)))
+                speeds.clear()
+            # Pipeline Operations Benchmarking when using FEDataset
+            if isinstance(loader, FEDataLoader) and isinstance(loader.dataset, OpDataset) and detailed:
+                # (n_visited, duration)
+                duration_list = np.zeros(shape=(len(self.ctx_ops) + 1 + len(self.ctx_batch_ops), 2))
+                data_len = len(loader.dataset)
+                ds_str = f", Dataset: {ds_id}" if ds_id else ""
+                print("\nBreakdown of time taken by Pipeline Operations (Mode: {}, Epoch: {}{})\n".format(
+                    mode.capitalize(), epoch, ds_str))
+                extra_memory_management_time = 0
+                ipc_time, n_batches = 0, 0
+                for _ in range(log_interval):
+                    filtered = False
+                    batch = []
+                    index = np.random.randint(data_len)
+                    items = deepcopy(loader.dataset.dataset[index])
+                    if isinstance(items, list):
+                        while not batch:
+                            filtered = False
+                            # BatchDataset may randomly sample the same elements multiple times, avoid reprocessing
+                            unique_samples = set()
+                            for item in items:
+                                if id(item) not in unique_samples:
+                                    for i, op in enumerate(self.ctx_ops):
+                                        start = time.perf_counter()
+                                        op_data = forward_numpyop([op], item, {'mode': loader.dataset.mode})
+                                        duration = time.perf_counter() - start
+                                        duration_list[i][0] += 1
+                                        duration_list[i][1] += duration
+                                        if isinstance(op_data, FilteredData):
+                                            filtered = True
+                                            break
+                                    unique_samples.add(id(item))
+                            if not filtered:
+                                batch = items
+                    else:
+                        while len(batch) < (self.ctx_batch_size or 1):
+                            filtered = False
+                            for i, op in enumerate(self.ctx_ops):
                                 start = time.perf_counter()
-                                op_data = forward_numpyop([op], data=batch, state={'mode': mode}, batched='np')
+                                op_data = forward_numpyop([op], items, {'mode': mode})
                                 duration = time.perf_counter() - start
                                 duration_list[i][0] += 1
                                 duration_list[i][1] += duration
                                 if isinstance(op_data, FilteredData):
+                                    filtered = True
                                     break
-                            # Count extra time needed to cast data back to torch
+                            if not filtered:
+                                batch.append(items)
+                            index = np.random.randint(data_len)
+                            items = deepcopy(loader.dataset.dataset[index])
+                    if not filtered:
+                        # Perform the batching
+                        start = time.perf_counter()
+                        batch = self.ctx_batch_info.collate_fn(batch)
+                        duration = time.perf_counter() - start
+                        duration_list[len(self.ctx_ops)][0] += 1
+                        duration_list[len(self.ctx_ops)][1] += duration
+                        n_batches += 1
+                        if self.num_process > 0 and executor != 'thread':
+                            # Workers have to send their batches back to the main process
                             start = time.perf_counter()
-                            to_tensor(batch, target_type='torch', shared_memory=True)
-                            extra_memory_management_time += time.perf_counter() - start
-
-                    if self.ctx_batch_ops:
-                        # Extra memory management penalty is only incurred when using batch ops
-                        duration_list[len(self.ctx_ops)][1] += extra_memory_management_time
-
-                    total_time = np.sum(duration_list[:, 1])
-                    normalized_times_ms = 1000 * duration_list[:, 1] / np.maximum(duration_list[:, 0], 1)
-                    op_names = ["Op"]
-
-                    for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops:
-                        if isinstance(op, Sometimes) and op.op:
-                            op_names.append(op.__class__.__name__ + " (" + op.op.__class__.__name__ + ")")
-                        elif isinstance(op, Repeat) and op.op:
-                            op_names.append(op.__class__.__name__ + " (" + op.op.__class__.__name__ + ")")
-                        elif isinstance(op, OneOf) and op.ops:
-                            op_names.append(op.__class__.__name__ + " (" +
-                                            ", ".join([sub_op.__class__.__name__ for sub_op in op.ops]) + ")")
-                        elif isinstance(op, Fuse) and op.ops:
-                            op_names.append(op.__class__.__name__ + " (" +
-                                            ", ".join([sub_op.__class__.__name__ for sub_op in op.ops]) + ")")
-                        elif isinstance(op, Batch):
-                            op_names.append("<Collating Batch>")
-                        else:
-                            op_names.append(op.__class__.__name__)
-
-                    max_op_len = max(len(op_name) for op_name in op_names)
-                    max_in_len = max(
-                        [len(", ".join(op.inputs))
-                         for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops] + [len("Inputs")])
-                    max_out_len = max([
-                        len(", ".join(op.outputs)) for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops
-                    ] + [len("Outputs")])
-                    ms_visit_len = max(len("{:.3f}".format(max(normalized_times_ms))), len("ms / Visit"))
-                    visit_len = max(len(f"{int(np.max(duration_list[:, 0]))}"), len("Visits"))
-
-                    print("{}: {}: {}: {}: {}: {}".format("Op".ljust(max_op_len + 1),
-                                                          "Inputs".ljust(max_in_len + 1),
-                                                          "Outputs".ljust(max_out_len + 1),
-                                                          "ms / Visit".ljust(ms_visit_len + 1),
-                                                          "Visits".ljust(visit_len + 1),
-                                                          "Time (Total)".rjust(12)))
-                    print("-" * (max_op_len + max_in_len + max_out_len + visit_len + 37))
-                    for i, op in enumerate(self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops):
-                        print("{}: {}: {}: {}: {}: {:11.2f}%".format(
-                            op_names[i + 1].ljust(max_op_len + 1),
-                            ", ".join(op.inputs).ljust(max_in_len + 1),
-                            ", ".join(op.outputs).ljust(max_out_len + 1),
-                            "{:.3f}".format(normalized_times_ms[i]).ljust(ms_visit_len + 1),
-                            str(int(duration_list[i][0])).ljust(visit_len + 1),
-                            100 * duration_list[i][1] / total_time))
-                    if self.ctx_batch_ops:
-                        penalty = round(
-                            100 * (duration_list[len(self.ctx_ops)][1] - extra_memory_management_time) /
-                            duration_list[len(self.ctx_ops)][1],
-                            1)
-                        print(f"\nNote that collation time would be cut by ~{penalty}% if there were no batched ops.")
-                print("\n")  # to make printing more obvious
+                            pickle.loads(pickle.dumps(batch, protocol=pickle.HIGHEST_PROTOCOL))
+                            ipc_time += time.perf_counter() - start
+                        # Perform batch ops
+                        start = time.perf_counter()
+                        # Transform to numpy to not bias against the first op in the batch_op chain
+                        batch = to_tensor(batch, target_type='np')
+                        extra_memory_management_time += time.perf_counter() - start
+
+                        for i, op in enumerate(self.ctx_batch_ops, start=len(self.ctx_ops) + 1):
+                            start = time.perf_counter()
+                            op_data = forward_numpyop([op], data=batch, state={'mode': mode}, batched='np')
+                            duration = time.perf_counter() - start
+                            duration_list[i][0] += 1
+                            duration_list[i][1] += duration
+                            if isinstance(op_data, FilteredData):
+                                break
+                        # Count extra time needed to cast data back to torch
+                        start = time.perf_counter()
+                        to_tensor(batch, target_type='torch', shared_memory=True)
+                        extra_memory_management_time += time.perf_counter() - start
+
+                collation_time = duration_list[len(self.ctx_ops)][1]
+                if self.ctx_batch_ops:
+                    # Extra memory management penalty is only incurred when using batch ops
+                    duration_list[len(self.ctx_ops)][1] += extra_memory_management_time
+
+                total_time = np.sum(duration_list[:, 1])
+                normalized_times_ms = 1000 * duration_list[:, 1] / np.maximum(duration_list[:, 0], 1)
+                op_names = ["Op"]
+
+                for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops:
+                    if isinstance(op, Sometimes) and op.op:
+                        op_names.append(op.__class__.__name__ + " (" + op.op.__class__.__name__ + ")")
+                    elif isinstance(op, Repeat) and op.op:
+                        op_names.append(op.__class__.__name__ + " (" + op.op.__class__.__name__ + ")")
+                    elif isinstance(op, OneOf) and op.ops:
+                        op_names.append(op.__class__.__name__ + " (" +
+                                        ", ".join([sub_op.__class__.__name__ for sub_op in op.ops]) + ")")
+                    elif isinstance(op, (Fuse, FusedPointwise)) and op.ops:
+                        op_names.append(op.__class__.__name__ + " (" +
+                                        ", ".join([sub_op.__class__.__name__ for sub_op in op.ops]) + ")")
+                    elif isinstance(op, Batch):
+                        op_names.append("<Collating Batch>")
+                    else:
+                        op_names.append(op.__class__.__name__)
+
+                max_op_len = max(len(op_name) for op_name in op_names)
+                max_in_len = max(
+                    [len(", ".join(op.inputs))
+                     for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops] + [len("Inputs")])
+                max_out_len = max([
+                    len(", ".join(op.outputs)) for op in self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops
+                ] + [len("Outputs")])
+                ms_visit_len = max(len("{:.3f}".format(max(normalized_times_ms))), len("ms / Visit"))
+                visit_len = max(len(f"{int(np.max(duration_list[:, 0]))}"), len("Visits"))
+
+                print("{}: {}: {}: {}: {}: {}".format("Op".ljust(max_op_len + 1),
+                                                      "Inputs".ljust(max_in_len + 1),
+                                                      "Outputs".ljust(max_out_len + 1),
+                                                      "ms / Visit".ljust(ms_visit_len + 1),
+                                                      "Visits".ljust(visit_len + 1),
+                                                      "Time (Total)".rjust(12)))
+                print("-" * (max_op_len + max_in_len + max_out_len + visit_len + 37))
+                for i, op in enumerate(self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops):
+                    print("{}: {}: {}: {}: {}: {:11.2f}%".format(
+                        op_names[i + 1].ljust(max_op_len + 1),
+                        ", ".join(op.inputs).ljust(max_in_len + 1),
+                        ", ".join(op.outputs).ljust(max_out_len + 1),
+                        "{:.3f}".format(normalized_times_ms[i]).ljust(ms_visit_len + 1),
+                        str(int(duration_list[i][0])).ljust(visit_len + 1),
+                        100 * duration_list[i][1] / total_time))
+                if self.ctx_batch_ops:
+                    penalty = round(
+                        100 * (duration_list[len(self.ctx_ops)][1] - extra_memory_management_time) /
+                        duration_list[len(self.ctx_ops)][1],
+                        1)
+                    print(f"\nNote that collation time would be cut by ~{penalty}% if there were no batched ops.")
+                n_batches = max(n_batches, 1)
+                run['ops'] = [{
+                    'name': op_names[i + 1],
+                    'inputs': list(op.inputs),
+                    'outputs': list(op.outputs),
+                    'ms_per_visit': float(normalized_times_ms[i]),
+                    'visits': int(duration_list[i][0]),
+                    'percent': float(100 * duration_list[i][1] / max(total_time, 1e-12))
+                } for i, op in enumerate(self.ctx_ops + [self.ctx_batch_info] + self.ctx_batch_ops)]
+                run['collation_ms'] = 1000 * collation_time / n_batches
+                run['batch_ops_ms'] = 1000 * np.sum(duration_list[len(self.ctx_ops) + 1:, 1]) / n_batches
+                run['conversion_ms'] = 1000 * extra_memory_management_time / n_batches if self.ctx_batch_ops else 0.0
+                run['ipc_ms'] = 1000 * ipc_time / n_batches
+                run['worker_ms_per_step'] = 1000 * total_time / n_batches
+                n_workers = max(self.num_process, 1) if executor != 'hybrid' else max(self.num_process, 1) * (
+                    FEDataLoader.HYBRID_THREADS if self.num_threads is None else max(self.num_threads, 1))
+                run['worker_utilization'] = total_time / n_batches * run['steps_per_sec'] / n_workers
+                decode_savings = self._measure_decode_savings(loader.dataset,
+                                                              mode=mode,
+                                                              num_samples=min(log_interval, 20))
+                if decode_savings:
+                    run['decode_savings'] = decode_savings
+            print("\n")  # to make printing more obvious
+        if save_path:
+            results.save(save_path)
+        return results
+
+    def _measure_decode_savings(self, op_dataset: OpDataset, mode: str, num_samples: int) -> List[Dict[str, Any]]:
+        """Measure how much time is saved by any reduced resolution ReadImage ops in the current context.
+
+        Args:
+            op_dataset: The dataset being benchmarked.
+            mode: The current mode.
+            num_samples: How many samples to measure.
+
+        Returns:
+            A summary of the savings for every reduced resolution ReadImage op.
+        """
+        savings = []
+        for idx, op in enumerate(self.ctx_ops):
+            if not isinstance(op, ReadImage) or not op.decode_targets:
+                continue
+            full_op = op.reduce_for({})
+            targets = list({id(target): target for target in op.decode_targets.values()}.values())
+            durations = {'full': 0.0, 'reduced': 0.0}
+            n_measured = 0
+            for _ in range(num_samples):
+                items = deepcopy(op_dataset.dataset[np.random.randint(len(op_dataset.dataset))])
+                if isinstance(items, list):
+                    items = items[0]
+                if isinstance(forward_numpyop(self.ctx_ops[:idx], items, {'mode': mode}), FilteredData):
+                    continue
+                # Warm up any file system caches so that the full decode isn't penalized for being first
+                forward_numpyop([full_op], dict(items), {'mode': mode})
+                for name, read_op in (('full', full_op), ('reduced', op)):
+                    start = time.perf_counter()
+                    forward_numpyop([read_op] + targets, dict(items), {'mode': mode})
+                    durations[name] += time.perf_counter() - start
+                n_measured += 1
+            if n_measured == 0:
+                continue
+            full_ms, reduced_ms = (1000 * durations[name] / n_measured for name in ('full', 'reduced'))
+            description = ", ".join("ReadImage -> {} on key {}".format(target.__class__.__name__, key)
+                                    for key, target in op.decode_targets.items())
+            print("FastEstimator-Benchmark: Reduced resolution decoding ({}) took {:.3f} ms / sample vs {:.3f} ms / "
+                  "sample at full resolution, saving {:.3f} ms / sample ({:.1f}%)".format(
+                      description,
+                      reduced_ms,
+                      full_ms,
+                      full_ms - reduced_ms,
+                      100 * (full_ms - reduced_ms) / max(full_ms, 1e-12)))
+            savings.append({
+                'keys': list(op.decode_targets.keys()),
+                'targets': [target.__class__.__name__ for target in op.decode_targets.values()],
+                'full_ms': full_ms,
+                'reduced_ms': reduced_ms,
+                'saved_ms': full_ms - reduced_ms
+            })
+        return savings
+
+    def tune_num_process(self,
+                         mode: str = 'train',
+                         epoch: int = 1,
+                         ds_id: Optional[str] = None,
+                         num_steps: int = 50,
+                         max_process: Optional[int] = None,
+                         tolerance: float = 0.1) -> int:
+        """Pick a good value for `num_process` by measuring the throughput of this Pipeline.
+
+        The Pipeline is benchmarked with 0, 1, 2, 4, ... processes, up to `max_process`. The smallest number of processes
+        which achieves a throughput within `tolerance` of the best one observed (the knee of the throughput curve) is
+        then chosen, and this Pipeline's `num_process` is updated accordingly. The choice is cached in
+        fe.fe_autotune_path, keyed by the configuration of the Pipeline and of the host, so that subsequent runs can
+        skip the measurement. This is invoked automatically when a Pipeline is created with `num_process`='auto'.
+
+        Args:
+            mode: The mode to measure.
+            epoch: The epoch to measure.
+            ds_id: The ds_id to measure. If None, the first ds_id available for the given `mode` and `epoch` will be used.
+            num_steps: How many steps to run for each measurement.
+            max_process: The largest number of processes to consider. If None, min(n_cpus, max(32, 32*n_gpus)) will be
+                used.
+            tolerance: How close (fractionally) to the best throughput the chosen number of processes must be.
+
+        Returns:
+            The chosen number of processes.
+        """
+        # Prevent the benchmark from recursively triggering a second round of tuning
+        self.auto_num_process = False
+        if ds_id is None:
+            ds_ids = self.get_ds_ids(epoch=epoch, mode=mode)
+            ds_id = ds_ids[0] if ds_ids else ''
+        if mode not in self.data or ds_id not in self.data[mode]:
+            return self.num_process
+        data = self.data[mode][ds_id]
+        if isinstance(data, Scheduler):
+            data = data.get_current_value(epoch)
+        if not isinstance(data, Dataset):
+            return self.num_process
+        if max_process is None:
+            max_process = min(cpu_count(), 32 * get_num_devices())
+        instance_ops, batch_info, batch_ops = self._get_op_split(mode=mode, epoch=epoch, ds_id=ds_id)
+        config = (type(data).__qualname__, len(data), [_get_op_config(op) for op in instance_ops + batch_ops],
+                  batch_info.batch_size or self.batch_size, self.executor, self.num_threads, max_process, num_steps,
+                  tolerance, cpu_count(), platform.node())
+        signature = hashlib.md5(repr(config).encode('utf8')).hexdigest()
+        cache_path = fe.fe_autotune_path
+        if cache_path is None:
+            cache_path = os.path.join(str(Path.home()), 'fastestimator_data', 'autotune.json')
+        cached = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r') as file:
+                    cached = json.load(file)
+            except (OSError, ValueError):
+                cached = {}  # A corrupted cache is not worth crashing over
+        if signature in cached:
+            self.num_process = cached[signature]
+            print(f"FastEstimator-Pipeline: Using cached num_process: {self.num_process}")
+            return self.num_process
+        candidates = [0]
+        if max_process > 0:
+            candidates += [2**i for i in range(max_process.bit_length()) if 2**i < max_process] + [max_process]
+        speeds = {}
+        original = self.num_process
+        try:
+            for num_process in candidates:
+                self.shutdown()  # Persistent workers need to be restarted in order to change their count
+                self.num_process = num_process
+                with contextlib.redirect_stdout(io.StringIO()):
+                    results = self.benchmark(mode=mode,
+                                             epoch=epoch,
+                                             ds_id=ds_id,
+                                             num_steps=num_steps,
+                                             log_interval=num_steps,
+                                             detailed=False)
+                speeds[num_process] = results.get_run(ds_id=ds_id)['steps_per_sec']
+                if speeds[num_process] < (1 - tolerance) * max(speeds.values()):
+                    break  # Throughput is falling off, so more processes won't help
+        finally:
+            self.num_process = original
+            self.shutdown()
+        best = max(speeds.values())
+        self.num_process = min(n for n, speed in speeds.items() if speed >= (1 - tolerance) * best)
+        print("FastEstimator-Pipeline: Selected num_process: {} (Steps/sec by num_process: {})".format(
+            self.num_process, ", ".join(f"{n}: {speed:.1f}" for n, speed in speeds.items())))
+        if cache_path:
+            cached[signature] = self.num_process
+            os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+            with open(cache_path, 'w') as file:
+                json.dump(cached, file, indent=2)
+        return self.num_process
 
     def get_scheduled_items(self, mode: str) -> List[Any]:
         """Get a list of items considered for scheduling.
@@ -572,10 +965,35 @@ class Pipeline:
         Raises:
             ValueError: If called while the pipeline already has an active loader.
         """
+        if self.auto_num_process and not self.ctx_lock.locked():
+            self.tune_num_process(mode=mode, epoch=epoch, ds_id=ds_id)
         # Make sure that a loader isn't currently instantiated with other settings
         acquired = self.ctx_lock.acquire(blocking=False)
         if not acquired:
             raise ValueError("You cannot invoke a Pipeline's __call__ method while it already has an active loader.")
+        self._set_ctx(mode=mode, epoch=epoch, ds_id=ds_id, shuffle=shuffle, steps_per_epoch=steps_per_epoch,
+                      output_keys=output_keys)
+        self.ctx_lock.release()
+        return self
+
+    def _set_ctx(self,
+                 mode: str,
+                 epoch: int = 1,
+                 ds_id: str = '',
+                 shuffle: Optional[bool] = None,
+                 steps_per_epoch: Optional[int] = None,
+                 output_keys: Optional[Set[str]] = None) -> None:
+        """Update the context variables of this Pipeline without acquiring the context lock.
+
+        Args:
+            mode: The execution mode for the loader. This can be 'train', 'eval' or 'test'.
+            epoch: The epoch index for the loader. Note that epoch indices are 1-indexed.
+            ds_id: The dataset id to consider for the loader.
+            shuffle: Whether to shuffle the data. If None, the value for shuffle is based on mode.
+            steps_per_epoch: Training or Evaluation will be cut short or extended to complete N steps even if loader is
+                not yet exhausted. If None, all data will be used.
+            output_keys: What keys can be produced from pipeline. If None or empty, all keys will be considered.
+        """
         self.ctx_mode = mode
         self.ctx_epoch = epoch
         self.ctx_ds_id = ds_id
@@ -597,8 +1015,6 @@ class Pipeline:
             if isinstance(batch_size, Scheduler):
                 batch_size = batch_size.get_current_value(self.ctx_epoch)
             self.ctx_batch_size = batch_size
-        self.ctx_lock.release()
-        return self
 
     def __enter__(self) -> Union[DataLoader, tf.data.Dataset]:
         """Get a data loader from the Pipeline for the current epoch and mode.
@@ -628,25 +1044,22 @@ class Pipeline:
         if self.ctx_ds_id not in self.data[self.ctx_mode]:
             self.ctx_lock.release()
             raise KeyError(f"The dataset id '{self.ctx_ds_id}' is not present in {self.ctx_mode} mode")
-        data = self.data[self.ctx_mode][self.ctx_ds_id]
-        if isinstance(data, Scheduler):
-            data = data.get_current_value(self.ctx_epoch)
+        data = self._get_ctx_data()
         if isinstance(data, Dataset):
-            # Results will be immediately converted to tensors, so don't need deep_remainder
-            op_dataset = OpDataset(data,
-                                   self.ctx_ops,
-                                   self.ctx_mode,
-                                   self.ctx_output_keys | self.ctx_batch_input_keys if self.ctx_output_keys else None,
-                                   deep_remainder=False)
-            # check whether to batch the data
-            batch_size = None if op_dataset.fe_batch else self.ctx_batch_size
-            # Figure out whether a postprocessing function is needed (for batched ops)
-            postprocess_fn = None
-            if self.ctx_batch_ops:
-                postprocess_fn = functools.partial(_batch_postprocess,
-                                                   ops=self.ctx_batch_ops,
-                                                   output_keys=self.ctx_output_keys,
-                                                   mode=self.ctx_mode)
+            op_dataset, batch_size, postprocess_fn = self._build_op_dataset(data)
+            worker_pool, worker_ctx = None, None
+            if self.persistent_workers and self.num_process > 0 and self.executor != 'thread':
+                if self.worker_pool is None:
+                    num_threads = 0
+                    if self.executor == 'hybrid':
+                        num_threads = FEDataLoader.HYBRID_THREADS if self.num_threads is None else self.num_threads
+                    self.worker_pool = PersistentWorkerPool(resolve_fn=self._resolve_worker_ctx,
+                                                            num_workers=self.num_process,
+                                                            num_threads=num_threads)
+                worker_pool, worker_ctx = self.worker_pool, self._get_worker_ctx()
+            bucket_lengths, new_lengths = None, False
+            if batch_size is not None and self.ctx_batch_info.bucket_by is not None:
+                bucket_lengths, new_lengths = self._get_bucket_lengths(data)
             try:
                 data = FEDataLoader(op_dataset,
                                     postprocess_fn=postprocess_fn,
@@ -655,10 +1068,23 @@ class Pipeline:
                                     steps_per_epoch=self.ctx_steps_per_epoch,
                                     num_workers=self.num_process,
                                     drop_last=self.ctx_batch_info.drop_last,
-                                    collate_fn=self.ctx_batch_info.collate_fn)
+                                    collate_fn=self.ctx_batch_info.collate_fn,
+                                    worker_pool=worker_pool,
+                                    worker_ctx=worker_ctx,
+                                    executor=self.executor,
+                                    num_threads=self.num_threads,
+                                    bucket_lengths=bucket_lengths,
+                                    bucket_pool_size=self.ctx_batch_info.bucket_pool_size)
             except ValueError as err:
                 self.ctx_lock.release()
                 raise err
+            if new_lengths and isinstance(data.sampler, LengthBucketSampler):
+                ds_str = f", Dataset: {self.ctx_ds_id}" if self.ctx_ds_id else ""
+                print("FastEstimator-Pipeline: Length bucketing reduced padding from {:.1%} to {:.1%} of each batch "
+                      "(Mode: {}{})".format(data.sampler.unbucketed_padding_ratio,
+                                            data.sampler.padding_ratio,
+                                            self.ctx_mode.capitalize(),
+                                            ds_str))
             self.ctx_loader = data
         return data
 
@@ -666,11 +1092,115 @@ class Pipeline:
         if self.ctx_loader is not None:
             self.ctx_loader.shutdown()
             self.ctx_loader = None
-        # Manually triggering gc here seems to be necessary in order to avoid problems with repeated invocations of FE
-        # killing one another through multi-processing.
-        gc.collect()
+        if self.worker_pool is None or not self.worker_pool.is_running():
+            # Manually triggering gc here seems to be necessary in order to avoid problems with repeated invocations of
+            # FE killing one another through multi-processing.
+            gc.collect()
+        self.ctx_lock.release()
+
+    def shutdown(self) -> None:
+        """Stop any persistent worker processes which are owned by this Pipeline.
+
+        This is only relevant when the Pipeline was created with `persistent_workers` = True. The Estimator will invoke
+        this automatically at the end of training / testing. If the Pipeline is used again afterwards, a new set of
+        workers will be started.
+
+        Raises:
+            ValueError: If called while the pipeline has an active loader.
+        """
+        acquired = self.ctx_lock.acquire(blocking=False)
+        if not acquired:
+            raise ValueError("You cannot shut down a Pipeline's workers while it has an active loader.")
+        if self.worker_pool is not None and self.worker_pool.is_running():
+            self.worker_pool.shutdown()
+            gc.collect()
         self.ctx_lock.release()
 
+    def _get_ctx_data(self) -> DataSource:
+        """Get the data source corresponding to the current mode / epoch / ds_id.
+
+        Returns:
+            The current data source.
+        """
+        data = self.data[self.ctx_mode][self.ctx_ds_id]
+        if isinstance(data, Scheduler):
+            data = data.get_current_value(self.ctx_epoch)
+        return data
+
+    def _get_bucket_lengths(self, data: Dataset) -> Tuple[Optional[np.ndarray], bool]:
+        """Measure the length of every instance of a dataset according to the current Batch Op's `bucket_by` setting.
+
+        Lengths are re-used between epochs, unless the size of the dataset has changed.
+
+        Args:
+            data: The (un-processed) dataset to be measured.
+
+        Returns:
+            (The lengths, or None if the `data` does not support bucketing, whether the lengths were newly computed).
+        """
+        if isinstance(data, StreamingDataset):
+            # The indices of a StreamingDataset are meaningless, so there is nothing to sort
+            return None, False
+        memo_key = (id(data), id(self.ctx_batch_info))
+        lengths = self.bucket_lengths.get(memo_key)
+        if lengths is not None and len(lengths) == len(data):
+            return lengths, False
+        lengths = np.array([self.ctx_batch_info.get_length(data[idx]) for idx in range(len(data))], dtype=np.int64)
+        self.bucket_lengths[memo_key] = lengths
+        return lengths, True
+
+    def _build_op_dataset(self, data: Dataset) -> Tuple[OpDataset, Optional[int], Optional[Callable]]:
+        """Wrap a dataset so that the current context's ops will be applied to it.
+
+        Args:
+            data: The dataset to be wrapped.
+
+        Returns:
+            (The wrapped dataset, the batch size to use when loading it, the postprocessing function for batched ops).
+        """
+        # Results will be immediately converted to tensors, so don't need deep_remainder
+        op_dataset = OpDataset(data,
+                               self.ctx_ops,
+                               self.ctx_mode,
+                               self.ctx_output_keys | self.ctx_batch_input_keys if self.ctx_output_keys else None,
+                               deep_remainder=False,
+                               ds_id=self.ctx_ds_id)
+        # check whether to batch the data
+        batch_size = None if op_dataset.fe_batch else self.ctx_batch_size
+        # Figure out whether a postprocessing function is needed (for batched ops)
+        postprocess_fn = None
+        if self.ctx_batch_ops:
+            postprocess_fn = functools.partial(_batch_postprocess,
+                                               ops=self.ctx_batch_ops,
+                                               output_keys=self.ctx_output_keys,
+                                               mode=self.ctx_mode)
+        return op_dataset, batch_size, postprocess_fn
+
+    def _get_worker_ctx(self) -> Tuple[str, int, str, FrozenSet[str]]:
+        """Get a compact description of the current context which can be sent to persistent worker processes.
+
+        Returns:
+            The (mode, epoch, ds_id, output_keys) of the current context.
+        """
+        return self.ctx_mode, self.ctx_epoch, self.ctx_ds_id, frozenset(self.ctx_output_keys)
+
+    def _resolve_worker_ctx(self, ctx: Tuple[str, int, str, FrozenSet[str]]) -> Tuple[OpDataset, Callable]:
+        """Rebuild a context's dataset and collate function. This is invoked within persistent worker processes.
+
+        Args:
+            ctx: The worker context generated by the main process.
+
+        Returns:
+            The dataset to draw from, and the function to use when pre-collating its data.
+        """
+        mode, epoch, ds_id, output_keys = ctx
+        # The lock can't be used here since it belongs to the main process, but this is a private copy of the Pipeline
+        self._set_ctx(mode=mode, epoch=epoch, ds_id=ds_id, output_keys=set(output_keys))
+        op_dataset, batch_size, postprocess_fn = self._build_op_dataset(self._get_ctx_data())
+        fe_batch_size = op_dataset.fe_batch or batch_size
+        collate_fn = _get_collate_fn(fe_batch_size, batch_size, self.ctx_batch_info.collate_fn)
+        return op_dataset, functools.partial(_pre_collate, try_fn=collate_fn, postprocess_fn=postprocess_fn)
+
 
 def _batch_postprocess(data: Dict[str, Any], ops: List[NumpyOp], output_keys: Set[str], mode: str) -> \
         Union[Dict[str, Any], FilteredData]:
@@ -19,6 +19,7 @@ import lazy_loader as lazy
 __getattr__, __dir__, __all__ = lazy.attach(__name__,
                                             submodules={'logs'},
                                             submod_attrs={
+                                                'benchmark': ['BenchmarkResults'],
                                                 'history': ['connect', 'delete', 'HistoryRecorder', 'HistoryReader',
                                                             'update_settings'],
                                                 'summary': ['average_summaries', 'Summary', 'ValWithError'],
@@ -26,6 +27,7 @@ __getattr__, __dir__, __all__ = lazy.attach(__name__,
 
 if TYPE_CHECKING:
     from fastestimator.summary import logs
+    from fastestimator.summary.benchmark import BenchmarkResults
     from fastestimator.summary.history import connect, delete, HistoryRecorder, HistoryReader, update_settings
     from fastestimator.summary.summary import average_summaries, Summary, ValWithError
     from fastestimator.summary.system import System
@@ -0,0 +1,198 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import json
+import os
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class BenchmarkResults:
+    """A machine-readable record of a Pipeline benchmark.
+
+    Each benchmarked (ds_id, executor) combination is recorded as a 'run' dictionary containing the following entries.
+    Times are in milliseconds, memory is in megabytes, and any entry which could not be measured is None:
+        ds_id, executor, num_process, batch_size: The configuration which was benchmarked.
+        steps, duration_s, steps_per_sec: The measured loader throughput.
+        peak_rss_mb: The peak resident memory of the main process.
+        peak_worker_rss_mb: The peak resident memory of the largest worker process which has exited so far.
+        ops: A list of {'name', 'inputs', 'outputs', 'ms_per_visit', 'visits', 'percent'} entries, one per Op (only
+            available for detailed benchmarks).
+        collation_ms: The time needed to collate one batch.
+        batch_ops_ms: The time needed to run all of the batch Ops on one batch.
+        conversion_ms: The time spent converting one batch between tensor types for the batch Ops.
+        ipc_ms: The time needed to serialize and deserialize one batch, as when sending it between processes.
+        worker_ms_per_step: The total pre-processing time needed to produce one batch.
+        worker_utilization: An estimate of the fraction of the available workers' time that was spent pre-processing,
+            based on `worker_ms_per_step` and `steps_per_sec`.
+        decode_savings: A list of {'keys', 'targets', 'full_ms', 'reduced_ms', 'saved_ms'} entries, one per ReadImage Op
+            which is decoding at reduced resolution (see the Pipeline `reduced_decode` argument), comparing the time
+            needed to read and resize one sample with and without the optimization.
+        padding_ratio, unbucketed_padding_ratio: The fraction of each batch which was padding during the most recent
+            pass over the data, with and without length bucketing (see the Batch Op `bucket_by` argument).
+
+    This class is intentionally not @traceable.
+
+    Args:
+        mode: The mode which was benchmarked.
+        epoch: The epoch which was benchmarked.
+        runs: The results of each benchmarked configuration.
+    """
+    # (name, whether larger values are better)
+    _compared_metrics = (('steps_per_sec', True), ('peak_rss_mb', False), ('collation_ms', False),
+                         ('batch_ops_ms', False), ('ipc_ms', False))
+
+    def __init__(self, mode: str, epoch: int, runs: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.mode = mode
+        self.epoch = epoch
+        self.runs = runs or []
+
+    def get_run(self, ds_id: str = '', executor: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get the results of a particular benchmarked configuration.
+
+        Args:
+            ds_id: The ds_id of the desired run.
+            executor: The executor of the desired run. If None, the last run for the given `ds_id` will be returned.
+
+        Returns:
+            The matching run, or None if no such run exists.
+        """
+        matches = [run for run in self.runs if run['ds_id'] == ds_id and executor in (None, run['executor'])]
+        return matches[-1] if matches else None
+
+    def compare(self, baseline: 'BenchmarkResults', threshold: float = 0.1, min_ms: float = 0.01) -> List[str]:
+        """Compare these results against a `baseline`, looking for performance regressions.
+
+        Throughput, peak memory, collation / batch op / IPC times, and the time of each individual Op are compared for
+        every (ds_id, executor) pair present in both results.
+
+        ```python
+        baseline = fe.summary.BenchmarkResults.load("baseline.json")
+        results = pipeline.benchmark(num_steps=500)
+        regressions = results.compare(baseline, threshold=0.2)
+        assert not regressions, "\n".join(regressions)
+        ```
+
+        Args:
+            baseline: The results to compare against.
+            threshold: The fractional change which constitutes a regression. For example, 0.1 will flag any metric
+                which is more than 10% worse than the `baseline`.
+            min_ms: Timings which are below this value (in milliseconds) in both results are considered too noisy to
+                compare.
+
+        Returns:
+            A description of each detected regression. An empty list indicates that no regressions were found.
+        """
+        if threshold < 0:
+            raise ValueError(f"threshold must be non-negative, but got {threshold}")
+        regressions = []
+        for run in self.runs:
+            base = baseline.get_run(ds_id=run['ds_id'], executor=run['executor'])
+            if base is None:
+                continue
+            prefix = f"Dataset: {run['ds_id']}, " if run['ds_id'] else ""
+            prefix += f"Executor: {run['executor']}"
+            for name, higher_better in self._compared_metrics:
+                msg = self._check(base.get(name), run.get(name), higher_better, threshold, min_ms, name.endswith('ms'))
+                if msg:
+                    regressions.append(f"{prefix}, {name}: {msg}")
+            base_ops = {(op['name'], idx): op for idx, op in enumerate(base.get('ops') or [])}
+            for idx, op in enumerate(run.get('ops') or []):
+                base_op = base_ops.get((op['name'], idx))
+                if base_op is None:
+                    continue
+                msg = self._check(base_op['ms_per_visit'], op['ms_per_visit'], False, threshold, min_ms, True)
+                if msg:
+                    regressions.append(f"{prefix}, Op {idx} ({op['name']}) ms_per_visit: {msg}")
+        return regressions
+
+    @staticmethod
+    def _check(base: Optional[float], new: Optional[float], higher_better: bool, threshold: float, min_ms: float,
+               is_time: bool) -> Optional[str]:
+        """Check whether a particular metric has regressed.
+
+        Args:
+            base: The baseline value.
+            new: The new value.
+            higher_better: Whether larger values are improvements.
+            threshold: The fractional change which constitutes a regression.
+            min_ms: The noise floor for timing metrics.
+            is_time: Whether the metric is a time in milliseconds.
+
+        Returns:
+            A description of the regression, or None if there was no regression.
+        """
+        if base is None or new is None:
+            return None
+        if is_time and max(base, new) < min_ms:
+            return None
+        if higher_better:
+            regressed = new < base * (1 - threshold)
+        else:
+            regressed = new > base * (1 + threshold)
+        if not regressed:
+            return None
+        change = (new - base) / base if base else float('inf')
+        return f"{base:.4g} -> {new:.4g} ({change:+.1%})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'mode': self.mode, 'epoch': self.epoch, 'runs': self.runs}
+
+    def save(self, path: str) -> None:
+        """Write these results to a JSON file.
+
+        Args:
+            path: Where to write the results.
+        """
+        path = os.path.abspath(os.path.normpath(path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'BenchmarkResults':
+        """Read results which were previously written by `save`.
+
+        Args:
+            path: The JSON file to read.
+
+        Returns:
+            The loaded results.
+        """
+        with open(path, 'r') as file:
+            data = json.load(file)
+        return cls(mode=data['mode'], epoch=data['epoch'], runs=data['runs'])
+
+    def __repr__(self) -> str:
+        return f"BenchmarkResults(mode={self.mode}, epoch={self.epoch}, runs={len(self.runs)})"
+
+
+def get_peak_rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    """Get the peak resident memory of this process and of its largest exited child process.
+
+    Returns:
+        (this process peak MB, child process peak MB), or Nones if the platform does not support measuring them.
+    """
+    if resource is None:
+        return None, None
+    # Linux reports kilobytes, whereas macOS reports bytes
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    main = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    child = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return main, child or None
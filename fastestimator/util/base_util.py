@@ -15,10 +15,13 @@
 
 # DO NOT IMPORT FE, TF, Torch, Numpy, Seaborn, OR Matplotlib IN THIS FILE
 import colorsys
+import hashlib
+import json
 import os
 import re
 import string
 import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Any, Callable, Dict, Iterable, KeysView, List, Literal, Optional, Set, TextIO, Tuple, Type, \
     TypeVar, Union, overload
 
@@ -30,6 +33,8 @@ from plotly.graph_objs import Figure
 KT = TypeVar('KT')  # Key type.
 VT = TypeVar('VT')  # Value type.
 
+_MANIFEST_VERSION = 1  # The file format version used by list_files manifests
+
 
 def warn(message: str) -> None:
     """Print a yellow warning message to catch the users' attention.
@@ -571,36 +576,177 @@ def get_shape(obj: Any) -> List[Optional[int]]:
     return result
 
 
-def list_files(root_dir: str, file_extension: Optional[str] = None, recursive_search: bool = True) -> List[str]:
+def _scan_dir(path: str) -> Tuple[Optional[int], List[str], List[str]]:
+    """List the contents of a single directory.
+
+    Args:
+        path: The directory to scan.
+
+    Returns:
+        The modification time of the directory (in ns), the names of the non-hidden files within it, and the names of
+        the subdirectories within it which should be searched. The modification time will be None if the directory could
+        not be read.
+    """
+    files, dirs = [], []
+    try:
+        # The mtime is checked before listing so that any concurrent modification will invalidate a manifest
+        mtime = os.stat(path).st_mtime_ns
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    # Like os.walk, symlinks to directories are not followed
+                    if not entry.is_symlink():
+                        dirs.append(entry.name)
+                elif not entry.name.startswith("."):
+                    files.append(entry.name)
+    except OSError:
+        # Like os.walk, unreadable directories are skipped
+        return None, [], []
+    return mtime, files, dirs
+
+
+def _scan_tree(root_dir: str, recursive_search: bool, num_threads: int) -> Tuple[Dict[str, int], List[str]]:
+    """Find all of the non-hidden files within a directory tree.
+
+    Args:
+        root_dir: The directory to search.
+        recursive_search: Whether to search within subdirectories.
+        num_threads: How many threads to use to scan directories concurrently.
+
+    Returns:
+        The modification times of every scanned directory, and the paths of every file found. Both use paths which are
+        relative to the `root_dir`.
+    """
+    mtimes, paths = {}, []
+
+    def record(rel_dir: str, scan: Tuple[Optional[int], List[str], List[str]]) -> List[str]:
+        mtime, files, dirs = scan
+        if mtime is not None:
+            mtimes[rel_dir] = mtime
+        paths.extend(os.path.join(rel_dir, name) for name in files)
+        return [os.path.join(rel_dir, name) for name in dirs] if recursive_search else []
+
+    if num_threads < 2:
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            pending.extend(record(rel_dir, _scan_dir(os.path.join(root_dir, rel_dir))))
+        return mtimes, paths
+    with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="FEListFiles") as pool:
+        futures = {pool.submit(_scan_dir, root_dir): ""}
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel_dir = futures.pop(future)
+                for sub_dir in record(rel_dir, future.result()):
+                    futures[pool.submit(_scan_dir, os.path.join(root_dir, sub_dir))] = sub_dir
+    return mtimes, paths
+
+
+def _load_manifest(manifest_path: str, root_dir: str, recursive_search: bool, num_threads: int) -> Optional[List[str]]:
+    """Load a cached list of files, provided that none of the directories have been modified since it was written.
+
+    Args:
+        manifest_path: The manifest file to read.
+        root_dir: The directory which the manifest is expected to describe.
+        recursive_search: Whether the manifest is expected to include subdirectories.
+        num_threads: How many threads to use when checking the directory modification times.
+
+    Returns:
+        The relative file paths from the manifest, or None if the manifest is missing or out of date.
+    """
+    try:
+        with open(manifest_path, 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != _MANIFEST_VERSION or manifest.get('root_dir') != root_dir or manifest.get(
+            'recursive_search') != recursive_search:
+        return None
+    rel_dirs = list(manifest['mtimes'].keys())
+
+    def get_mtime(rel_dir: str) -> Optional[int]:
+        try:
+            return os.stat(os.path.join(root_dir, rel_dir)).st_mtime_ns
+        except OSError:
+            return None
+
+    if num_threads < 2:
+        mtimes = [get_mtime(rel_dir) for rel_dir in rel_dirs]
+    else:
+        with ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix="FEListFiles") as pool:
+            mtimes = list(pool.map(get_mtime, rel_dirs))
+    if any(mtime != manifest['mtimes'][rel_dir] for mtime, rel_dir in zip(mtimes, rel_dirs)):
+        return None
+    return manifest['files']
+
+
+def list_files(root_dir: str,
+               file_extension: Optional[str] = None,
+               recursive_search: bool = True,
+               num_threads: Optional[int] = None,
+               cache_dir: Optional[str] = None) -> List[str]:
     """Get the paths of all files in a particular root directory subject to a particular file extension.
 
+    Subdirectories are scanned concurrently using a pool of threads. If a `cache_dir` is provided, the list of files
+    will also be saved to a manifest file in that directory. Future invocations will then re-use the manifest rather than
+    scanning the directories again, so long as none of the directories' modification times have changed (adding,
+    removing, or renaming a file or folder changes the modification time of its parent directory).
+
+    ```python
+    paths = fe.util.list_files("/data/imagenet", file_extension=".JPEG", cache_dir="/data/manifests")
+    ```
+
     Args:
         root_dir: The path to the directory containing data.
         file_extension: If provided then only files ending with the file_extension will be included.
         recursive_search: Whether to search within subdirectories for files.
+        num_threads: How many threads to use when scanning directories. If None, a default based on the number of
+            available CPUs will be used. Values less than 2 will scan the directories serially.
+        cache_dir: A directory in which to cache the results of the scan. If None, the directories will always be
+            scanned. This should not be inside of the `root_dir`, since writing the cache would then invalidate it.
 
     Returns:
-        A list of file paths found within the directory.
+        A sorted list of file paths found within the directory.
 
     Raises:
         AssertionError: If the provided path isn't a directory.
-        ValueError: If the directory has an invalid structure.
     """
-    paths = []
     root_dir = os.path.normpath(root_dir)
     if not os.path.isdir(root_dir):
         raise AssertionError("Provided path is not a directory")
-    try:
-        for root, _, files in os.walk(root_dir):
-            for file_name in files:
-                if file_name.startswith(".") or (file_extension is not None and not file_name.endswith(file_extension)):
-                    continue
-                paths.append(os.path.join(root, file_name))
-            if not recursive_search:
-                break
-    except StopIteration:
-        raise ValueError("Invalid directory structure for DirDataset at root: {}".format(root_dir))
-    return paths
+    if num_threads is None:
+        # Directory scanning is I/O bound, so use more threads than cores (same heuristic as ThreadPoolExecutor)
+        num_threads = min(32, (os.cpu_count() or 1) + 4)
+    files = None
+    manifest_path = None
+    if cache_dir is not None:
+        key = hashlib.md5(f"{os.path.abspath(root_dir)}:{recursive_search}".encode()).hexdigest()
+        manifest_path = os.path.join(cache_dir, f"{key}.json")
+        files = _load_manifest(manifest_path, os.path.abspath(root_dir), recursive_search, num_threads)
+    if files is None:
+        mtimes, files = _scan_tree(root_dir, recursive_search, num_threads)
+        if manifest_path is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            manifest = {
+                'version': _MANIFEST_VERSION,
+                'root_dir': os.path.abspath(root_dir),
+                'recursive_search': recursive_search,
+                'mtimes': mtimes,
+                'files': files
+            }
+            # Write to a temporary file first so that concurrent readers never see a partial manifest
+            tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(manifest, file)
+            os.replace(tmp_path, manifest_path)
+    if file_extension is not None:
+        files = [path for path in files if path.endswith(file_extension)]
+    return sorted(os.path.join(root_dir, path) for path in files)
 
 
 @overload
@@ -13,11 +13,16 @@
 # limitations under the License.
 # ==============================================================================
 import os
+import tempfile
 import unittest
 
+import cv2
 import numpy as np
 
+from fastestimator.dataset.numpy_dataset import NumpyDataset
+from fastestimator.op.numpyop.multivariate import LongestMaxSize, Resize
 from fastestimator.op.numpyop.univariate import ReadImage
+from fastestimator.op.numpyop.univariate.read_image import _get_format, _get_jpeg_size
 from fastestimator.test.unittest_util import is_equal
 
 
@@ -45,3 +50,120 @@ class TestReadImage(unittest.TestCase):
             self.assertTrue(is_equal(output[0], self.expected_image_output))
         with self.subTest('Check second image in data'):
             self.assertTrue(is_equal(output[1], self.expected_second_image_output))
+
+
+class TestReadImageReducedDecode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp_dir.name, "img.jpg")
+        img = np.zeros((480, 640, 3), dtype=np.uint8)
+        img[:, :320] = 255
+        cv2.imwrite(cls.path, img)
+        with open(cls.path, 'rb') as file:
+            cls.buffer = np.frombuffer(file.read(), dtype=np.uint8)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_jpeg_size(self):
+        with self.subTest("JPEG"):
+            self.assertEqual(_get_jpeg_size(self.buffer), (480, 640))
+        with self.subTest("PNG"):
+            png = cv2.imencode(".png", np.zeros((10, 10), dtype=np.uint8))[1].ravel()
+            self.assertIsNone(_get_jpeg_size(png))
+
+    def test_can_reduce_for(self):
+        with self.subTest("Resize"):
+            self.assertTrue(ReadImage.can_reduce_for(Resize(image_in="x", height=32, width=32), "x"))
+        with self.subTest("Wrong key"):
+            self.assertFalse(ReadImage.can_reduce_for(Resize(image_in="y", height=32, width=32), "x"))
+        with self.subTest("Mask"):
+            self.assertFalse(
+                ReadImage.can_reduce_for(Resize(image_in="x", mask_in="m", height=32, width=32), "x"))
+
+    def test_factor_choice(self):
+        reader = ReadImage(inputs="x", outputs="x")
+        for height, expected in ((32, 8), (100, 4), (200, 2), (400, 1)):
+            with self.subTest(height=height):
+                self.assertEqual(reader._get_factor(self.buffer, LongestMaxSize(max_size=height, image_in="x")),
+                                 expected)
+        with self.subTest("No target"):
+            self.assertEqual(reader._get_factor(self.buffer, None), 1)
+
+    def test_reduced_read(self):
+        resize = Resize(image_in="x", height=50, width=60)
+        reader = ReadImage(inputs="x", outputs="x")
+        reduced = reader.reduce_for({"x": resize})
+        with self.subTest("Original unchanged"):
+            self.assertEqual(reader.decode_targets, {})
+        full_img = reader.forward([self.path], {})[0]
+        with self.subTest("Reduced size"):
+            self.assertEqual(reduced.forward([self.path], {})[0].shape, (60, 80, 3))
+        with self.subTest("Encoded bytes"):
+            self.assertEqual(reduced.forward([self.buffer], {})[0].shape, (60, 80, 3))
+        with self.subTest("Similar after resize"):
+            expected = resize.forward([full_img], {})[0].astype(np.float32)
+            actual = resize.forward(reduced.forward([self.path], {}), {})[0].astype(np.float32)
+            self.assertEqual(actual.shape, (50, 60, 3))
+            self.assertLess(np.mean(np.abs(expected - actual)), 5)
+        with self.subTest("PIL backend"):
+            pil_reduced = ReadImage(inputs="x", outputs="x", backend="pil").reduce_for({"x": resize})
+            self.assertEqual(pil_reduced.forward([self.path], {})[0].shape, (60, 80, 3))
+
+
+class TestReadImageBackends(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.paths = []
+        for idx, ext in enumerate(("png", "jpg", "png", "jpg")):
+            cls.paths.append(os.path.join(cls.tmp_dir.name, "{}.{}".format(idx, ext)))
+            img = np.zeros((20, 30, 3), dtype=np.uint8)
+            img[..., 0] = 255  # Blue in BGR
+            cv2.imwrite(cls.paths[-1], img)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_get_format(self):
+        with self.subTest("PNG"):
+            self.assertEqual(_get_format(np.fromfile(self.paths[0], dtype=np.uint8)), "png")
+        with self.subTest("JPEG"):
+            self.assertEqual(_get_format(np.fromfile(self.paths[1], dtype=np.uint8)), "jpeg")
+        with self.subTest("Unknown"):
+            self.assertIsNone(_get_format(np.zeros((20, ), dtype=np.uint8)))
+
+    def test_backends_match(self):
+        expected = ReadImage(inputs="x", outputs="x").forward(self.paths, {})
+        for backend in ("pil", "imageio", {"png": "pil", "jpeg": "imageio"}):
+            for color_flag in ("color", "gray"):
+                with self.subTest(backend=backend, color_flag=color_flag):
+                    reader = ReadImage(inputs="x", outputs="x", backend=backend, color_flag=color_flag)
+                    results = reader.forward(self.paths, {})
+                    if color_flag == "color":
+                        # Lossless images should be identical, and everything should be RGB
+                        self.assertTrue(is_equal(results[0], expected[0]))
+                        self.assertTrue(np.all(results[1][..., 2] > 250))
+                    for result in results:
+                        self.assertEqual(result.shape, (20, 30, 3 if color_flag == "color" else 1))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(AssertionError):
+            ReadImage(inputs="x", outputs="x", backend="magic")
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            ReadImage(inputs="x", outputs="x").forward([os.path.join(self.tmp_dir.name, "missing.png")], {})
+
+    def test_tune_backend(self):
+        reader = ReadImage(inputs="x", outputs="x")
+        choice = reader.tune_backend(NumpyDataset({"x": np.array(self.paths)}), backends=["cv2", "pil"])
+        with self.subTest("Formats"):
+            self.assertEqual(set(choice.keys()), {"png", "jpeg"})
+            self.assertTrue(set(choice.values()) <= {"cv2", "pil"})
+        with self.subTest("Applied"):
+            self.assertEqual(reader.backend, choice)
+            self.assertEqual(reader.forward(self.paths[:1], {})[0].shape, (20, 30, 3))
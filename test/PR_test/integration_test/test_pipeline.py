@@ -13,6 +13,8 @@
 # limitations under the License.
 # ==============================================================================
 import itertools
+import os
+import tempfile
 import unittest
 
 import numpy as np
@@ -26,7 +28,9 @@ from fastestimator.dataset.extend_dataset import ExtendDataset
 from fastestimator.dataset.numpy_dataset import NumpyDataset
 from fastestimator.op.numpyop import NumpyOp, RemoveIf
 from fastestimator.op.numpyop.numpyop import Batch
-from fastestimator.op.numpyop.univariate import Minmax
+from fastestimator.op.numpyop.meta import FusedPointwise
+from fastestimator.op.numpyop.multivariate import Resize
+from fastestimator.op.numpyop.univariate import ChannelTranspose, Minmax, Normalize, ReadImage, ToFloat
 from fastestimator.op.tensorop import TensorOp
 from fastestimator.schedule import EpochScheduler, RepeatScheduler
 from fastestimator.test.unittest_util import is_equal
@@ -42,6 +46,11 @@ class SampleTensorOp(TensorOp):
         return data
 
 
+class PidOp(NumpyOp):
+    def forward(self, data, state):
+        return np.array(os.getpid())
+
+
 class NumpyOpAdd1(NumpyOp):
     def forward(self, data, state):
         return data + 1
@@ -775,6 +784,301 @@ class TestPipelineGetLoader(unittest.TestCase):
                 print(loader1)
 
 
+class TestPipelinePersistentWorkers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        x = np.arange(64, dtype=np.float32).reshape((16, 4))
+        cls.train_data = NumpyDataset({"x": x, "y": np.arange(16)})
+        cls.eval_data = NumpyDataset({"x": 2 * x, "y": np.arange(16)})
+
+    def _run(self, persistent_workers):
+        pipeline = fe.Pipeline(train_data=self.train_data,
+                               eval_data=self.eval_data,
+                               batch_size=4,
+                               ops=[Minmax(inputs="x", outputs="x"), PidOp(inputs="y", outputs="pid")],
+                               num_process=2,
+                               persistent_workers=persistent_workers)
+        results, pids = [], set()
+        for epoch in (1, 2):
+            for mode in ("train", "eval"):
+                with pipeline(mode=mode, epoch=epoch, shuffle=False, output_keys={"x", "pid"}) as loader:
+                    for batch in loader:
+                        results.append(batch)
+                        pids.update(batch["pid"].numpy().tolist())
+        return pipeline, results, pids
+
+    def test_persistent_workers_match_non_persistent(self):
+        _, expected, _ = self._run(persistent_workers=False)
+        pipeline, results, _ = self._run(persistent_workers=True)
+        pipeline.shutdown()
+        self.assertEqual(len(expected), len(results))
+        for target, batch in zip(expected, results):
+            self.assertEqual(set(batch.keys()), {"x", "pid"})
+            self.assertTrue(is_equal(target["x"].numpy(), batch["x"].numpy()))
+
+    def test_persistent_workers_reused(self):
+        pipeline, _, pids = self._run(persistent_workers=True)
+        with self.subTest("Workers Reused"):
+            self.assertEqual(len(pids), 2)
+            self.assertTrue(pipeline.worker_pool.is_running())
+        pipeline.shutdown()
+        with self.subTest("Workers Stopped"):
+            self.assertFalse(pipeline.worker_pool.is_running())
+
+
+class TestPipelineExecutors(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        x = np.arange(160, dtype=np.float32).reshape((40, 4))
+        cls.data = NumpyDataset({"x": x, "y": np.arange(40)})
+        cls.ops = [Minmax(inputs="x", outputs="x"), RemoveIf(fn=lambda y: y % 7 == 3, replacement=False, inputs="y")]
+
+    def _run(self, executor, persistent_workers=False):
+        pipeline = fe.Pipeline(train_data=self.data,
+                               batch_size=8,
+                               ops=self.ops,
+                               num_process=2,
+                               executor=executor,
+                               persistent_workers=persistent_workers)
+        results = []
+        for epoch in (1, 2):
+            with pipeline(mode="train", epoch=epoch, shuffle=False) as loader:
+                results.extend(batch for batch in loader)
+        pipeline.shutdown()
+        return results
+
+    def test_executors_match_process(self):
+        expected = self._run("process")
+        for executor, persistent_workers in itertools.product(("thread", "hybrid"), (False, True)):
+            with self.subTest(executor=executor, persistent_workers=persistent_workers):
+                results = self._run(executor, persistent_workers=persistent_workers)
+                self.assertEqual(len(expected), len(results))
+                for target, batch in zip(expected, results):
+                    self.assertTrue(is_equal(target["x"].numpy(), batch["x"].numpy()))
+                    self.assertTrue(is_equal(target["y"].numpy(), batch["y"].numpy()))
+
+    def test_benchmark_results(self):
+        pipeline = fe.Pipeline(train_data=self.data, batch_size=8, ops=self.ops, num_process=0)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            save_path = os.path.join(tmp_dir, "benchmark.json")
+            results = pipeline.benchmark(num_steps=10, log_interval=5, save_path=save_path)
+            loaded = fe.summary.BenchmarkResults.load(save_path)
+        run = results.get_run()
+        with self.subTest("Throughput"):
+            self.assertIn(run['steps'], (9, 10))  # RemoveIf may shorten the epoch
+            self.assertGreater(run['steps_per_sec'], 0)
+        with self.subTest("Op Breakdown"):
+            self.assertEqual([op['name'] for op in run['ops']], ["Minmax", "RemoveIf", "<Collating Batch>"])
+            self.assertGreater(run['collation_ms'], 0)
+            self.assertGreater(run['worker_utilization'], 0)
+        with self.subTest("Saved"):
+            self.assertEqual(loaded.to_dict(), results.to_dict())
+        with self.subTest("Compare"):
+            self.assertEqual(results.compare(results), [])
+
+    def test_invalid_executor(self):
+        with self.assertRaises(AssertionError):
+            fe.Pipeline(train_data=self.data, batch_size=8, executor="gpu")
+
+    def test_benchmark_executors(self):
+        pipeline = fe.Pipeline(train_data=self.data, batch_size=8, ops=self.ops, num_process=2)
+        pipeline.benchmark(num_steps=10, log_interval=5, executors=["process", "thread", "hybrid"])
+        self.assertEqual(pipeline.executor, "process")
+
+
+class TestPipelineFuseOps(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        x = np.random.randint(256, size=(12, 6, 5, 3), dtype=np.uint8)
+        cls.data = NumpyDataset({"x": x, "y": np.arange(12)})
+
+    def _get_pipeline(self, fuse_ops):
+        return fe.Pipeline(train_data=self.data,
+                           batch_size=4,
+                           ops=[
+                               ToFloat(inputs="x", outputs="x"),
+                               Normalize(inputs="x", outputs="x", mean=0.5, std=0.25, max_pixel_value=1.0),
+                               Minmax(inputs="x", outputs="x"),
+                               ChannelTranspose(inputs="x", outputs="x"),
+                               RemoveIf(fn=lambda y: y == 5, replacement=False, inputs="y"),
+                               Minmax(inputs="y", outputs="y")
+                           ],
+                           num_process=0,
+                           fuse_ops=fuse_ops)
+
+    def test_op_split(self):
+        pipeline = self._get_pipeline(fuse_ops=True)
+        instance_ops, _, _ = pipeline._get_op_split(mode="train", epoch=1, ds_id='')
+        with self.subTest("Run Fused"):
+            self.assertEqual(len(instance_ops), 3)
+            self.assertIsInstance(instance_ops[0], FusedPointwise)
+            self.assertEqual([op.__class__.__name__ for op in instance_ops[0].ops],
+                             ["ToFloat", "Normalize", "Minmax", "ChannelTranspose"])
+        with self.subTest("Re-used Between Epochs"):
+            self.assertIs(pipeline._get_op_split(mode="train", epoch=2, ds_id='')[0][0], instance_ops[0])
+
+    def test_results_match(self):
+        expected = self._get_pipeline(fuse_ops=False).get_results(num_steps=3)
+        results = self._get_pipeline(fuse_ops=True).get_results(num_steps=3)
+        for target, batch in zip(expected, results):
+            self.assertTrue(is_equal(target, batch))
+
+
+class TestPipelineReducedDecode(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        import cv2
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        paths = []
+        for idx in range(4):
+            paths.append(os.path.join(cls.tmp_dir.name, "{}.jpg".format(idx)))
+            cv2.imwrite(paths[-1], np.random.randint(256, size=(256, 320, 3), dtype=np.uint8))
+        cls.data = NumpyDataset({"x": np.array(paths), "y": np.arange(4)})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def _get_pipeline(self, ops, reduced_decode=True):
+        return fe.Pipeline(train_data=self.data, batch_size=2, ops=ops, num_process=0, reduced_decode=reduced_decode)
+
+    def test_op_split(self):
+        with self.subTest("Followed by Resize"):
+            pipeline = self._get_pipeline([ReadImage(inputs="x", outputs="x"), Resize(image_in="x", height=32, width=32)])
+            instance_ops, _, _ = pipeline._get_op_split(mode="train", epoch=1, ds_id='')
+            self.assertIsInstance(instance_ops[0], ReadImage)
+            self.assertEqual(set(instance_ops[0].decode_targets.keys()), {"x"})
+            self.assertIs(pipeline._get_op_split(mode="train", epoch=2, ds_id='')[0][0], instance_ops[0])
+        with self.subTest("Image modified before Resize"):
+            pipeline = self._get_pipeline([
+                ReadImage(inputs="x", outputs="x"),
+                Minmax(inputs="x", outputs="x"),
+                Resize(image_in="x", height=32, width=32)
+            ])
+            instance_ops, _, _ = pipeline._get_op_split(mode="train", epoch=1, ds_id='')
+            self.assertEqual(instance_ops[0].decode_targets, {})
+        with self.subTest("Disabled"):
+            pipeline = self._get_pipeline(
+                [ReadImage(inputs="x", outputs="x"), Resize(image_in="x", height=32, width=32)], reduced_decode=False)
+            instance_ops, _, _ = pipeline._get_op_split(mode="train", epoch=1, ds_id='')
+            self.assertEqual(instance_ops[0].decode_targets, {})
+
+    def test_results(self):
+        pipeline = self._get_pipeline([ReadImage(inputs="x", outputs="x"), Resize(image_in="x", height=32, width=40)])
+        batch = pipeline.get_results()
+        self.assertEqual(list(batch["x"].shape), [2, 32, 40, 3])
+
+    def test_benchmark(self):
+        pipeline = self._get_pipeline([ReadImage(inputs="x", outputs="x"), Resize(image_in="x", height=32, width=40)])
+        results = pipeline.benchmark(num_steps=4, log_interval=2)
+        savings = results.runs[0]['decode_savings']
+        self.assertEqual(len(savings), 1)
+        self.assertEqual(savings[0]['keys'], ["x"])
+        self.assertEqual(savings[0]['targets'], ["Resize"])
+        self.assertAlmostEqual(savings[0]['saved_ms'], savings[0]['full_ms'] - savings[0]['reduced_ms'])
+
+
+class TestPipelineLengthBucketing(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        lengths = np.random.RandomState(1).randint(1, 100, size=64)
+        cls.data = NumpyDataset({"x": [np.ones(length) for length in lengths], "len": lengths})
+
+    def _get_pipeline(self, bucket_by="x", drop_last=False, num_process=0):
+        return fe.Pipeline(train_data=self.data,
+                           eval_data=self.data,
+                           ops=Batch(batch_size=8, pad_value=0, drop_last=drop_last, bucket_by=bucket_by),
+                           num_process=num_process)
+
+    def _get_batches(self, pipeline, mode="train", steps_per_epoch=None):
+        with pipeline(mode=mode, steps_per_epoch=steps_per_epoch) as loader:
+            return [batch for batch in loader]
+
+    def test_padding_reduced(self):
+        bucketed = self._get_batches(self._get_pipeline())
+        unbucketed = self._get_batches(self._get_pipeline(bucket_by=None))
+        with self.subTest("All data used"):
+            self.assertEqual(sorted(np.concatenate([b["len"].numpy() for b in bucketed]).tolist()),
+                             sorted(int(x) for x in self.data["len"]))
+        with self.subTest("Less padding"):
+            self.assertLess(sum(b["x"].numel() for b in bucketed), sum(b["x"].numel() for b in unbucketed))
+
+    def test_callable_and_workers(self):
+        batches = self._get_batches(self._get_pipeline(bucket_by=lambda elem: elem["len"], num_process=2))
+        self.assertEqual(len(batches), 8)
+        self.assertEqual(sorted(np.concatenate([b["len"].numpy() for b in batches]).tolist()),
+                         sorted(int(x) for x in self.data["len"]))
+
+    def test_eval_sorted(self):
+        batches = self._get_batches(self._get_pipeline(), mode="eval")
+        lengths = np.concatenate([b["len"].numpy() for b in batches])
+        self.assertTrue(np.all(np.diff(lengths) <= 0))
+
+    def test_drop_last_and_steps(self):
+        ds = NumpyDataset({"x": [np.ones(length) for length in range(1, 21)], "len": np.arange(1, 21)})
+        pipeline = fe.Pipeline(train_data=ds, ops=Batch(batch_size=8, pad_value=0, drop_last=True, bucket_by="x"))
+        with self.subTest("drop_last"):
+            batches = self._get_batches(pipeline)
+            self.assertEqual([len(b["len"]) for b in batches], [8, 8])
+        with self.subTest("steps_per_epoch"):
+            batches = self._get_batches(pipeline, steps_per_epoch=7)
+            self.assertEqual([len(b["len"]) for b in batches], [8] * 7)
+
+    def test_benchmark(self):
+        results = self._get_pipeline().benchmark(num_steps=8, log_interval=4, detailed=False)
+        run = results.runs[0]
+        self.assertLess(run["padding_ratio"], run["unbucketed_padding_ratio"])
+
+
+class TestPipelineTuneNumProcess(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = NumpyDataset({"x": np.arange(400, dtype=np.float32).reshape((100, 4))})
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.original_path = fe.fe_autotune_path
+        fe.fe_autotune_path = os.path.join(self.tmp_dir.name, "autotune.json")
+
+    def tearDown(self):
+        fe.fe_autotune_path = self.original_path
+        self.tmp_dir.cleanup()
+
+    def _get_pipeline(self):
+        return fe.Pipeline(train_data=self.data, batch_size=4, ops=[Minmax(inputs="x", outputs="x")], num_process='auto')
+
+    def test_tune(self):
+        pipeline = self._get_pipeline()
+        num_process = pipeline.tune_num_process(num_steps=5, max_process=2)
+        with self.subTest("Chosen"):
+            self.assertIn(num_process, (0, 1, 2))
+            self.assertEqual(pipeline.num_process, num_process)
+            self.assertFalse(pipeline.auto_num_process)
+        with self.subTest("Cached"):
+            pipeline2 = self._get_pipeline()
+            pipeline2.benchmark = None  # The cached value should be used without benchmarking
+            self.assertEqual(pipeline2.tune_num_process(num_steps=5, max_process=2), num_process)
+
+    def test_auto_tune_on_call(self):
+        pipeline = self._get_pipeline()
+        calls = []
+
+        def tune_num_process(**kwargs):
+            calls.append(kwargs)
+            pipeline.auto_num_process = False
+            pipeline.num_process = 0
+
+        pipeline.tune_num_process = tune_num_process
+        for _ in range(2):
+            with pipeline(mode="train", epoch=2) as loader:
+                self.assertEqual(loader.num_workers, 0)
+        self.assertEqual(calls, [{'mode': 'train', 'epoch': 2, 'ds_id': ''}])
+
+    def test_invalid_num_process(self):
+        with self.assertRaises(AssertionError):
+            fe.Pipeline(train_data=self.data, num_process='many')
+
+
 class TestPipelineNames(unittest.TestCase):
     def test_forbidden_names_none(self):
         data = NumpyDataset({"x": np.array([[0, 255], [255, 0]])})
@@ -0,0 +1,150 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import unittest
+
+import numpy as np
+
+import fastestimator as fe
+from fastestimator.test.unittest_util import is_equal
+
+
+def _get_data():
+    return {
+        "idx": np.arange(100),
+        "clz": np.array([i % 4 for i in range(100)]),
+        "x": np.random.rand(100, 3, 2).astype(np.float32),
+        "name": [str(i) for i in range(100)]
+    }
+
+
+class TestColumnarDataset(unittest.TestCase):
+    def test_no_copy(self):
+        data = _get_data()
+        ds = fe.dataset.ColumnarDataset(data)
+        with self.subTest("Length"):
+            self.assertEqual(len(ds), 100)
+        with self.subTest("Column storage"):
+            self.assertIs(ds.columns["x"], data["x"])
+        with self.subTest("Row views"):
+            self.assertTrue(np.shares_memory(ds[5]["x"], data["x"]))
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(AssertionError):
+            fe.dataset.ColumnarDataset({"x": np.ones((5, 2)), "y": [1, 2, 3]})
+        with self.assertRaises(ValueError):
+            fe.dataset.ColumnarDataset({"x": (1, 2, 3)})
+
+    def test_getitem(self):
+        data = _get_data()
+        ds = fe.dataset.ColumnarDataset(data)
+        with self.subTest("Row"):
+            self.assertTrue(is_equal(ds[7], {k: v[7] for k, v in data.items()}))
+        with self.subTest("Numpy index"):
+            self.assertTrue(is_equal(ds[np.int64(7)], ds[7]))
+        with self.subTest("Out of range"):
+            with self.assertRaises(StopIteration):
+                ds[100]
+        with self.subTest("Array column"):
+            column = ds["x"]
+            self.assertIsInstance(column, np.ndarray)
+            self.assertTrue(is_equal(column, data["x"]))
+            self.assertFalse(column.flags.writeable)
+        with self.subTest("List column"):
+            self.assertEqual(ds["name"], data["name"])
+
+    def test_setitem(self):
+        data = _get_data()
+        original = data["x"].copy()
+        ds = fe.dataset.ColumnarDataset(data)
+        with self.subTest("Set column"):
+            ds["x"] = ds["x"] - 1
+            self.assertTrue(is_equal(ds[3]["x"], original[3] - 1))
+        with self.subTest("Set row"):
+            ds[3] = {"idx": -1, "clz": 7, "x": np.zeros((3, 2)), "name": "three"}
+            self.assertEqual(ds[3]["clz"], 7)
+            self.assertEqual(ds[3]["name"], "three")
+            self.assertTrue(is_equal(ds[3]["x"], np.zeros((3, 2), dtype=np.float32)))
+        with self.subTest("Inputs unchanged"):
+            self.assertEqual(data["clz"][3], 3)
+            self.assertEqual(data["name"][3], "3")
+            self.assertTrue(is_equal(data["x"], original))
+        with self.subTest("Bad row"):
+            with self.assertRaises(AssertionError):
+                ds[3] = {"idx": 1}
+        with self.subTest("Bad column"):
+            with self.assertRaises(AssertionError):
+                ds["x"] = np.ones((5, 3, 2))
+
+    def test_split(self):
+        ds1 = fe.dataset.ColumnarDataset(_get_data())
+        ds2, ds3 = ds1.split(0.2, 10)
+        with self.subTest("Sizes"):
+            self.assertEqual([len(ds1), len(ds2), len(ds3)], [70, 20, 10])
+        with self.subTest("Disjoint"):
+            idx = [set(ds["idx"].tolist()) for ds in (ds1, ds2, ds3)]
+            self.assertEqual(set(), (idx[0] & idx[1]) | (idx[0] & idx[2]) | (idx[1] & idx[2]))
+            self.assertEqual(set(range(100)), idx[0] | idx[1] | idx[2])
+        with self.subTest("Rows consistent"):
+            for ds in (ds1, ds2, ds3):
+                for elem in ds:
+                    self.assertEqual(elem["name"], str(elem["idx"]))
+                    self.assertEqual(elem["clz"], elem["idx"] % 4)
+        with self.subTest("List columns remain lists"):
+            self.assertIsInstance(ds2.columns["name"], list)
+
+    def test_split_matches_numpy_dataset(self):
+        data = _get_data()
+        columnar = fe.dataset.ColumnarDataset(data)
+        rows = fe.dataset.NumpyDataset(data)
+        with self.subTest("Seeded split"):
+            self.assertEqual(columnar.split(0.3, seed=42)["idx"].tolist(), rows.split(0.3, seed=42)["idx"])
+        with self.subTest("Seeded stratified split"):
+            new_columnar = columnar.split(0.25, seed=7, stratify="clz")
+            new_rows = rows.split(0.25, seed=7, stratify="clz")
+            self.assertEqual(new_columnar["idx"].tolist(), new_rows["idx"])
+            self.assertEqual(columnar["idx"].tolist(), rows["idx"])
+
+    def test_split_stratify(self):
+        ds1 = fe.dataset.ColumnarDataset(_get_data())
+        ds2 = ds1.split(0.2, stratify="clz")
+        with self.subTest("Sizes"):
+            self.assertEqual(len(ds1), 80)
+            self.assertEqual(len(ds2), 20)
+        with self.subTest("Distribution"):
+            self.assertEqual(np.bincount(ds2["clz"]).tolist(), [5, 5, 5, 5])
+            self.assertEqual(np.bincount(ds1["clz"]).tolist(), [20, 20, 20, 20])
+
+    def test_stratify_distribution(self):
+        ds = fe.dataset.ColumnarDataset({"y": np.array([[3, 0], [1, 0], [3, 0], [2, 1]])})
+        rows = fe.dataset.NumpyDataset({"y": np.array([[3, 0], [1, 0], [3, 0], [2, 1]])})
+        self.assertEqual(ds._get_stratify_distribution("y"), rows._get_stratify_distribution("y"))
+
+    def test_summary(self):
+        summary = fe.dataset.ColumnarDataset(_get_data()).summary()
+        expected = fe.dataset.NumpyDataset(_get_data()).summary()
+        self.assertEqual(summary.num_instances, 100)
+        for key in ("idx", "clz", "x", "name"):
+            with self.subTest(key):
+                self.assertEqual(repr(summary.keys[key]), repr(expected.keys[key]))
+        with self.subTest("Unique values"):
+            self.assertEqual(summary.keys["clz"].num_unique_values, 4)
+            self.assertEqual(summary.keys["name"].num_unique_values, 100)
+            self.assertIsNone(summary.keys["x"].num_unique_values)
+
+    def test_pipeline(self):
+        ds = fe.dataset.ColumnarDataset({"x": np.ones((10, 4), dtype=np.float32), "y": np.arange(10)})
+        pipeline = fe.Pipeline(train_data=ds, batch_size=5)
+        batch = pipeline.get_results()
+        self.assertEqual(list(batch["x"].shape), [5, 4])
@@ -0,0 +1,73 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import unittest
+
+import numpy as np
+
+from fastestimator.dataset.dataloader import LengthBucketSampler
+
+
+class TestLengthBucketSampler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.lengths = np.random.RandomState(0).randint(1, 200, size=103)
+        cls.data = list(range(103))
+
+    def _draw(self, sampler, n):
+        itr = iter(sampler)
+        return [next(itr) for _ in range(n)]
+
+    def test_coverage(self):
+        sampler = LengthBucketSampler(self.data, self.lengths, batch_size=8, pool_size=4)
+        indices = self._draw(sampler, 3 * len(self.data))
+        for epoch in range(3):
+            with self.subTest(epoch=epoch):
+                self.assertEqual(sorted(indices[epoch * 103:(epoch + 1) * 103]), self.data)
+
+    def test_buckets_aligned(self):
+        sampler = LengthBucketSampler(self.data, self.lengths, batch_size=8, pool_size=4)
+        indices = self._draw(sampler, 103 * 3 - 103 * 3 % 8)
+        batches = [indices[idx:idx + 8] for idx in range(0, len(indices), 8)]
+        # Only the batches which straddle two passes over the data should mix samples from different buckets
+        spread = np.array([np.ptp(self.lengths[batch]) for batch in batches])
+        self.assertLessEqual(np.sum(spread > 100), 2)
+
+    def test_padding_ratio(self):
+        sampler = LengthBucketSampler(self.data, self.lengths, batch_size=8, pool_size=4)
+        self._draw(sampler, 10)
+        self.assertLess(sampler.padding_ratio, sampler.unbucketed_padding_ratio / 2)
+
+    def test_shuffle(self):
+        sampler = LengthBucketSampler(self.data, self.lengths, batch_size=8, pool_size=4)
+        first = self._draw(sampler, 103)
+        second = self._draw(sampler, 103)
+        with self.subTest("Shuffled between epochs"):
+            self.assertNotEqual(first, second)
+        with self.subTest("Not sorted"):
+            self.assertNotEqual(first, sorted(first, key=lambda idx: -self.lengths[idx]))
+
+    def test_no_shuffle(self):
+        sampler = LengthBucketSampler(self.data, self.lengths, batch_size=8, shuffle=False)
+        first = self._draw(sampler, 103)
+        with self.subTest("Sorted"):
+            self.assertTrue(np.all(np.diff(self.lengths[first]) <= 0))
+        with self.subTest("Deterministic"):
+            self.assertEqual(self._draw(sampler, 103), first)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            LengthBucketSampler(self.data, self.lengths[:10], batch_size=8)
+        with self.assertRaises(ValueError):
+            LengthBucketSampler(self.data, self.lengths, batch_size=8, pool_size=0)
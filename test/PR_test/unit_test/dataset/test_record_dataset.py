@@ -0,0 +1,110 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import os
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import fastestimator as fe
+from fastestimator.op.numpyop.univariate import ReadImage
+from fastestimator.test.unittest_util import is_equal
+
+
+class TestRecordDataset(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.image_dir = os.path.join(cls.tmp_dir.name, "images")
+        rng = np.random.default_rng(0)
+        rows = []
+        for clz in ("a", "b"):
+            os.makedirs(os.path.join(cls.image_dir, clz))
+            for idx in range(6):
+                img = rng.integers(0, 256, size=(8 + idx, 10, 3), dtype=np.uint8)
+                name = os.path.join(clz, f"{idx}.png")
+                cv2.imwrite(os.path.join(cls.image_dir, name), img)
+                rows.append({"image": name, "label": clz, "idx": len(rows)})
+        cls.csv_path = os.path.join(cls.image_dir, "data.csv")
+        pd.DataFrame(rows).to_csv(cls.csv_path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_pack_labeled_dir(self):
+        source = fe.dataset.LabeledDirDataset(self.image_dir, file_extension=".png")
+        save_dir = os.path.join(self.tmp_dir.name, "labeled")
+        ds = fe.dataset.RecordDataset.pack(source, save_dir=save_dir)
+        with self.subTest("Size"):
+            self.assertEqual(len(ds), 12)
+            self.assertEqual(ds.file_keys, ["x"])
+        with self.subTest("Contents"):
+            for idx in range(len(ds)):
+                with open(source[idx]["x"], 'rb') as file:
+                    self.assertEqual(ds[idx]["x"].tobytes(), file.read())
+                self.assertEqual(ds[idx]["y"], source[idx]["y"])
+        with self.subTest("Read only"):
+            self.assertFalse(ds[0]["x"].flags.writeable)
+        with self.subTest("Reload"):
+            reloaded = fe.dataset.RecordDataset(save_dir)
+            self.assertTrue(is_equal(reloaded[5], ds[5]))
+        with self.subTest("Split"):
+            split = ds.split(0.5, stratify="y")
+            self.assertEqual(len(split), 6)
+            self.assertEqual(sorted(split["y"]), [0, 0, 0, 1, 1, 1])
+            self.assertEqual(split[0]["x"].dtype, np.uint8)
+
+    def test_pack_csv(self):
+        source = fe.dataset.CSVDataset(self.csv_path)
+        save_dir = os.path.join(self.tmp_dir.name, "csv")
+        ds = fe.dataset.RecordDataset.pack(source, save_dir=save_dir, shard_size_mb=1e-4)
+        with self.subTest("Multiple shards"):
+            self.assertGreater(len(ds.shards), 1)
+            self.assertEqual(len(ds.shards), len([f for f in os.listdir(save_dir) if f.endswith(".shard")]))
+        with self.subTest("Contents"):
+            for idx in range(len(ds)):
+                with open(os.path.join(self.image_dir, source[idx]["image"]), 'rb') as file:
+                    self.assertEqual(ds[idx]["image"].tobytes(), file.read())
+                self.assertEqual(ds[idx]["label"], source[idx]["label"])
+                self.assertEqual(ds[idx]["idx"], idx)
+        with self.subTest("Forked copy"):
+            ds._maps_pid = -1  # Simulate having been copied into a new process
+            self.assertEqual(ds[3]["image"].tobytes(), ds[3]["image"].tobytes())
+            self.assertEqual(ds._maps_pid, os.getpid())
+
+    def test_read_image(self):
+        source = fe.dataset.CSVDataset(self.csv_path)
+        ds = fe.dataset.RecordDataset.pack(source, save_dir=os.path.join(self.tmp_dir.name, "read"), file_keys="image")
+        from_path = ReadImage(inputs="image", outputs="image", parent_path=self.image_dir)
+        from_bytes = ReadImage(inputs="image", outputs="image")
+        for idx in (0, 7):
+            with self.subTest(idx=idx):
+                expected = from_path.forward([source[idx]["image"]], {})[0]
+                self.assertTrue(is_equal(from_bytes.forward([ds[idx]["image"]], {})[0], expected))
+                self.assertTrue(is_equal(from_bytes.forward([ds[idx]["image"].tobytes()], {})[0], expected))
+
+    def test_pipeline(self):
+        source = fe.dataset.LabeledDirDataset(self.image_dir, file_extension=".png")
+        ds = fe.dataset.RecordDataset.pack(source, save_dir=os.path.join(self.tmp_dir.name, "pipeline"))
+        pipeline = fe.Pipeline(train_data=ds, batch_size=4, ops=ReadImage(inputs="x", outputs="x", color_flag="gray"))
+        results = pipeline.transform(ds[11], mode="train")
+        self.assertEqual(results["x"].shape, (1, 13, 10, 1))
+
+    def test_missing_index(self):
+        with self.assertRaises(ValueError):
+            fe.dataset.RecordDataset(self.tmp_dir.name)
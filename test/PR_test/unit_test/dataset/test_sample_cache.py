@@ -0,0 +1,161 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import multiprocessing as mp
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from fastestimator.dataset.sample_cache import DiskCache, MemoryCache, ShardCache, _get_size
+from fastestimator.test.unittest_util import is_equal
+from fastestimator.util.data import FilteredData
+
+
+def _fill_shard_cache(cache_dir, namespace):
+    cache = ShardCache(cache_dir)
+    for idx in range(5):
+        cache.put((namespace, idx), {"x": np.full((idx, 3), idx, dtype=np.int32)})
+
+
+class TestMemoryCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = MemoryCache()
+        self.assertIsNone(cache.get(("a", 0)))
+        cache.put(("a", 0), {"x": np.ones((2, 2))})
+        self.assertTrue(is_equal(cache.get(("a", 0)), {"x": np.ones((2, 2))}))
+
+    def test_filtered_data(self):
+        cache = MemoryCache()
+        cache.put(("a", 0), FilteredData(replacement=False))
+        self.assertIsInstance(cache.get(("a", 0)), FilteredData)
+
+    def test_lru_eviction(self):
+        entry_size = _get_size({"x": np.zeros(100, dtype=np.float64)})
+        cache = MemoryCache(max_bytes=int(3.5 * entry_size))  # Room for 3 entries
+        for idx in range(3):
+            cache.put(idx, {"x": np.zeros(100, dtype=np.float64)})
+        cache.get(0)  # 0 is now more recently used than 1
+        cache.put(3, {"x": np.zeros(100, dtype=np.float64)})
+        with self.subTest("Size Respected"):
+            self.assertEqual(len(cache), 3)
+        with self.subTest("LRU Evicted"):
+            self.assertIsNone(cache.get(1))
+            self.assertIsNotNone(cache.get(0))
+            self.assertIsNotNone(cache.get(3))
+
+    def test_oversized_entry(self):
+        cache = MemoryCache(max_bytes=100)
+        cache.put(0, {"x": np.zeros(100)})
+        self.assertEqual(len(cache), 0)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            MemoryCache(max_bytes=0)
+
+
+class TestDiskCache(unittest.TestCase):
+    def test_get_put(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = DiskCache(cache_dir)
+            self.assertIsNone(cache.get(("a", 0)))
+            cache.put(("a", 0), {"x": np.ones((2, 2)), "y": "label"})
+            self.assertTrue(is_equal(cache.get(("a", 0)), {"x": np.ones((2, 2)), "y": "label"}))
+
+    def test_shared_between_instances(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            DiskCache(cache_dir).put(("a", 0), {"x": np.arange(4)})
+            self.assertTrue(is_equal(DiskCache(cache_dir).get(("a", 0)), {"x": np.arange(4)}))
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = DiskCache(cache_dir, max_bytes=5000)
+            for idx in range(10):
+                cache.put(idx, {"x": np.zeros(100, dtype=np.float64)})
+            total = sum(os.path.getsize(os.path.join(cache_dir, name)) for name in os.listdir(cache_dir))
+            with self.subTest("Size Respected"):
+                self.assertLessEqual(total, 5000)
+            with self.subTest("Newest Retained"):
+                self.assertIsNotNone(cache.get(9))
+                self.assertIsNone(cache.get(0))
+
+    def test_clear(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = DiskCache(cache_dir)
+            cache.put(0, {"x": np.zeros(10)})
+            cache.clear()
+            self.assertIsNone(cache.get(0))
+
+
+class TestShardCache(unittest.TestCase):
+    def test_get_put(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ShardCache(cache_dir)
+            namespace = cache.get_namespace("train:", "sig")
+            self.assertIsNone(cache.get((namespace, 0)))
+            cache.put((namespace, 0), {"x": np.ones((2, 2), dtype=np.float32), "y": "label", "z": 3})
+            cache.put((namespace, 1), FilteredData())
+            result = cache.get((namespace, 0))
+            with self.subTest("Round Trip"):
+                self.assertTrue(is_equal(result, {"x": np.ones((2, 2), dtype=np.float32), "y": "label", "z": 3}))
+            with self.subTest("Read-only Arrays"):
+                self.assertFalse(result["x"].flags.writeable)
+            with self.subTest("Filtered Data"):
+                self.assertIsInstance(cache.get((namespace, 1)), FilteredData)
+
+    def test_shared_between_processes(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ShardCache(cache_dir)
+            namespace = cache.get_namespace("train:", "sig")
+            self.assertIsNone(cache.get((namespace, 1)))
+            process = mp.get_context("spawn").Process(target=_fill_shard_cache, args=(cache_dir, namespace))
+            process.start()
+            process.join()
+            for idx in range(5):
+                with self.subTest(f"Index {idx}"):
+                    self.assertTrue(is_equal(cache.get((namespace, idx)), {"x": np.full((idx, 3), idx, dtype=np.int32)}))
+
+    def test_signature_change(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ShardCache(cache_dir)
+            namespace = cache.get_namespace("train:", "sig")
+            cache.put((namespace, 0), {"x": np.zeros(3)})
+            with self.subTest("Same Signature"):
+                self.assertEqual(ShardCache(cache_dir).get_namespace("train:", "sig"), namespace)
+                self.assertIsNotNone(ShardCache(cache_dir).get((namespace, 0)))
+            with self.subTest("Different Signature"):
+                new_cache = ShardCache(cache_dir)
+                namespace = new_cache.get_namespace("train:", "sig2")
+                self.assertIsNone(new_cache.get((namespace, 0)))
+
+    def test_max_bytes(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ShardCache(cache_dir, max_bytes=2000)
+            namespace = cache.get_namespace("train:", "sig")
+            for idx in range(10):
+                cache.put((namespace, idx), {"x": np.zeros(100, dtype=np.float64)})
+            with self.subTest("Oldest Retained"):
+                self.assertIsNotNone(cache.get((namespace, 0)))
+                self.assertIsNotNone(cache.get((namespace, 1)))
+            with self.subTest("Stopped Filling"):
+                self.assertIsNone(cache.get((namespace, 2)))
+
+    def test_clear(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ShardCache(cache_dir)
+            namespace = cache.get_namespace("train:", "sig")
+            cache.put((namespace, 0), {"x": np.zeros(10)})
+            cache.clear()
+            self.assertIsNone(cache.get((namespace, 0)))
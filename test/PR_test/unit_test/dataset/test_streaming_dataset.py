@@ -0,0 +1,150 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import fastestimator as fe
+from fastestimator.op.numpyop import NumpyOp
+from fastestimator.util.data import FilteredData
+
+
+class DropOdd(NumpyOp):
+    def forward(self, data, state):
+        if data % 2:
+            return FilteredData(replacement=False)
+        return data
+
+
+class TestStreamingDataset(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        # 4 shards of 10 samples each
+        for shard in range(4):
+            idx = np.arange(shard * 10, (shard + 1) * 10)
+            np.savez(os.path.join(cls.tmp_dir.name, f"shard_{shard}.npz"), x=idx, y=np.ones((10, 3)) * idx[:, None])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def _get_epoch(self, pipeline, mode="train", steps_per_epoch=None):
+        with pipeline(mode=mode, steps_per_epoch=steps_per_epoch) as loader:
+            return [batch for batch in loader]
+
+    def test_shard_discovery(self):
+        with self.subTest("Directory"):
+            ds = fe.dataset.StreamingDataset(self.tmp_dir.name)
+            self.assertEqual(len(ds.shards), 4)
+            self.assertEqual(len(ds), 40)
+        with self.subTest("Glob"):
+            ds = fe.dataset.StreamingDataset(os.path.join(self.tmp_dir.name, "shard_[01].npz"))
+            self.assertEqual(len(ds), 20)
+        with self.subTest("Explicit size"):
+            ds = fe.dataset.StreamingDataset(self.tmp_dir.name, samples_per_epoch=25)
+            self.assertEqual(len(ds), 25)
+        with self.subTest("No shards"):
+            with self.assertRaises(ValueError):
+                fe.dataset.StreamingDataset(os.path.join(self.tmp_dir.name, "*.missing"))
+        with self.subTest("Unknown format"):
+            with self.assertRaises(ValueError):
+                fe.dataset.StreamingDataset([os.path.join(self.tmp_dir.name, "shard.bin")], samples_per_epoch=1)
+
+    def test_sequential_read(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=0)
+        ds.fe_reset_ds(shuffle=False)
+        samples = [ds[i] for i in range(len(ds))]
+        self.assertEqual([int(sample["x"]) for sample in samples], list(range(40)))
+        with self.subTest("Wrap around"):
+            self.assertEqual(int(ds[0]["x"]), 0)
+        with self.subTest("Reset"):
+            ds.fe_reset_ds(shuffle=False)
+            self.assertEqual(int(ds[0]["x"]), 0)
+
+    def test_custom_reader(self):
+        path = os.path.join(self.tmp_dir.name, "extra.txt")
+        with open(path, 'w') as file:
+            file.write("\n".join(json.dumps({"x": i}) for i in range(5)))
+
+        def reader(shard):
+            with open(shard, 'r') as file:
+                for line in file:
+                    yield json.loads(line)
+
+        ds = fe.dataset.StreamingDataset([path], reader=reader)
+        os.remove(path)
+        self.assertEqual(len(ds), 5)
+
+    def test_shuffle(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=8)
+        ds.fe_reset_ds(shuffle=True, seed=3)
+        samples = [int(ds[i]["x"]) for i in range(len(ds))]
+        with self.subTest("Full coverage"):
+            self.assertEqual(sorted(samples), list(range(40)))
+        with self.subTest("Shuffled"):
+            self.assertNotEqual(samples, list(range(40)))
+        with self.subTest("Seeded"):
+            ds.fe_reset_ds(shuffle=True, seed=3)
+            self.assertEqual([int(ds[i]["x"]) for i in range(len(ds))], samples)
+
+    def test_summary(self):
+        summary = fe.dataset.StreamingDataset(self.tmp_dir.name).summary()
+        self.assertEqual(summary.num_instances, 40)
+        self.assertEqual(summary.keys["y"].shape, [3])
+
+    def test_split(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name)
+        with self.assertRaises(NotImplementedError):
+            ds.split(0.5)
+
+    def test_pipeline(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=8)
+        pipeline = fe.Pipeline(train_data=ds, eval_data=ds, batch_size=5, num_process=0)
+        with self.subTest("Train"):
+            batches = self._get_epoch(pipeline, "train")
+            self.assertEqual(len(batches), 8)
+            samples = np.concatenate([batch["x"].numpy() for batch in batches]).tolist()
+            self.assertEqual(sorted(samples), list(range(40)))
+        with self.subTest("Eval is not shuffled"):
+            batches = self._get_epoch(pipeline, "eval")
+            samples = np.concatenate([batch["x"].numpy() for batch in batches]).tolist()
+            self.assertEqual(samples, list(range(40)))
+
+    def test_pipeline_workers(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=8)
+        pipeline = fe.Pipeline(train_data=ds, batch_size=5, num_process=2)
+        batches = self._get_epoch(pipeline)
+        self.assertEqual(len(batches), 8)
+        samples = np.concatenate([batch["x"].numpy() for batch in batches]).tolist()
+        self.assertEqual(sorted(samples), list(range(40)))
+
+    def test_pipeline_steps_per_epoch(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=8)
+        pipeline = fe.Pipeline(train_data=ds, batch_size=5, num_process=0)
+        batches = self._get_epoch(pipeline, steps_per_epoch=12)
+        self.assertEqual(len(batches), 12)
+        samples = np.concatenate([batch["x"].numpy() for batch in batches]).tolist()
+        self.assertEqual(set(samples), set(range(40)))
+
+    def test_pipeline_filter(self):
+        ds = fe.dataset.StreamingDataset(self.tmp_dir.name, shuffle_buffer=0)
+        pipeline = fe.Pipeline(train_data=ds, batch_size=5, num_process=0, ops=DropOdd(inputs="x", outputs="x"))
+        batches = self._get_epoch(pipeline)
+        samples = np.concatenate([batch["x"].numpy() for batch in batches]).tolist()
+        self.assertEqual(sorted(samples), list(range(0, 40, 2)))
@@ -16,8 +16,11 @@ import unittest
 
 import numpy as np
 
-from fastestimator.op.numpyop.meta import Fuse
-from fastestimator.op.numpyop.univariate import Minmax
+from fastestimator.op.numpyop.meta import Fuse, FusedPointwise
+from fastestimator.op.numpyop.numpyop import forward_numpyop
+from fastestimator.op.numpyop.univariate import Binarize, ChannelTranspose, ExpandDims, Minmax, Normalize, Reshape, \
+    ToFloat
+from fastestimator.test.unittest_util import is_equal
 
 
 class TestFuse(unittest.TestCase):
@@ -41,3 +44,79 @@ class TestFuse(unittest.TestCase):
             self.assertEqual(type(output), list)
         with self.subTest('Check output image shape'):
             self.assertEqual(output[0].shape, self.output_shape)
+
+
+class TestFusedPointwise(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.image = np.random.randint(256, size=(8, 6, 3), dtype=np.uint8)
+
+    def _check(self, ops):
+        expected = {"x": self.image}
+        forward_numpyop(ops, expected, {"mode": "train"})
+        actual = {"x": self.image}
+        forward_numpyop([FusedPointwise(ops)], actual, {"mode": "train"})
+        self.assertTrue(is_equal(actual["x"], expected["x"]))
+        self.assertEqual(actual["x"].dtype, expected["x"].dtype)
+
+    def test_matches_unfused(self):
+        chains = {
+            "ToFloat Chain": [
+                ToFloat(inputs="x", outputs="x"),
+                Normalize(inputs="x", outputs="x"),
+                Minmax(inputs="x", outputs="x"),
+                ChannelTranspose(inputs="x", outputs="x")
+            ],
+            "Normalize First": [Normalize(inputs="x", outputs="x", mean=0.5, std=0.2), Minmax(inputs="x", outputs="x")],
+            "Minmax First": [Minmax(inputs="x", outputs="x"), Binarize(threshold=0.5, inputs="x", outputs="x")],
+            "Layout First": [
+                ChannelTranspose(inputs="x", outputs="x"),
+                Reshape(shape=(3, -1), inputs="x", outputs="x"),
+                ExpandDims(inputs="x", outputs="x"),
+                ToFloat(inputs="x", outputs="x")
+            ],
+            "Binarize First": [Binarize(threshold=100, inputs="x", outputs="x"), Minmax(inputs="x", outputs="x")],
+        }
+        for name, ops in chains.items():
+            with self.subTest(name):
+                self._check(ops)
+
+    def test_input_unmodified(self):
+        image = self.image.copy()
+        op = FusedPointwise([Minmax(inputs="x", outputs="x"), Normalize(inputs="x", outputs="x")])
+        op.forward([self.image], state={})
+        self.assertTrue(is_equal(image, self.image))
+
+    def test_multi_key(self):
+        ops = [ToFloat(inputs=("x", "y"), outputs=("x", "y")), Minmax(inputs=("x", "y"), outputs=("x", "y"))]
+        op = FusedPointwise(ops)
+        output = op.forward([self.image, self.image[..., 0]], state={})
+        with self.subTest("x"):
+            self.assertTrue(is_equal(output[0], Minmax(inputs="x", outputs="x").forward([self.image / 255.0], {})[0]))
+        with self.subTest("y"):
+            self.assertEqual(output[1].shape, (8, 6))
+
+    def test_batch(self):
+        ops = [ToFloat(inputs="x", outputs="x"), Minmax(inputs="x", outputs="x")]
+        batch = np.stack([self.image, self.image // 2])
+        expected = {"x": batch}
+        forward_numpyop(ops, expected, {"mode": "train"}, batched="np")
+        output = FusedPointwise(ops).forward_batch([batch], state={"mode": "train"})
+        self.assertTrue(is_equal(output[0], expected["x"]))
+
+    def test_can_fuse(self):
+        with self.subTest("Pointwise"):
+            self.assertTrue(FusedPointwise.can_fuse(Minmax(inputs="x", outputs="x")))
+        with self.subTest("Different Output"):
+            self.assertFalse(FusedPointwise.can_fuse(Minmax(inputs="x", outputs="y")))
+        with self.subTest("Overridden Forward"):
+
+            class MyMinmax(Minmax):
+                def forward(self, data, state):
+                    return data
+
+            self.assertFalse(FusedPointwise.can_fuse(MyMinmax(inputs="x", outputs="x")))
+
+    def test_mismatched_keys(self):
+        with self.assertRaises(ValueError):
+            FusedPointwise([Minmax(inputs="x", outputs="x"), Minmax(inputs="y", outputs="y")])
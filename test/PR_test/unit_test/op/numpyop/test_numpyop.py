@@ -12,12 +12,14 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import tempfile
 import unittest
 
 import numpy as np
 import tensorflow as tf
 
-from fastestimator.op.numpyop import LambdaOp
+import fastestimator as fe
+from fastestimator.op.numpyop import Cache, LambdaOp, NumpyOp
 from fastestimator.test.unittest_util import is_equal
 
 
@@ -37,3 +39,69 @@ class TestLambdaOp(unittest.TestCase):
         data = tf.convert_to_tensor([[1, 2, 3], [4, 5, 6], [7, 8, 9]])
         result = op.forward_batch(data=[data], state={})
         self.assertEqual(result, 45)
+
+
+class CountingOp(NumpyOp):
+    def __init__(self, inputs, outputs):
+        super().__init__(inputs=inputs, outputs=outputs)
+        self.n_calls = 0
+
+    def forward(self, data, state):
+        self.n_calls += 1
+        return data + 1
+
+
+class TestCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.data = fe.dataset.NumpyDataset({"x": np.arange(40, dtype=np.float32).reshape((10, 4))})
+
+    def _run(self, cache):
+        counter = CountingOp(inputs="x", outputs="x")
+        pipeline = fe.Pipeline(train_data=self.data,
+                               batch_size=5,
+                               ops=[counter, cache, LambdaOp(fn=lambda x: x * 2, inputs="x", outputs="x")],
+                               num_process=0)
+        results = []
+        for epoch in range(1, 4):
+            with pipeline(mode="train", epoch=epoch, shuffle=False) as loader:
+                results.append(np.concatenate([batch["x"].numpy() for batch in loader]))
+        return counter.n_calls, results
+
+    def test_memory_cache(self):
+        n_calls, results = self._run(Cache())
+        with self.subTest("Prefix Computed Once"):
+            self.assertEqual(n_calls, 10)
+        with self.subTest("Correct Output"):
+            for result in results:
+                self.assertTrue(is_equal(result, (self.data["x"] + 1) * 2))
+
+    def test_disk_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            n_calls, results = self._run(Cache(cache_dir=cache_dir))
+        with self.subTest("Prefix Computed Once"):
+            self.assertEqual(n_calls, 10)
+        with self.subTest("Correct Output"):
+            for result in results:
+                self.assertTrue(is_equal(result, (self.data["x"] + 1) * 2))
+
+    def test_mmap_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            n_calls, results = self._run(Cache(cache_dir=cache_dir, disk_format='mmap'))
+            with self.subTest("Prefix Computed Once"):
+                self.assertEqual(n_calls, 10)
+            with self.subTest("Correct Output"):
+                for result in results:
+                    self.assertTrue(is_equal(result, (self.data["x"] + 1) * 2))
+            with self.subTest("Re-used Between Runs"):
+                n_calls, results = self._run(Cache(cache_dir=cache_dir, disk_format='mmap'))
+                self.assertEqual(n_calls, 0)
+                self.assertTrue(is_equal(results[0], (self.data["x"] + 1) * 2))
+
+    def test_invalid_disk_format(self):
+        with self.assertRaises(ValueError):
+            Cache(cache_dir="dir", disk_format='zip')
+
+    def test_forward_passthrough(self):
+        op = Cache()
+        self.assertIsNone(op.forward(data=[], state={}))
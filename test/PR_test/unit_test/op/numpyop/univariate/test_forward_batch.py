@@ -0,0 +1,99 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import unittest
+
+import numpy as np
+
+from fastestimator.op.numpyop.numpyop import NumpyOp
+from fastestimator.op.numpyop.univariate import Binarize, ChannelTranspose, ExpandDims, FromFloat, Hadamard, Minmax, \
+    Normalize, Onehot, Reshape, ToArray, ToFloat
+from fastestimator.test.unittest_util import is_equal
+
+
+class TestVectorizedForwardBatch(unittest.TestCase):
+    """Vectorized forward_batch implementations should match the default per-element implementation exactly."""
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(42)
+        cls.images = rng.integers(0, 256, size=(4, 8, 6, 3), dtype=np.uint8)
+        cls.gray_images = rng.integers(0, 256, size=(4, 8, 6), dtype=np.uint8)
+        cls.float_images = rng.random(size=(4, 8, 6, 3), dtype=np.float32)
+        cls.labels = rng.integers(0, 5, size=(4, ), dtype=np.int64)
+        cls.column_labels = rng.integers(0, 5, size=(4, 1), dtype=np.int64)
+        cls.masks = rng.integers(0, 5, size=(4, 3, 2), dtype=np.int64)
+
+    def _check(self, op, data):
+        expected = NumpyOp.forward_batch(op, data, state={})
+        actual = op.forward_batch(data, state={})
+        self.assertTrue(is_equal(actual, expected))
+        for act, exp in zip(actual, expected):
+            self.assertEqual(act.dtype, exp.dtype)
+
+    def test_elementwise_ops(self):
+        cases = {
+            "Binarize": (Binarize(threshold=100, inputs="x", outputs="x"), [self.images]),
+            "Minmax": (Minmax(inputs="x", outputs="x"), [self.images]),
+            "Minmax Constant": (Minmax(inputs="x", outputs="x"), [np.ones((4, 3), dtype=np.float32)]),
+            "Minmax Multi": (Minmax(inputs=("x", "y"), outputs=("x", "y")), [self.float_images, self.gray_images]),
+            "Normalize": (Normalize(inputs="x", outputs="x"), [self.images]),
+            "Normalize Float": (Normalize(inputs="x", outputs="x", mean=0.5, std=0.25, max_pixel_value=1.0),
+                                [self.float_images]),
+            "ToFloat": (ToFloat(inputs="x", outputs="x"), [self.images]),
+            "ToFloat Max": (ToFloat(inputs="x", outputs="x", max_value=17.0), [self.gray_images]),
+            "FromFloat": (FromFloat(inputs="x", outputs="x", dtype="uint8"), [self.float_images]),
+            "ToArray": (ToArray(inputs="x", outputs="x", dtype="float32"), [self.labels]),
+        }
+        for name, (op, data) in cases.items():
+            with self.subTest(name):
+                self._check(op, data)
+
+    def test_shape_ops(self):
+        cases = {
+            "ExpandDims": (ExpandDims(inputs="x", outputs="x"), [self.gray_images]),
+            "ExpandDims Front": (ExpandDims(inputs="x", outputs="x", axis=0), [self.gray_images]),
+            "ExpandDims Middle": (ExpandDims(inputs="x", outputs="x", axis=1), [self.gray_images]),
+            "ExpandDims Negative": (ExpandDims(inputs="x", outputs="x", axis=-2), [self.gray_images]),
+            "Reshape": (Reshape(shape=(-1, 3), inputs="x", outputs="x"), [self.images]),
+            "Reshape Int": (Reshape(shape=144, inputs="x", outputs="x"), [self.images]),
+            "ChannelTranspose": (ChannelTranspose(inputs="x", outputs="x"), [self.images]),
+            "ChannelTranspose Negative": (ChannelTranspose(inputs="x", outputs="x", axes=(-1, 1, 0)), [self.images]),
+        }
+        for name, (op, data) in cases.items():
+            with self.subTest(name):
+                self._check(op, data)
+
+    def test_label_ops(self):
+        cases = {
+            "Onehot": (Onehot(inputs="x", outputs="x", num_classes=5), [self.labels]),
+            "Onehot Column": (Onehot(inputs="x", outputs="x", num_classes=5), [self.column_labels]),
+            "Onehot Mask": (Onehot(inputs="x", outputs="x", num_classes=5), [self.masks]),
+            "Onehot Smoothing": (Onehot(inputs="x", outputs="x", num_classes=5, label_smoothing=0.2), [self.labels]),
+            "Hadamard": (Hadamard(inputs="x", outputs="x", n_classes=5), [self.labels]),
+            "Hadamard Column": (Hadamard(inputs="x", outputs="x", n_classes=5), [self.column_labels]),
+            "Hadamard Mask": (Hadamard(inputs="x", outputs="x", n_classes=5), [self.masks]),
+        }
+        for name, (op, data) in cases.items():
+            with self.subTest(name):
+                self._check(op, data)
+
+    def test_batch_of_one(self):
+        cases = {
+            "Onehot": (Onehot(inputs="x", outputs="x", num_classes=5), [self.labels[:1]]),
+            "Hadamard": (Hadamard(inputs="x", outputs="x", n_classes=5), [self.column_labels[:1]]),
+            "Minmax": (Minmax(inputs="x", outputs="x"), [self.images[:1]]),
+        }
+        for name, (op, data) in cases.items():
+            with self.subTest(name):
+                self._check(op, data)
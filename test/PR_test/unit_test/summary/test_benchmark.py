@@ -0,0 +1,82 @@
+# Copyright 2023 The FastEstimator Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+import os
+import tempfile
+import unittest
+
+from fastestimator.summary.benchmark import BenchmarkResults
+
+
+def _get_run(steps_per_sec=100.0, ms_per_visit=1.0, peak_rss_mb=500.0, executor='process'):
+    return {
+        'ds_id': '',
+        'executor': executor,
+        'steps_per_sec': steps_per_sec,
+        'peak_rss_mb': peak_rss_mb,
+        'collation_ms': 0.5,
+        'batch_ops_ms': 0.0,
+        'ipc_ms': None,
+        'ops': [{
+            'name': 'Minmax', 'ms_per_visit': ms_per_visit
+        }, {
+            'name': '<Collating Batch>', 'ms_per_visit': 0.5
+        }]
+    }
+
+
+class TestBenchmarkResults(unittest.TestCase):
+    def test_no_regression(self):
+        baseline = BenchmarkResults(mode='train', epoch=1, runs=[_get_run()])
+        results = BenchmarkResults(mode='train', epoch=1, runs=[_get_run(steps_per_sec=95, ms_per_visit=1.05)])
+        self.assertEqual(results.compare(baseline, threshold=0.1), [])
+
+    def test_regressions(self):
+        baseline = BenchmarkResults(mode='train', epoch=1, runs=[_get_run()])
+        results = BenchmarkResults(mode='train',
+                                   epoch=1,
+                                   runs=[_get_run(steps_per_sec=50, ms_per_visit=2.0, peak_rss_mb=1000)])
+        regressions = results.compare(baseline, threshold=0.1)
+        with self.subTest("Throughput"):
+            self.assertTrue(any("steps_per_sec" in msg for msg in regressions))
+        with self.subTest("Memory"):
+            self.assertTrue(any("peak_rss_mb" in msg for msg in regressions))
+        with self.subTest("Op"):
+            self.assertTrue(any("Minmax" in msg for msg in regressions))
+        with self.subTest("Count"):
+            self.assertEqual(len(regressions), 3)
+
+    def test_noise_floor(self):
+        run = _get_run(ms_per_visit=0.001)
+        baseline = BenchmarkResults(mode='train', epoch=1, runs=[run])
+        results = BenchmarkResults(mode='train', epoch=1, runs=[_get_run(ms_per_visit=0.005)])
+        self.assertEqual(results.compare(baseline, threshold=0.1, min_ms=0.01), [])
+
+    def test_unmatched_runs_ignored(self):
+        baseline = BenchmarkResults(mode='train', epoch=1, runs=[_get_run(executor='thread')])
+        results = BenchmarkResults(mode='train', epoch=1, runs=[_get_run(steps_per_sec=1)])
+        self.assertEqual(results.compare(baseline), [])
+
+    def test_save_load(self):
+        results = BenchmarkResults(mode='eval', epoch=3, runs=[_get_run()])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "nested", "results.json")
+            results.save(path)
+            loaded = BenchmarkResults.load(path)
+        self.assertEqual(loaded.to_dict(), results.to_dict())
+
+    def test_invalid_threshold(self):
+        results = BenchmarkResults(mode='train', epoch=1)
+        with self.assertRaises(ValueError):
+            results.compare(results, threshold=-1)
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 # ==============================================================================
+import os
+import tempfile
 import time
 import unittest
 from io import StringIO
@@ -231,6 +233,60 @@ class TestStripPrefix(unittest.TestCase):
         self.assertEqual(x, "astring.json")
 
 
+class TestListFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp_dir.name, "data")
+        for rel_path in ("a.txt", ".hidden.txt", "b.csv", "sub/c.txt", "sub/deeper/d.txt", ".hidden_dir/e.txt"):
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, 'w').close()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _expected(self, recursive=True, file_extension=None):
+        paths = []
+        for root, _, files in os.walk(self.root):
+            paths.extend(os.path.join(root, f) for f in files if not f.startswith(".") and f.endswith(file_extension or ""))
+            if not recursive:
+                break
+        return sorted(paths)
+
+    def test_matches_walk(self):
+        for num_threads in (0, 4):
+            with self.subTest(num_threads=num_threads):
+                self.assertEqual(fe.util.list_files(self.root, num_threads=num_threads), self._expected())
+                self.assertEqual(fe.util.list_files(self.root, file_extension=".txt", num_threads=num_threads),
+                                 self._expected(file_extension=".txt"))
+                self.assertEqual(fe.util.list_files(self.root, recursive_search=False, num_threads=num_threads),
+                                 self._expected(recursive=False))
+
+    def test_not_a_dir(self):
+        with self.assertRaises(AssertionError):
+            fe.util.list_files(os.path.join(self.root, "a.txt"))
+
+    def test_manifest_cache(self):
+        cache_dir = os.path.join(self.tmp_dir.name, "cache")
+        first = fe.util.list_files(self.root, cache_dir=cache_dir)
+        with self.subTest("Manifest written"):
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+        with self.subTest("Manifest reused"):
+            with patch("fastestimator.util.base_util._scan_tree") as scan:
+                self.assertEqual(fe.util.list_files(self.root, cache_dir=cache_dir), first)
+                scan.assert_not_called()
+        with self.subTest("Extension filter applied to manifest"):
+            self.assertEqual(fe.util.list_files(self.root, file_extension=".csv", cache_dir=cache_dir),
+                             [os.path.join(self.root, "b.csv")])
+        with self.subTest("Manifest invalidated"):
+            new_path = os.path.join(self.root, "sub", "deeper", "f.txt")
+            open(new_path, 'w').close()
+            # Make sure that the modification time changes even on filesystems with coarse timestamps
+            stat = os.stat(os.path.dirname(new_path))
+            os.utime(os.path.dirname(new_path), ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertIn(new_path, fe.util.list_files(self.root, cache_dir=cache_dir))
+
+
 class TestGetType(unittest.TestCase):
     def test_get_type_np(self):
         x = fe.util.get_type(np.ones((10, 10), dtype='int32'))